@@ -0,0 +1,533 @@
+from life import Life
+from population import (
+    SELECTION_METHODS,
+    roulette_wheel_indices,
+    selection_weights,
+    stochastic_universal_sampling_indices,
+)
+import numpy as np
+import math
+
+# How a life entered the population, stored in LifeArray.origins
+ORIGIN_RANDOM = 0
+ORIGIN_CHILD = 1
+ORIGIN_REINTRODUCED = 2
+
+
+class LifeView:
+    """
+    Life-like view of one row of a LifeArray.
+
+    Attributes:
+    - gene: The row of the gene matrix belonging to this life.
+    - fitness_proxy: The fitness proxy of this life, calculated when first read.
+    - age: Number of generations this life has survived.
+    - origin: How this life entered the population.
+
+    Methods:
+    - calculate_fitness_proxy(): Calculates the fitness proxy based on the gene.
+    - to_dict(): Returns the life as a dict, decoding the gene if the population has a decoder.
+    """
+
+    def __init__(self, lives, index):
+        self.lives = lives
+        self.index = index
+
+    @property
+    def gene(self):
+        return self.lives.genes[self.index]
+
+    @gene.setter
+    def gene(self, gene):
+        self.lives.genes[self.index] = gene
+        self.lives.fitness_proxies[self.index] = np.nan
+
+    @property
+    def fitness_proxy(self):
+        if not self.is_evaluated:
+            self.calculate_fitness_proxy()
+        return float(self.lives.fitness_proxies[self.index])
+
+    @fitness_proxy.setter
+    def fitness_proxy(self, fitness_proxy):
+        if fitness_proxy is None:
+            fitness_proxy = np.nan
+        self.lives.fitness_proxies[self.index] = fitness_proxy
+
+    @property
+    def is_evaluated(self):
+        return not np.isnan(self.lives.fitness_proxies[self.index])
+
+    @property
+    def age(self):
+        return int(self.lives.ages[self.index])
+
+    @property
+    def origin(self):
+        return int(self.lives.origins[self.index])
+
+    def calculate_fitness_proxy(self):
+        self.lives.fitness_proxies[self.index] = (
+            self.lives.population.calculate_fitness_proxy(self.gene)
+        )
+
+    def to_dict(self):
+        return self.lives.to_life(self.index).to_dict()
+
+
+class LifeArray:
+    """
+    Stores a group of lives as a struct of arrays, one row per life.
+
+    Attributes:
+    - genes: 2-D array with one gene per row.
+    - fitness_proxies: Fitness proxy of each life, NaN if it has not been evaluated yet.
+    - ages: Number of generations each life has survived.
+    - origins: How each life entered the population (ORIGIN_RANDOM, ORIGIN_CHILD or ORIGIN_REINTRODUCED).
+    - population: The ArrayPopulation providing the fitness, mutation and decoding functions.
+
+    Methods:
+    - take(): Returns a new LifeArray holding the given rows.
+    - append(): Adds a Life object as a new row.
+    - to_life(): Returns a detached Life object for one row.
+    - evaluate(): Evaluates every row that has not been scored yet in one vectorized call.
+    """
+
+    def __init__(self, genes, fitness_proxies, ages, origins, population):
+        self.genes = genes
+        self.fitness_proxies = fitness_proxies
+        self.ages = ages
+        self.origins = origins
+        self.population = population
+
+    def __len__(self):
+        return len(self.genes)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            return LifeView(self, index)
+        return self.take(np.arange(len(self))[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield LifeView(self, index)
+
+    def __add__(self, other):
+        return LifeArray(
+            genes=np.concatenate([self.genes, other.genes]),
+            fitness_proxies=np.concatenate(
+                [self.fitness_proxies, other.fitness_proxies]
+            ),
+            ages=np.concatenate([self.ages, other.ages]),
+            origins=np.concatenate([self.origins, other.origins]),
+            population=self.population,
+        )
+
+    def take(self, indices):
+        return LifeArray(
+            genes=self.genes[indices],
+            fitness_proxies=self.fitness_proxies[indices],
+            ages=self.ages[indices],
+            origins=self.origins[indices],
+            population=self.population,
+        )
+
+    def append(self, life, origin=ORIGIN_REINTRODUCED):
+        gene = np.asarray(life.gene, dtype=self.genes.dtype)
+        self.genes = np.concatenate([self.genes, gene[np.newaxis]])
+        self.fitness_proxies = np.append(self.fitness_proxies, life.fitness_proxy)
+        self.ages = np.append(self.ages, np.int32(0))
+        self.origins = np.append(self.origins, np.int8(origin))
+
+    def to_life(self, index):
+        population = self.population
+        return Life(
+            gene=self.genes[index].copy(),
+            ga_calculate_fitness_proxy=population.calculate_fitness_proxy,
+            ga_generate_random_life=population.generate_random_life,
+            ga_mutation=population.mutation,
+            ga_decode_gene=population.decode_gene,
+            ga_mutation_with_delta=population.mutation_with_delta,
+            randomise=False,
+            fitness_proxy=float(self.fitness_proxies[index]),
+        )
+
+    def evaluate(self):
+        pending = np.flatnonzero(np.isnan(self.fitness_proxies))
+        if len(pending):
+            self.fitness_proxies[pending] = (
+                self.population.calculate_fitness_proxy_batch(self.genes[pending])
+            )
+
+
+class ArrayPopulation:
+    """
+    Array-backed alternative to Population for genes that stack into a 2-D array.
+
+    Attributes:
+    - lives: A LifeArray holding the gene matrix, fitness vector, ages and origins.
+    - survivors: LifeArray of lives that survived the selection process.
+    - children: LifeArray populated with offspring from survivors.
+    - fittest: Life object with the best fitness value.
+
+    Methods:
+    - get_fittest(): Calculates and returns the Life object with the best fitness value.
+    - get_best_lives(): Returns the fittest lives, best first.
+    - add_life(): Adds a life to the population.
+    - selection(): Represents the selection process.
+    - procreation(): Produces all children of the generation with the batch procreation function.
+    - mutate_children(): Mutates every child produced by procreation.
+    - evaluate_lives(): Evaluates the fitness proxy of lives that have not been scored yet.
+    - local_search_lives(): Improves random children or the fittest lives with the local search.
+    - get_state(): Returns the lives as arrays, e.g. for a checkpoint.
+    - set_state(): Replaces the lives with those of get_state().
+    """
+
+    def __init__(
+        self,
+        no_of_lives,
+        gene,
+        ga_calculate_fitness_proxy,
+        ga_generate_random_life,
+        ga_procreation,
+        ga_mutation,
+        initialise,
+        maximise_fitness_proxy,
+        child_procreation_rate,
+        selection_method,
+        ga_encode_gene=None,
+        ga_decode_gene=None,
+        ga_calculate_fitness_proxy_batch=None,
+        ga_procreation_batch=None,
+        ga_mutation_with_delta=None,
+        ga_mutation_batch=None,
+        ga_generate_random_lives=None,
+        ga_local_search=None,
+    ):
+        """
+        Initialize an ArrayPopulation instance. Takes the arguments of Population, plus the batch
+        mutation and generation functions.
+
+        Args:
+        - no_of_lives: The number of individuals in the population.
+        - gene: Gene information relevant to the optimization problem, as a 1-D array.
+        - ga_calculate_fitness_proxy: Function to calculate the fitness proxy.
+        - ga_generate_random_life: Function to generate random gene information.
+        - ga_procreation: Function representing Darwinian Procreation. Unused, children are procreated in batches.
+        - ga_mutation: Function for gene mutation.
+        - initialise: Boolean flag to perform initial population generation.
+        - maximise_fitness_proxy: Flag indicating whether to maximize the fitness proxy.
+        - child_procreation_rate: Number of children = Number of survivors * procreation rate
+        - ga_encode_gene: Optional function converting an external gene into its compact form.
+        - ga_decode_gene: Optional function converting a compact gene into its external form.
+        - ga_calculate_fitness_proxy_batch: Function scoring a 2-D array of genes in one call. Required.
+        - ga_procreation_batch: Function producing all children's genes from parent index arrays. Required.
+        - ga_mutation_with_delta: Optional function returning the mutated gene and the change in fitness proxy it caused.
+        - ga_mutation_batch: Optional function mutating every child's gene in one call, returning each row's
+          change in fitness proxy, NaN where it is not known. Takes precedence over the single gene mutations.
+        - ga_generate_random_lives: Optional function returning all random genes of the initial population at once.
+        - ga_local_search: Optional function returning an improved gene and the change in fitness proxy it made.
+        """
+        if ga_calculate_fitness_proxy_batch is None or ga_procreation_batch is None:
+            raise ValueError(
+                "ArrayPopulation requires ga_calculate_fitness_proxy_batch and ga_procreation_batch"
+            )
+        self.fittest = None
+        self._fittest_lives = None
+        self._fittest_length = None
+        self.procreation_func = ga_procreation
+        self.procreation_batch_func = ga_procreation_batch
+        self.child_procreation_rate = child_procreation_rate
+        if selection_method not in SELECTION_METHODS:
+            raise ValueError(
+                f"Unknown selection method: {selection_method}. Expected one of {SELECTION_METHODS}"
+            )
+        self.selection_method = selection_method
+
+        self.generate_random_life = ga_generate_random_life
+        self.calculate_fitness_proxy = ga_calculate_fitness_proxy
+        self.calculate_fitness_proxy_batch = ga_calculate_fitness_proxy_batch
+        self.mutation = ga_mutation
+        self.mutation_with_delta = ga_mutation_with_delta
+        self.mutation_batch = ga_mutation_batch
+        self.generate_random_lives = ga_generate_random_lives
+        self.local_search = ga_local_search
+        self.encode_gene = ga_encode_gene
+        self.decode_gene = ga_decode_gene
+        self.maximise_fitness_proxy = maximise_fitness_proxy
+
+        gene = np.asarray(gene)
+        self.lives = self.empty_lives(gene.dtype, len(gene))
+        self.survivors = self.empty_lives(gene.dtype, len(gene))
+        self.children = self.empty_lives(gene.dtype, len(gene))
+
+        if initialise:
+            if self.generate_random_lives is not None:
+                genes = self.generate_random_lives(gene, no_of_lives)
+            else:
+                genes = np.stack(
+                    [self.generate_random_life(gene) for _ in range(no_of_lives)]
+                )
+            self.lives = LifeArray(
+                genes=genes,
+                fitness_proxies=np.full(no_of_lives, np.nan),
+                ages=np.zeros(no_of_lives, dtype=np.int32),
+                origins=np.full(no_of_lives, ORIGIN_RANDOM, dtype=np.int8),
+                population=self,
+            )
+            self.evaluate_lives(self.lives)
+            self.get_fittest()
+
+    def empty_lives(self, dtype, gene_length):
+        return LifeArray(
+            genes=np.empty((0, gene_length), dtype=dtype),
+            fitness_proxies=np.empty(0),
+            ages=np.empty(0, dtype=np.int32),
+            origins=np.empty(0, dtype=np.int8),
+            population=self,
+        )
+
+    def ranked_indices(self, fitness_proxies):
+        # Indices ordered from fittest to least fit
+        if self.maximise_fitness_proxy:
+            return np.argsort(-fitness_proxies, kind="stable")
+        return np.argsort(fitness_proxies, kind="stable")
+
+    def get_fittest(self):
+        # The fittest life only changes when the lives do
+        if self._fittest_lives is self.lives and self._fittest_length == len(
+            self.lives
+        ):
+            return self.fittest
+        self.lives.evaluate()
+        if self.maximise_fitness_proxy:
+            index = np.argmax(self.lives.fitness_proxies)
+        else:
+            index = np.argmin(self.lives.fitness_proxies)
+        self.fittest = self.lives.to_life(index)
+        self._fittest_lives = self.lives
+        self._fittest_length = len(self.lives)
+        return self.fittest
+
+    def fitness_proxies(self):
+        self.lives.evaluate()
+        return self.lives.fitness_proxies
+
+    def get_best_lives(self, no_of_lives):
+        self.lives.evaluate()
+        fitness_proxies = self.lives.fitness_proxies
+        if no_of_lives < len(fitness_proxies):
+            # Partition out the top lives in O(n) and only sort those
+            keys = -fitness_proxies if self.maximise_fitness_proxy else fitness_proxies
+            indices = np.argpartition(keys, no_of_lives)[:no_of_lives]
+            indices = indices[np.argsort(keys[indices], kind="stable")]
+        else:
+            indices = self.ranked_indices(fitness_proxies)
+        return [self.lives.to_life(index) for index in indices]
+
+    def add_life(self, life):
+        self.lives.append(life)
+
+    def invalidate_ordering(self):
+        self._fittest_lives = None
+
+    def get_state(self):
+        """
+        Return copies of the lives' arrays, e.g. for a checkpoint.
+        """
+        self.lives.evaluate()
+        return {
+            "genes": self.lives.genes.copy(),
+            "fitness_proxies": self.lives.fitness_proxies.copy(),
+            "ages": self.lives.ages.copy(),
+            "origins": self.lives.origins.copy(),
+        }
+
+    def set_state(self, state):
+        """
+        Replace the lives with those of get_state(). Their fitness proxies are not recalculated.
+        """
+        no_of_lives = len(state["genes"])
+        self.lives = LifeArray(
+            genes=np.array(state["genes"]),
+            fitness_proxies=np.array(state["fitness_proxies"], dtype=float),
+            # A checkpoint of an object Population has no ages or origins
+            ages=np.array(state.get("ages", np.zeros(no_of_lives, dtype=np.int32))),
+            origins=np.array(
+                state.get(
+                    "origins", np.full(no_of_lives, ORIGIN_REINTRODUCED, dtype=np.int8)
+                )
+            ),
+            population=self,
+        )
+        self.invalidate_ordering()
+
+    def reintroduce_best_lives(self, best_lives):
+        for life in best_lives:
+            gene = life["gene"]
+            if self.encode_gene is not None:
+                gene = self.encode_gene(gene)
+            new_life = Life(
+                gene=gene,
+                ga_generate_random_life=self.generate_random_life,
+                ga_calculate_fitness_proxy=self.calculate_fitness_proxy,
+                ga_mutation=self.mutation,
+                ga_decode_gene=self.decode_gene,
+                ga_mutation_with_delta=self.mutation_with_delta,
+                randomise=False,
+                fitness_proxy=life["fitness_proxy"],
+            )
+            self.lives.append(new_life)
+        return
+
+    def selection(self):
+        self.lives.evaluate()
+        if self.selection_method == "t_s":
+            self.survivors = self.tournament_selection()
+        elif self.selection_method == "r_s":
+            self.survivors = self.rank_selection()
+        elif self.selection_method == "rw_s":
+            self.survivors = self.roulette_wheel_selection()
+        elif self.selection_method == "sus":
+            self.survivors = self.stochastic_universal_sampling_selection()
+        else:
+            raise ValueError(f"Unknown selection method: {self.selection_method}")
+        self.survivors.ages += 1
+        return self.survivors
+
+    def procreation(self):
+        no_of_children = len(self.survivors) * self.child_procreation_rate
+        parent_1_indices = np.random.randint(len(self.survivors), size=no_of_children)
+        parent_2_indices = np.random.randint(len(self.survivors), size=no_of_children)
+        children_genes = self.procreation_batch_func(
+            self.survivors.genes, parent_1_indices, parent_2_indices
+        )
+        self.children = LifeArray(
+            genes=children_genes,
+            fitness_proxies=np.full(no_of_children, np.nan),
+            ages=np.zeros(no_of_children, dtype=np.int32),
+            origins=np.full(no_of_children, ORIGIN_CHILD, dtype=np.int8),
+            population=self,
+        )
+        return self.children
+
+    def mutate_children(self):
+        genes = self.children.genes
+        if self.mutation_batch is not None:
+            # Score the children first, a NaN change marks the rows to score again
+            self.children.evaluate()
+            self.children.fitness_proxies += self.mutation_batch(genes)
+            return self.children
+        if self.mutation_with_delta is None:
+            for index in range(len(genes)):
+                genes[index] = self.mutation(genes[index])
+            self.children.fitness_proxies[:] = np.nan
+            return self.children
+
+        # Score the children first so mutations only apply their fitness delta
+        self.children.evaluate()
+        fitness_proxies = self.children.fitness_proxies
+        for index in range(len(genes)):
+            genes[index], fitness_delta = self.mutation_with_delta(genes[index])
+            if fitness_delta is None:
+                fitness_proxies[index] = np.nan
+            else:
+                fitness_proxies[index] += fitness_delta
+        return self.children
+
+    def local_search_lives(self, no_of_lives, elites=False):
+        """
+        Improve lives in place with the problem's local search, one gene at a time.
+
+        Args:
+        - no_of_lives: Number of lives improved.
+        - elites: If True, improve the fittest lives of the population, otherwise random children.
+        """
+        if elites:
+            lives = self.lives
+            lives.evaluate()
+            rows = self.ranked_indices(lives.fitness_proxies)[:no_of_lives]
+        else:
+            lives = self.children
+            lives.evaluate()
+            rows = np.random.choice(
+                len(lives), min(no_of_lives, len(lives)), replace=False
+            )
+        for row in rows:
+            lives.genes[row], fitness_delta = self.local_search(lives.genes[row])
+            lives.fitness_proxies[row] += fitness_delta
+        self.invalidate_ordering()
+
+    def evaluate_lives(self, lives):
+        """
+        Evaluate the fitness proxy of every life that has not been scored yet.
+
+        Args:
+        - lives: LifeArray. Rows with a NaN fitness proxy are scored in one vectorized call.
+        """
+        lives.evaluate()
+
+    def tournament_selection(self):
+        """
+        Perform tournament selection, drawing every tournament of the generation at once.
+
+        Returns:
+        - survivors: LifeArray of selected lives.
+        """
+        tournament_size = 5
+        survivor_rate = 0.5
+        no_of_survivors = math.floor(len(self.lives) * survivor_rate)
+        tournaments = np.random.randint(
+            len(self.lives), size=(no_of_survivors, tournament_size)
+        )
+        tournament_fitness_proxies = self.lives.fitness_proxies[tournaments]
+        if self.maximise_fitness_proxy:
+            winners = np.argmax(tournament_fitness_proxies, axis=1)
+        else:
+            winners = np.argmin(tournament_fitness_proxies, axis=1)
+        return self.lives.take(tournaments[np.arange(no_of_survivors), winners])
+
+    def rank_selection(self):
+        """
+        Perform rank selection, rolling the survival of every life at once.
+
+        Returns:
+        - survivors: LifeArray of selected lives.
+        """
+        no_of_lives = len(self.lives)
+        ranked_indices = self.ranked_indices(self.lives.fitness_proxies)
+        survival_chance = 1 - np.arange(no_of_lives) / no_of_lives
+        survived = survival_chance > np.random.random(no_of_lives)
+        return self.lives.take(ranked_indices[survived])
+
+    def roulette_wheel_selection(self):
+        """
+        Perform roulette wheel selection, picking each survivor with probability proportional to its fitness.
+
+        Returns:
+        - survivors: LifeArray of selected lives.
+        """
+        survivor_rate = 0.5
+        no_of_survivors = math.floor(len(self.lives) * survivor_rate)
+        weights = selection_weights(
+            self.lives.fitness_proxies, self.maximise_fitness_proxy
+        )
+        return self.lives.take(roulette_wheel_indices(weights, no_of_survivors))
+
+    def stochastic_universal_sampling_selection(self):
+        """
+        Perform stochastic universal sampling, a lower variance roulette wheel with evenly spaced pointers.
+
+        Returns:
+        - survivors: LifeArray of selected lives.
+        """
+        survivor_rate = 0.5
+        no_of_survivors = math.floor(len(self.lives) * survivor_rate)
+        weights = selection_weights(
+            self.lives.fitness_proxies, self.maximise_fitness_proxy
+        )
+        return self.lives.take(
+            stochastic_universal_sampling_indices(weights, no_of_survivors)
+        )
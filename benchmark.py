@@ -0,0 +1,261 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from config import Config, random_cities
+import genetic_algorithm_poc as poc
+from problems import create_darwinian_evolution
+from population import SELECTION_METHODS
+
+CITY_COUNTS = (75, 500, 2000)
+POPULATION_SIZES = (700, 10_000, 100_000)
+
+
+def make_config(no_of_cities, no_of_lives, selection_method=None):
+    config = Config()
+    config.no_of_lives = no_of_lives
+    config.no_of_cities = no_of_cities
+    config.cities = random_cities(no_of_cities)
+    config.city_indices = np.arange(no_of_cities, dtype=np.int32)
+    if selection_method is not None:
+        config.selection_method = selection_method
+    return config
+
+
+def measure(operation, min_time, max_calls):
+    """
+    Call an operation repeatedly until min_time seconds or max_calls calls have passed.
+
+    Args:
+    - operation: Function taking no arguments.
+    - min_time: Minimum seconds to measure for.
+    - max_calls: Maximum number of calls.
+
+    Returns:
+    - dict: Number of calls, total seconds and calls per second.
+    """
+    calls = 0
+    start_time = time.perf_counter()
+    elapsed = 0.0
+    while calls < max_calls and (calls == 0 or elapsed < min_time):
+        operation()
+        calls += 1
+        elapsed = time.perf_counter() - start_time
+    return {"calls": calls, "seconds": elapsed, "ops_per_sec": calls / elapsed}
+
+
+def peak_memory(operation):
+    # tracemalloc slows Python code down, so memory is measured apart from the timings
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_operators(no_of_cities, min_time, max_calls):
+    """
+    Benchmark the TSP functions on single lives.
+
+    Args:
+    - no_of_cities: Number of cities of the problem.
+    - min_time: Minimum seconds to measure each operator for.
+    - max_calls: Maximum number of calls of each operator.
+
+    Returns:
+    - list: One result dict per operator.
+    """
+    config = make_config(no_of_cities, 2)
+    poc.load_cities(config.cities)
+    darwinian_evolution = create_darwinian_evolution(config, ip=None, port=None)
+    parent_1, parent_2 = darwinian_evolution.population.get_best_lives(2)
+    gene = parent_1.gene.copy()
+    operations = {
+        "ga_calculate_fitness_proxy": lambda: poc.ga_calculate_fitness_proxy(gene),
+        "ga_procreation": lambda: poc.ga_procreation(
+            parent_1, parent_2, config.crossover_method
+        ),
+        "ga_mutation": lambda: poc.ga_mutation(gene),
+        "ga_mutation_with_delta": lambda: poc.ga_mutation_with_delta(
+            gene, config.mutation_operator
+        ),
+        "ga_generate_random_life": lambda: poc.ga_generate_random_life(
+            config.city_indices
+        ),
+    }
+    results = []
+    for name, operation in operations.items():
+        result = {"benchmark": name, "no_of_cities": no_of_cities}
+        result.update(measure(operation, min_time, max_calls))
+        result["peak_memory_bytes"] = peak_memory(operation)
+        results.append(result)
+    darwinian_evolution.close()
+    return results
+
+
+def benchmark_population(no_of_cities, no_of_lives, min_time, max_calls):
+    """
+    Benchmark each selection method and whole generations on one population size.
+
+    Args:
+    - no_of_cities: Number of cities of the problem.
+    - no_of_lives: Number of lives in the population.
+    - min_time: Minimum seconds to measure each benchmark for.
+    - max_calls: Maximum number of calls of each benchmark.
+
+    Returns:
+    - list: One result dict per selection method plus one for perform_generation_operations.
+    """
+    results = []
+    for selection_method in SELECTION_METHODS:
+        config = make_config(no_of_cities, no_of_lives, selection_method)
+        darwinian_evolution = create_darwinian_evolution(config, ip=None, port=None)
+        population = darwinian_evolution.population
+        result = {
+            "benchmark": f"selection_{selection_method}",
+            "no_of_cities": no_of_cities,
+            "no_of_lives": no_of_lives,
+            "population_store": config.population_store,
+        }
+        result.update(measure(population.selection, min_time, max_calls))
+        result["peak_memory_bytes"] = peak_memory(population.selection)
+        results.append(result)
+        darwinian_evolution.close()
+
+    config = make_config(no_of_cities, no_of_lives)
+    # The peak covers building the island as well as one generation
+    darwinian_evolution = None
+
+    def build_and_run_generation():
+        nonlocal darwinian_evolution
+        darwinian_evolution = create_darwinian_evolution(config, ip=None, port=None)
+        darwinian_evolution.perform_generation_operations()
+
+    memory = peak_memory(build_and_run_generation)
+    result = {
+        "benchmark": "perform_generation_operations",
+        "no_of_cities": no_of_cities,
+        "no_of_lives": no_of_lives,
+        "population_store": config.population_store,
+        "selection_method": config.selection_method,
+    }
+    timing = measure(
+        darwinian_evolution.perform_generation_operations, min_time, max_calls
+    )
+    result["generations_per_sec"] = timing.pop("ops_per_sec")
+    result.update(timing)
+    result["peak_memory_bytes"] = memory
+    result["best_fitness_proxy"] = darwinian_evolution.fittest_life.fitness_proxy
+    results.append(result)
+    darwinian_evolution.close()
+    return results
+
+
+def result_key(result):
+    return (result["benchmark"], result["no_of_cities"], result.get("no_of_lives"))
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare throughput against a stored baseline run.
+
+    Args:
+    - results: Result dicts of this run.
+    - baseline: Result dicts of the baseline run.
+    - tolerance: Allowed fractional slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+    - list: Regression dicts for every benchmark slower than the baseline by more than tolerance.
+    """
+    baseline_results = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get(result_key(result))
+        if baseline_result is None:
+            continue
+        metric = (
+            "generations_per_sec" if "generations_per_sec" in result else "ops_per_sec"
+        )
+        ratio = result[metric] / baseline_result[metric]
+        result["baseline_ratio"] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(
+                {
+                    "benchmark": result["benchmark"],
+                    "no_of_cities": result["no_of_cities"],
+                    "no_of_lives": result.get("no_of_lives"),
+                    metric: result[metric],
+                    f"baseline_{metric}": baseline_result[metric],
+                    "baseline_ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the GA operators and whole generations, reporting JSON."
+    )
+    parser.add_argument("--cities", type=int, nargs="+", default=list(CITY_COUNTS))
+    parser.add_argument("--lives", type=int, nargs="+", default=list(POPULATION_SIZES))
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="Seconds to measure each benchmark"
+    )
+    parser.add_argument(
+        "--max-calls", type=int, default=10_000, help="Calls per benchmark at most"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the islands' random streams"
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed fractional slowdown against the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Seeded once for the whole run, so reports of one seed evolve the same lives
+    np.random.seed(args.seed)
+    random.seed(args.seed)
+    results = []
+    for no_of_cities in args.cities:
+        results.extend(benchmark_operators(no_of_cities, args.min_time, args.max_calls))
+        for no_of_lives in args.lives:
+            results.extend(
+                benchmark_population(
+                    no_of_cities, no_of_lives, args.min_time, args.max_calls
+                )
+            )
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        report["regressions"] = compare_to_baseline(results, baseline, args.tolerance)
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report_json)
+    print(report_json)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
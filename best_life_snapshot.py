@@ -0,0 +1,92 @@
+import numpy as np
+from migrant_codec import encode_migrants
+
+
+class BestLifeSnapshot:
+    """
+    An immutable record of an island's best lives at one generation, shared in-process
+    between the genetic algorithm thread and the island's Flask server.
+
+    It holds the genes in their compact form. Decoding to JSON and encoding to a binary
+    migrant payload happen on first request, on the Flask thread, and are cached.
+
+    Attributes:
+    - genes: Genes of the best lives, best first, in their compact form.
+    - fitness_proxies: Fitness proxy of each of the best lives.
+    - generation_no: Generation the snapshot was taken in.
+
+    Methods:
+    - to_dict(): The best life as {"best_gene", "best_fitness_proxy", "generation_no"}.
+    - migrant_payload(): The best lives as a binary migrant payload, or None if unavailable.
+    """
+
+    def __init__(
+        self,
+        genes,
+        fitness_proxies,
+        generation_no,
+        ga_decode_gene=None,
+        island_id=0,
+        problem_fingerprint=None,
+    ):
+        """
+        Initialize a BestLifeSnapshot instance.
+
+        Args:
+        - genes: Genes of the best lives, best first. The snapshot keeps them, so pass copies.
+        - fitness_proxies: Fitness proxy of each of the best lives.
+        - generation_no: Generation the snapshot was taken in.
+        - ga_decode_gene: Optional function converting a compact gene into its external form.
+        - island_id: Identifier of the island, written into migrant payloads.
+        - problem_fingerprint: Fingerprint of the problem. Without it no migrant payload is served.
+        """
+        self.genes = genes
+        self.fitness_proxies = fitness_proxies
+        self.generation_no = generation_no
+        self.decode_gene = ga_decode_gene
+        self.island_id = island_id
+        self.problem_fingerprint = problem_fingerprint
+        self._payload = None
+        self._dict = None
+
+    def to_dict(self):
+        if self._dict is None:
+            best_gene = self.genes[0]
+            if self.decode_gene is not None:
+                best_gene = self.decode_gene(best_gene)
+            self._dict = {
+                "best_gene": best_gene,
+                "best_fitness_proxy": self.fitness_proxies[0],
+                "generation_no": self.generation_no,
+            }
+        return self._dict
+
+    def migrant_payload(self):
+        if self._payload is None and self.problem_fingerprint is not None:
+            self._payload = encode_migrants(
+                genes=np.stack(self.genes),
+                fitness_proxies=self.fitness_proxies,
+                generation_nos=[self.generation_no] * len(self.genes),
+                island_id=self.island_id,
+                fingerprint=self.problem_fingerprint,
+            )
+        return self._payload
+
+
+class IslandState:
+    """
+    Holds the latest BestLifeSnapshot of an island.
+
+    The genetic algorithm thread swaps in a new snapshot and never changes a published
+    one. Assigning a reference is atomic, so readers need no lock and always see a whole snapshot.
+
+    Methods:
+    - publish(): Replaces the current snapshot.
+    - snapshot: The current snapshot, None until the first one is published.
+    """
+
+    def __init__(self):
+        self.snapshot = None
+
+    def publish(self, snapshot):
+        self.snapshot = snapshot
@@ -0,0 +1,148 @@
+import os
+import queue
+import random
+import threading
+import numpy as np
+from migration_channel import put_dropping_oldest
+
+# Seconds close() waits for the waiting state to be written
+CLOSE_TIMEOUT = 30.0
+
+
+def get_rng_state():
+    """
+    Capture the state of the random and numpy.random generators as arrays.
+
+    Returns:
+    - dict: Arrays that set_rng_state() restores the generators from.
+    """
+    version, internal_state, gauss_next = random.getstate()
+    _, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    return {
+        "random_version": np.array(version),
+        "random_state": np.array(internal_state, dtype=np.uint64),
+        "random_gauss_next": np.array(np.nan if gauss_next is None else gauss_next),
+        "numpy_keys": keys.copy(),
+        "numpy_position": np.array(position),
+        "numpy_has_gauss": np.array(has_gauss),
+        "numpy_cached_gaussian": np.array(cached_gaussian),
+    }
+
+
+def set_rng_state(state):
+    gauss_next = float(state["random_gauss_next"])
+    random.setstate(
+        (
+            int(state["random_version"]),
+            tuple(int(value) for value in state["random_state"]),
+            None if np.isnan(gauss_next) else gauss_next,
+        )
+    )
+    np.random.set_state(
+        (
+            "MT19937",
+            state["numpy_keys"],
+            int(state["numpy_position"]),
+            int(state["numpy_has_gauss"]),
+            float(state["numpy_cached_gaussian"]),
+        )
+    )
+
+
+def write_checkpoint(path, state):
+    """
+    Write a checkpoint atomically. A reader sees either the previous checkpoint or
+    the new one, never a partly written file.
+
+    Args:
+    - path: Path of the checkpoint file.
+    - state: Dict of arrays.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as checkpoint_file:
+        # Uncompressed, as the genes are small integers and writing fast matters more
+        np.savez(checkpoint_file, **state)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Load a checkpoint written by write_checkpoint.
+
+    Args:
+    - path: Path of the checkpoint file.
+
+    Returns:
+    - dict: The checkpoint's arrays.
+    """
+    with np.load(path) as checkpoint:
+        return {key: checkpoint[key] for key in checkpoint.files}
+
+
+class Checkpointer:
+    """
+    Writes island checkpoints on a background thread, so evolution does not pause
+    while a checkpoint is written.
+
+    Only the latest state is kept waiting. If a write is still in progress when the
+    next state arrives, older waiting states are dropped.
+
+    Attributes:
+    - path: Path of the checkpoint file, replaced by every write.
+    - interval: Generations between checkpoints.
+
+    Methods:
+    - is_due(): Whether a checkpoint should be taken in a generation.
+    - save(): Queues a state to be written.
+    - close(): Writes any waiting state and stops the background thread.
+    """
+
+    def __init__(self, path, interval):
+        """
+        Initialize a Checkpointer instance.
+
+        Args:
+        - path: Path of the checkpoint file.
+        - interval: Generations between checkpoints.
+        """
+        self.path = path
+        self.interval = interval
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def is_due(self, generation_no):
+        return generation_no > 0 and generation_no % self.interval == 0
+
+    def save(self, state):
+        # The state must already be a copy, the generation loop carries on meanwhile
+        put_dropping_oldest(self.pending, state)
+
+    def write_loop(self):
+        while True:
+            state = self.pending.get()
+            if state is None:
+                return
+            try:
+                write_checkpoint(self.path, state)
+            except OSError as e:
+                print(f"Error writing checkpoint {self.path}: {e}")
+
+    def close(self):
+        # A thread that died on an error takes nothing from the queue any more, so a
+        # blocking put into the full queue would never return
+        if not self.thread.is_alive():
+            return
+        # Waits for the thread to take any waiting state, so that state is still
+        # written. The timeout covers a thread that dies meanwhile
+        try:
+            self.pending.put(None, timeout=CLOSE_TIMEOUT)
+        except queue.Full:
+            print(f"Checkpoint writer of {self.path} stopped taking states")
+            return
+        self.thread.join(timeout=CLOSE_TIMEOUT)
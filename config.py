@@ -2,6 +2,25 @@ import numpy as np
 import os
 
 
+def random_cities(no_of_cities, seed=0):
+    """
+    Generate cities at random coordinates in the unit square.
+
+    Args:
+    - no_of_cities: Number of cities.
+    - seed: Seed of the cities' layout.
+
+    Returns:
+    - list: List of cities, each a dict with "x" and "y" coordinates.
+    """
+    # A private generator, so generating cities never reseeds the global np.random
+    # stream the islands evolve with. Seed 0 gives the original cities
+    random_state = np.random.RandomState(seed=seed)
+    return [
+        dict(x=random_state.rand(), y=random_state.rand()) for _ in range(no_of_cities)
+    ]
+
+
 class Config:
     def __init__(self):
         # Initialize parameters required for the project
@@ -9,19 +28,111 @@ class Config:
         self.mutation_rate = 0.085
         self.maximise_fitness_proxy = False
         self.elitism = True
-        # 't_s' tournament selection, 'r_s' rank selection
+        # 't_s' tournament selection, 'r_s' rank selection, 'rw_s' roulette wheel
+        # selection, 'sus' stochastic universal sampling
         self.selection_method = "r_s"
         self.survivor_rate = 0.5  # 350 survivors
         self.child_procreation_rate = 1  # Based on number of survivors
+        self.max_generations = 100
+        # Further stopping criteria, an island stops at the first one met.
+        # None disables a criterion
+        self.time_budget = None  # Seconds of evolution
+        self.target_fitness_proxy = None
+        self.stagnation_generations = None  # Generations without improvement
+        self.min_diversity = None  # Fraction of distinct fitness proxies, 0 to 1
+
+        # Problem the islands solve, by the name it is registered under in
+        # problems.py: 'tsp', 'large_tsp' or 'knapsack'
+        self.problem = "tsp"
 
         # Initialize parameters specific to the project
         self.no_of_cities = 75
 
         # Define what needs to be optimized - this represents the life's gene
-        self.cities = []
-        np.random.seed(seed=0)
-        for _ in range(self.no_of_cities):
-            self.cities.append(dict(x=np.random.rand(), y=np.random.rand()))
+        self.cities = random_cities(self.no_of_cities)
+        # 'permutation' stores a route as int32 indices into self.cities,
+        # 'cities' stores a route as a list of city dicts
+        self.gene_representation = "permutation"
+        self.city_indices = np.arange(self.no_of_cities, dtype=np.int32)
+        # Evaluate each generation's permutation genes in one vectorized call
+        self.batch_fitness = True
+        # 'ox' order, 'pmx' partially mapped, 'cx' cycle, 'erx' edge recombination crossover
+        self.crossover_method = "ox"
+        # Procreate each generation's permutation genes in one vectorized call
+        self.batch_procreation = True
+        # 'objects' stores lives as Life objects, 'arrays' as a gene matrix and
+        # fitness vector (needs batch fitness and batch procreation)
+        self.population_store = "arrays"
+        # 'inversion', 'swap', 'insertion' or 'scramble'. Permutation mutations
+        # report their fitness delta so mutated children are not re-evaluated
+        self.mutation_operator = "inversion"
+        # Processes used for batch fitness evaluation and procreation within one
+        # island. 0 keeps everything in the island's own process
+        self.no_of_workers = 0
+
+        # The 'large_tsp' problem scales to thousands of cities. It loads a TSPLIB .tsp
+        # file, or makes no_of_cities random cities when tsplib_file is None. Distances
+        # are calculated on demand and mutations only join a city to one of its
+        # no_of_neighbours nearest cities, so memory grows linearly with the cities
+        self.tsplib_file = None
+        self.no_of_neighbours = 10
+
+        # Memetic stage: 2-opt and Or-opt local search between each city and its
+        # no_of_neighbours nearest cities, for the permutation TSPs. Applied each
+        # generation to this fraction of the children, or of the fittest lives when
+        # local_search_target is 'elites'. 0 turns the stage off
+        self.local_search_rate = 0.0
+        self.local_search_target = "children"  # 'children' or 'elites'
+
+        # Knapsack problem, random items with weights from 1 to 10
+        self.no_of_items = 200
+        self.knapsack_capacity_rate = 0.5  # Capacity as a fraction of the total weight
+        self.knapsack_seed = 0
+
+        # Local island model (island_model.py), migrating through queues
+        self.no_of_islands = 8
+        self.migration_interval = 5  # Generations between migrations
+        self.no_of_migrants = 1  # Best lives sent per migration
+        # 'ring', 'fully_connected' or 'random'
+        self.migration_topology = "ring"
+
+        # Flask islands migrate on background threads with bounded queues
+        self.migration_timeout = (
+            2.0  # Seconds before a request to an island is abandoned
+        )
+        self.migration_queue_size = 16  # Migrants waiting to be taken in
+
+        # The orchestrator's /dashboard polls the islands concurrently and reuses
+        # its snapshot for dashboard_cache_ttl seconds
+        self.dashboard_timeout = 1.0  # Seconds before an island is marked unreachable
+        self.dashboard_cache_ttl = 2.0
+        # Record per-phase timings, fitness evaluations and migration latency,
+        # served by each island's /metrics. Off costs nothing
+        self.collect_metrics = False
+        # Fitness proxies kept in an LRU cache keyed by the tour, so tours that were
+        # already scored are not scored again. Only worth it for expensive fitness
+        # functions: hashing every tour costs more than the vectorized batch fitness
+        # of the built-in problems. 0 disables it
+        self.fitness_cache_size = 0
+
+        # Seconds a new island waits for the other islands to start
+        self.startup_delay = 15
+        # Flask islands checkpoint their state to checkpoint_dir every
+        # checkpoint_interval generations, e.g. 50. 0 disables it. With
+        # resume_from_checkpoint a restarted island resumes from its checkpoint
+        self.checkpoint_interval = 0
+        self.checkpoint_dir = "checkpoints"
+        self.resume_from_checkpoint = False
+        # Flask islands animate the fittest route into
+        # render_dir/island_<ip>_<port>.<render_format>, drawing a frame on a
+        # background thread whenever it improves. GIF frames are held in memory until
+        # the island stops, 'mp4' is written as it goes but needs imageio's ffmpeg plugin
+        self.render_route = False
+        self.render_format = "gif"
+        self.render_dir = "GIFS"
+        self.render_size = 600  # Pixels per side
+        self.render_frame_duration = 0.5  # Seconds each frame is shown
+        self.render_queue_size = 8  # Routes waiting to be drawn, the oldest are dropped
 
         self.orchestrator_address = {"ip": "127.0.0.1", "port": 5001}
         # Define IP addresses and port numbers to be used
@@ -0,0 +1,246 @@
+import numpy as np
+import random
+
+
+def random_cross_over_points(gene_length):
+    """
+    Draw the start and end of a crossover segment, never including the home city.
+
+    Args:
+    - gene_length: Number of cities in the gene.
+
+    Returns:
+    - tuple: (cross_over_start, cross_over_end) with cross_over_start <= cross_over_end.
+    """
+    cross_over_start = random.randint(1, gene_length - 1)
+    cross_over_end = random.randint(1, gene_length - 1)
+    if cross_over_start > cross_over_end:
+        cross_over_start, cross_over_end = cross_over_end, cross_over_start
+    return cross_over_start, cross_over_end
+
+
+def order_crossover(parent_1, parent_2, cross_over_start, cross_over_end):
+    """
+    Order crossover (OX). The child inherits parent_1's segment and the remaining
+    cities in the order they appear in parent_2.
+
+    Args:
+    - parent_1: Permutation of city indices.
+    - parent_2: Permutation of city indices.
+    - cross_over_start: Start of the segment inherited from parent_1.
+    - cross_over_end: End (exclusive) of the segment inherited from parent_1.
+
+    Returns:
+    - np.ndarray: The child permutation.
+    """
+    child = np.empty_like(parent_1)
+    child[cross_over_start:cross_over_end] = parent_1[cross_over_start:cross_over_end]
+    inherited = np.zeros(len(parent_1), dtype=bool)
+    inherited[parent_1[cross_over_start:cross_over_end]] = True
+    remaining = parent_2[~inherited[parent_2]]
+    child[:cross_over_start] = remaining[:cross_over_start]
+    child[cross_over_end:] = remaining[cross_over_start:]
+    return child
+
+
+def partially_mapped_crossover(parent_1, parent_2, cross_over_start, cross_over_end):
+    """
+    Partially mapped crossover (PMX). The child inherits parent_1's segment and
+    parent_2's cities elsewhere, repairing duplicates through the segment mapping.
+
+    Args:
+    - parent_1: Permutation of city indices.
+    - parent_2: Permutation of city indices.
+    - cross_over_start: Start of the segment inherited from parent_1.
+    - cross_over_end: End (exclusive) of the segment inherited from parent_1.
+
+    Returns:
+    - np.ndarray: The child permutation.
+    """
+    child = parent_2.copy()
+    child[cross_over_start:cross_over_end] = parent_1[cross_over_start:cross_over_end]
+    position_in_parent_1 = np.empty_like(parent_1)
+    position_in_parent_1[parent_1] = np.arange(len(parent_1), dtype=parent_1.dtype)
+    inherited = np.zeros(len(parent_1), dtype=bool)
+    inherited[parent_1[cross_over_start:cross_over_end]] = True
+
+    outside = np.ones(len(parent_1), dtype=bool)
+    outside[cross_over_start:cross_over_end] = False
+    # Only cities duplicated by the inherited segment need repairing. The mapping
+    # chains are disjoint, so following them costs O(n) in total.
+    for i in np.flatnonzero(outside & inherited[child]):
+        city = child[i]
+        while inherited[city]:
+            city = parent_2[position_in_parent_1[city]]
+        child[i] = city
+    return child
+
+
+def cycle_crossover(parent_1, parent_2):
+    """
+    Cycle crossover (CX). Cities keep the position they hold in one of the parents,
+    alternating parents cycle by cycle.
+
+    Args:
+    - parent_1: Permutation of city indices.
+    - parent_2: Permutation of city indices.
+
+    Returns:
+    - np.ndarray: The child permutation.
+    """
+    child = parent_2.copy()
+    position_in_parent_1 = np.empty_like(parent_1)
+    position_in_parent_1[parent_1] = np.arange(len(parent_1), dtype=parent_1.dtype)
+    visited = np.zeros(len(parent_1), dtype=bool)
+    take_parent_1 = True
+    for start in range(len(parent_1)):
+        if visited[start]:
+            continue
+        i = start
+        while not visited[i]:
+            visited[i] = True
+            if take_parent_1:
+                child[i] = parent_1[i]
+            i = position_in_parent_1[parent_2[i]]
+        take_parent_1 = not take_parent_1
+    return child
+
+
+def edge_recombination_crossover(parent_1, parent_2):
+    """
+    Edge recombination crossover (ERX). Builds the child from the edges of both
+    parents, always moving to the neighbour with the fewest remaining edges.
+
+    Args:
+    - parent_1: Permutation of city indices.
+    - parent_2: Permutation of city indices.
+
+    Returns:
+    - np.ndarray: The child permutation, starting from parent_1's home city.
+    """
+    no_of_cities = len(parent_1)
+    # Every city has at most four distinct neighbours across both parents
+    neighbours = [set() for _ in range(no_of_cities)]
+    for parent in (parent_1, parent_2):
+        parent = parent.tolist()
+        for i, city in enumerate(parent):
+            neighbours[city].add(parent[i - 1])
+            neighbours[city].add(parent[(i + 1) % no_of_cities])
+
+    # Unvisited cities are kept in a list with a position index so a random
+    # one can be drawn and removed in O(1)
+    unvisited = list(range(no_of_cities))
+    position = list(range(no_of_cities))
+
+    def remove_unvisited(city):
+        last = unvisited.pop()
+        if last != city:
+            unvisited[position[city]] = last
+            position[last] = position[city]
+
+    child = np.empty_like(parent_1)
+    city = int(parent_1[0])
+    for i in range(no_of_cities):
+        child[i] = city
+        remove_unvisited(city)
+        for neighbour in neighbours[city]:
+            neighbours[neighbour].discard(city)
+        if not unvisited:
+            break
+        if neighbours[city]:
+            city = min(neighbours[city], key=lambda x: (len(neighbours[x]), x))
+        else:
+            city = random.choice(unvisited)
+    return child
+
+
+CROSSOVER_METHODS = {
+    "ox": order_crossover,
+    "pmx": partially_mapped_crossover,
+    "cx": cycle_crossover,
+    "erx": edge_recombination_crossover,
+}
+
+
+def crossover(parent_1, parent_2, crossover_method="ox"):
+    """
+    Produce one child from two permutation genes.
+
+    Args:
+    - parent_1: Permutation of city indices.
+    - parent_2: Permutation of city indices.
+    - crossover_method: 'ox', 'pmx', 'cx' or 'erx'.
+
+    Returns:
+    - np.ndarray: The child permutation.
+    """
+    if crossover_method in ("ox", "pmx"):
+        cross_over_start, cross_over_end = random_cross_over_points(len(parent_1))
+        return CROSSOVER_METHODS[crossover_method](
+            parent_1, parent_2, cross_over_start, cross_over_end
+        )
+    if crossover_method in CROSSOVER_METHODS:
+        return CROSSOVER_METHODS[crossover_method](parent_1, parent_2)
+    raise ValueError(f"Unknown crossover method: {crossover_method}")
+
+
+def order_crossover_batch(parents_1, parents_2, cross_over_starts, cross_over_ends):
+    """
+    Order crossover (OX) for many pairs of parents in a single vectorized pass.
+
+    Args:
+    - parents_1: 2-D array with one parent permutation per row.
+    - parents_2: 2-D array with one parent permutation per row.
+    - cross_over_starts: Start of each child's segment inherited from parents_1.
+    - cross_over_ends: End (exclusive) of each child's segment inherited from parents_1.
+
+    Returns:
+    - np.ndarray: 2-D array with one child permutation per row.
+    """
+    no_of_children, no_of_cities = parents_1.shape
+    rows = np.arange(no_of_children)[:, np.newaxis]
+    positions = np.arange(no_of_cities)
+    segment = (positions >= cross_over_starts[:, np.newaxis]) & (
+        positions < cross_over_ends[:, np.newaxis]
+    )
+    inherited = np.zeros((no_of_children, no_of_cities), dtype=bool)
+    inherited[rows, parents_1] = segment
+    remaining = ~inherited[rows, parents_2]
+
+    children = np.empty_like(parents_1)
+    children[segment] = parents_1[segment]
+    # Row-major order keeps each child's remaining cities aligned with its
+    # free positions, as every row has as many of one as of the other
+    children[~segment] = parents_2[remaining]
+    return children
+
+
+def crossover_batch(genes, parent_1_indices, parent_2_indices, crossover_method="ox"):
+    """
+    Produce all children of a generation at once.
+
+    Args:
+    - genes: 2-D array with one parent permutation per row.
+    - parent_1_indices: Row of genes used as the first parent of each child.
+    - parent_2_indices: Row of genes used as the second parent of each child.
+    - crossover_method: 'ox', 'pmx', 'cx' or 'erx'.
+
+    Returns:
+    - np.ndarray: 2-D array with one child permutation per row.
+    """
+    parents_1 = genes[parent_1_indices]
+    parents_2 = genes[parent_2_indices]
+    if crossover_method == "ox":
+        no_of_children, no_of_cities = parents_1.shape
+        cross_over_points = np.sort(
+            np.random.randint(1, no_of_cities, size=(no_of_children, 2)), axis=1
+        )
+        return order_crossover_batch(
+            parents_1, parents_2, cross_over_points[:, 0], cross_over_points[:, 1]
+        )
+    return np.stack(
+        [
+            crossover(parent_1, parent_2, crossover_method)
+            for parent_1, parent_2 in zip(parents_1, parents_2)
+        ]
+    )
@@ -1,11 +1,14 @@
-import cv2
-import os
-import imageio
 import numpy as np
+from functools import partial
 from population import Population
-import requests
+from array_population import ArrayPopulation
+from worker_pool import WorkerPool
+from migration_channel import MigrationChannel
+from best_life_snapshot import BestLifeSnapshot
+from checkpoint import get_rng_state, set_rng_state
+from termination import TerminationCriteria
 import time
-import json
+import math
 import random
 from config import Config
 from life import Life
@@ -16,7 +19,7 @@ class Darwinian_evolution:
     Orchestrates the genetic algorithm.
 
     Attributes:
-    - population: Contains an instance of the Population class.
+    - population: Contains an instance of the Population or ArrayPopulation class.
     - fittest_life: Contains information about the fittest life.
     - maximise_fitness_proxy: Flag indicating whether to maximize the fitness proxy.
     - max_generations: The maximum number of generations.
@@ -42,6 +45,23 @@ class Darwinian_evolution:
         selection_method,
         ip,
         port,
+        ga_encode_gene=None,
+        ga_decode_gene=None,
+        ga_calculate_fitness_proxy_batch=None,
+        ga_procreation_batch=None,
+        population_store="objects",
+        ga_mutation_with_delta=None,
+        no_of_workers=0,
+        shared_arrays=None,
+        problem_fingerprint=None,
+        metrics=None,
+        fitness_cache=None,
+        termination_criteria=None,
+        ga_mutation_batch=None,
+        ga_generate_random_lives=None,
+        ga_local_search=None,
+        local_search_rate=0.0,
+        local_search_target="children",
     ):
         """
         Initialize a Darwinian_evolution instance.
@@ -57,8 +77,85 @@ class Darwinian_evolution:
         - maximise_fitness_proxy: Flag indicating whether to maximize the fitness proxy.
         - max_generations: The maximum number of generations.
         - elitism: Flag indicating whether to use elitism.
+        - ga_encode_gene: Optional function converting an external gene into its compact form.
+        - ga_decode_gene: Optional function converting a compact gene into its external form.
+        - ga_calculate_fitness_proxy_batch: Optional function scoring a 2-D array of genes in one call.
+        - ga_procreation_batch: Optional function producing all children's genes from parent index arrays.
+        - population_store: 'objects' for a list of Life objects, 'arrays' for an array-backed ArrayPopulation.
+        - ga_mutation_with_delta: Optional function returning the mutated gene and the change in fitness proxy it caused.
+        - no_of_workers: If above 0, spread batch fitness evaluation and batch procreation across this many processes.
+        - shared_arrays: Optional dict of problem arrays passed to ga_calculate_fitness_proxy_batch as keyword
+          arguments, and shared with the workers, e.g. {"distance_matrix": ...}.
+        - problem_fingerprint: Optional fingerprint of the problem. If given, migrants are exchanged as
+          compact binary payloads of encoded genes instead of JSON.
+        - metrics: Optional GenerationMetrics recording phase timings, fitness evaluations and migration latency.
+        - fitness_cache: Optional FitnessCache consulted before a fitness proxy is calculated.
+        - termination_criteria: Optional TerminationCriteria deciding when run_genetic_algorithm stops.
+          Defaults to stopping after max_generations.
+        - ga_mutation_batch: Optional function mutating a 2-D array of genes in place, returning each row's
+          change in fitness proxy. Only used by the array-backed population, instead of mutating one gene at a time.
+        - ga_generate_random_lives: Optional function generating the array-backed population's random genes at once.
+          Only used by the array-backed population.
+        - ga_local_search: Optional function returning an improved gene and the change in fitness proxy it made,
+          e.g. 2-opt for the TSP. Turns on a memetic stage in every generation.
+        - local_search_rate: Fraction of the lives improved by the local search each generation.
+        - local_search_target: 'children' to improve random children before they join the population,
+          'elites' to improve the fittest lives of the population.
         """
-        self.population = Population(
+        self.worker_pool = None
+        if no_of_workers > 0:
+            if ga_calculate_fitness_proxy_batch is None or ga_procreation_batch is None:
+                raise ValueError(
+                    "A worker pool requires ga_calculate_fitness_proxy_batch and ga_procreation_batch"
+                )
+            self.worker_pool = WorkerPool(
+                no_of_workers=no_of_workers,
+                ga_calculate_fitness_proxy_batch=ga_calculate_fitness_proxy_batch,
+                ga_procreation_batch=ga_procreation_batch,
+                shared_arrays=shared_arrays,
+            )
+            ga_calculate_fitness_proxy_batch = (
+                self.worker_pool.calculate_fitness_proxy_batch
+            )
+            ga_procreation_batch = self.worker_pool.procreation_batch
+        elif ga_calculate_fitness_proxy_batch is not None and shared_arrays:
+            # Passed the same way as in the workers, which read them from shared memory
+            ga_calculate_fitness_proxy_batch = partial(
+                ga_calculate_fitness_proxy_batch, **shared_arrays
+            )
+
+        self.metrics = metrics
+        # Wrapped after the worker pool, which needs the module level functions
+        if metrics is not None:
+            (
+                ga_calculate_fitness_proxy,
+                ga_calculate_fitness_proxy_batch,
+            ) = metrics.count_fitness_evaluations(
+                ga_calculate_fitness_proxy, ga_calculate_fitness_proxy_batch
+            )
+        self.fitness_cache = fitness_cache
+        # Outside the metrics, which then only count the fitness proxies actually calculated
+        if fitness_cache is not None:
+            (
+                ga_calculate_fitness_proxy,
+                ga_calculate_fitness_proxy_batch,
+            ) = fitness_cache.wrap(
+                ga_calculate_fitness_proxy, ga_calculate_fitness_proxy_batch
+            )
+
+        # Batch mutation and generation only exist for genes stacked into an array
+        array_kwargs = {}
+        if population_store == "objects":
+            population_class = Population
+        elif population_store == "arrays":
+            population_class = ArrayPopulation
+            array_kwargs = dict(
+                ga_mutation_batch=ga_mutation_batch,
+                ga_generate_random_lives=ga_generate_random_lives,
+            )
+        else:
+            raise ValueError(f"Unknown population store: {population_store}")
+        self.population = population_class(
             gene=gene,
             no_of_lives=no_of_lives,
             ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
@@ -69,6 +166,13 @@ class Darwinian_evolution:
             maximise_fitness_proxy=maximise_fitness_proxy,
             child_procreation_rate=child_procreation_rate,
             selection_method=selection_method,
+            ga_encode_gene=ga_encode_gene,
+            ga_decode_gene=ga_decode_gene,
+            ga_calculate_fitness_proxy_batch=ga_calculate_fitness_proxy_batch,
+            ga_procreation_batch=ga_procreation_batch,
+            ga_mutation_with_delta=ga_mutation_with_delta,
+            ga_local_search=ga_local_search,
+            **array_kwargs,
         )
 
         self.fittest_life = None
@@ -76,15 +180,50 @@ class Darwinian_evolution:
         self.maximise_fitness_proxy = maximise_fitness_proxy
         self.generate_random_life = ga_generate_random_life
         self.mutate_life = ga_mutation
+        self.mutate_life_with_delta = ga_mutation_with_delta
         self.max_generations = max_generations
         self.elitism = elitism
+        self.encode_gene = ga_encode_gene
+        self.decode_gene = ga_decode_gene
+        self.problem_fingerprint = problem_fingerprint
 
         # Used specifically to draw map for the TSP
         self.city_locations = gene
+        if ga_decode_gene is not None:
+            self.city_locations = ga_decode_gene(gene)
 
         self.ip_address = ip
         self.port = port
         self.config = Config()
+        # Created when the genetic algorithm starts running
+        self.migration_channel = None
+        # Optional ProgressFeed that generation and migration events are published to
+        self.progress_feed = None
+        # Optional IslandState shared with the island's Flask server
+        self.island_state = None
+        # Optional Checkpointer the island state is periodically saved with
+        self.checkpointer = None
+        # Set when resuming from a checkpoint
+        self.start_generation_no = 0
+        # Set to a RouteRenderer to animate the fittest route as it improves
+        self.route_renderer = None
+        self.rendered_fitness_proxy = None
+        if termination_criteria is None:
+            termination_criteria = TerminationCriteria(
+                maximise_fitness_proxy=maximise_fitness_proxy,
+                max_generations=max_generations,
+            )
+        self.termination_criteria = termination_criteria
+
+        if local_search_target not in ("children", "elites"):
+            raise ValueError(
+                f"Unknown local search target: {local_search_target}. Expected 'children' or 'elites'"
+            )
+        self.local_search_rate = local_search_rate
+        # None when there is no memetic stage, so the generation skips it entirely
+        self.local_search_target = None
+        if ga_local_search is not None and local_search_rate > 0:
+            self.local_search_target = local_search_target
 
     def save_best_life(self):
         """
@@ -102,140 +241,370 @@ class Darwinian_evolution:
                 if current_gen_fittest_proxy > overall_fittest_proxy:
                     self.fittest_life = current_gen_fittest_life
                 else:
-                    self.population.lives.append(self.fittest_life)
+                    self.population.add_life(self.fittest_life)
             else:
                 if current_gen_fittest_proxy < overall_fittest_proxy:
                     self.fittest_life = current_gen_fittest_life
                 else:
-                    self.population.lives.append(self.fittest_life)
+                    self.population.add_life(self.fittest_life)
 
         return
 
-    def send_best_life_via_post(self, generation_no):
-        payload = {
-            "best_gene": self.fittest_life.gene,
-            "best_fitness_proxy": self.fittest_life.fitness_proxy,
-            "generation_no": generation_no,
-        }
-        r = requests.post(
-            url=f"http://{self.ip_address}:{self.port}/send_best_life",
-            json=payload,
+    def publish_progress(self, event, **data):
+        # Events are only built while someone is streaming them
+        if self.progress_feed is None or not self.progress_feed.has_subscribers():
+            return
+        self.progress_feed.publish(
+            {"event": event, "ip": self.ip_address, "port": self.port, **data}
+        )
+
+    def publish_generation_progress(self, generation_no, generations_per_second):
+        if self.progress_feed is None or not self.progress_feed.has_subscribers():
+            return
+        fitness_proxies = self.population.fitness_proxies()
+        if self.maximise_fitness_proxy:
+            best, worst = fitness_proxies.max(), fitness_proxies.min()
+        else:
+            best, worst = fitness_proxies.min(), fitness_proxies.max()
+        self.publish_progress(
+            "generation",
+            generation_no=generation_no,
+            best_fitness_proxy=float(best),
+            mean_fitness_proxy=float(fitness_proxies.mean()),
+            worst_fitness_proxy=float(worst),
+            overall_best_fitness_proxy=(
+                None if self.fittest_life is None else self.fittest_life.fitness_proxy
+            ),
+            generations_per_second=generations_per_second,
         )
 
-    def reintroduce_life_into_population(self, gene):
+    def publish_best_life(self, generation_no):
+        """
+        Hand the island's best lives to its Flask server through the shared IslandState.
+        Only references and gene copies are taken here, serialisation happens when they are requested.
+        """
+        if self.island_state is None:
+            return
+        best_lives = self.get_best_lives(self.config.no_of_migrants)
+        # The overall fittest life leads, even when elitism has not put it back yet
+        if (
+            self.fittest_life is not None
+            and self.fittest_life.fitness_proxy != best_lives[0].fitness_proxy
+        ):
+            best_lives = [self.fittest_life] + best_lives[:-1]
+        self.island_state.publish(
+            BestLifeSnapshot(
+                genes=[copy_gene(life.gene) for life in best_lives],
+                fitness_proxies=[life.fitness_proxy for life in best_lives],
+                generation_no=generation_no,
+                ga_decode_gene=self.decode_gene,
+                island_id=(self.port or 0) & 0xFFFF,
+                problem_fingerprint=self.problem_fingerprint,
+            )
+        )
+
+    def render_fittest_life(self, generation_no):
+        # Frames are only drawn when the fittest route has improved
+        if self.route_renderer is None:
+            return
+        fittest_life = self.fittest_life
+        if fittest_life is None:
+            fittest_life = self.population.get_fittest()
+        if self.rendered_fitness_proxy is not None and not (
+            self.termination_criteria.is_better(
+                fittest_life.fitness_proxy, self.rendered_fitness_proxy
+            )
+        ):
+            return
+        self.rendered_fitness_proxy = fittest_life.fitness_proxy
+        self.route_renderer.submit(
+            copy_gene(fittest_life.gene), fittest_life.fitness_proxy, generation_no
+        )
+
+    def reintroduce_life_into_population(
+        self, gene, fitness_proxy=None, is_encoded=False
+    ):
+        """
+        Add a migrant from another island to the population.
+
+        Args:
+        - gene: The migrant's gene.
+        - fitness_proxy: The migrant's fitness proxy if it is trusted, otherwise None to score it here.
+        - is_encoded: Whether the gene is already in its compact form.
+        """
+        if self.encode_gene is not None and not is_encoded:
+            gene = self.encode_gene(gene)
         life = Life(
             gene=gene,
             ga_calculate_fitness_proxy=self.calculate_fitness_proxy,
             ga_generate_random_life=self.generate_random_life,
             ga_mutation=self.mutate_life,
+            ga_decode_gene=self.decode_gene,
+            randomise=False,
+            fitness_proxy=fitness_proxy,
+            ga_mutation_with_delta=self.mutate_life_with_delta,
         )
-        # As Life class on initialisation generates a random gene, we have to reassign it again and calculate fitness proxy
-        life.gene = gene
-        life.calculate_fitness_proxy()
         # Introduce life into population
-        self.population.lives.append(life)
-
-    def request_best_gene_from_ip_and_port(self):
-        randomly_chosen_ip_and_port = random.choice(self.config.host_addresses)
-        while randomly_chosen_ip_and_port["ip"] == self.ip_address:
-            randomly_chosen_ip_and_port = random.choice(self.config.host_addresses)
-        ip = randomly_chosen_ip_and_port["ip"]
-        port = randomly_chosen_ip_and_port["port"]
-        url = f"http://{ip}:{port}/get_best_life"
-        response = requests.get(url)
-        print(f"Own IP: {self.ip_address}. Requesting from {ip}")
-
-        if response.status_code == 200:
-            data = response.json()
-            gene = data["best_gene"]
-            return gene
-        else:
-            print(f"Error: {response.status_code}")
-            print(response.text)
+        self.population.add_life(life)
+
+    def capture_state(self, generation_no):
+        """
+        Copy the island's state into arrays: the lives, the fittest life, the generation
+        number and the random number generators. Requires genes that stack into a 2-D array.
+
+        Args:
+        - generation_no: The generation the state is captured after.
+
+        Returns:
+        - dict: Arrays that restore_state() resumes the island from.
+        """
+        state = self.population.get_state()
+        if self.fittest_life is not None:
+            state["fittest_gene"] = np.array(self.fittest_life.gene)
+            state["fittest_fitness_proxy"] = np.array(self.fittest_life.fitness_proxy)
+        state["generation_no"] = np.array(generation_no)
+        state.update(get_rng_state())
+        return state
+
+    def restore_state(self, state):
+        """
+        Resume the island from a state captured by capture_state(). Fitness proxies are not recalculated.
+
+        Args:
+        - state: Dict of arrays, e.g. loaded from a checkpoint.
+        """
+        self.population.set_state(state)
+        self.fittest_life = None
+        if "fittest_gene" in state:
+            self.fittest_life = Life(
+                gene=np.array(state["fittest_gene"]),
+                ga_calculate_fitness_proxy=self.calculate_fitness_proxy,
+                ga_generate_random_life=self.generate_random_life,
+                ga_mutation=self.mutate_life,
+                ga_decode_gene=self.decode_gene,
+                randomise=False,
+                fitness_proxy=float(state["fittest_fitness_proxy"]),
+                ga_mutation_with_delta=self.mutate_life_with_delta,
+            )
+        self.population.get_fittest()
+        self.start_generation_no = int(state["generation_no"]) + 1
+        set_rng_state(state)
 
     def perform_generation_operations(self):
+        # Timing is a separate path, so an island without metrics pays nothing for it
+        if self.metrics is not None:
+            self.perform_generation_operations_with_metrics()
+            return
         # Natural selection
         self.population.survivors = self.population.selection()
         # Procreation
         self.population.children = self.population.procreation()
         # Mutation
-        for life in self.population.children:
-            life.mutate_life()
+        self.population.children = self.population.mutate_children()
+        # Score the children, in one batch if the population evaluates in batches
+        self.population.evaluate_lives(self.population.children)
+        # Memetic stage, improving children before they join the population
+        if self.local_search_target == "children":
+            self.apply_local_search()
         # Update population
         self.population.lives = self.population.survivors + self.population.children
+        if self.local_search_target == "elites":
+            self.apply_local_search()
         # Get fittest life of current population
         self.population.get_fittest()
         if self.elitism:
             self.save_best_life()
 
+    def perform_generation_operations_with_metrics(self):
+        population = self.population
+        phase_seconds = {}
+        phase_start = time.perf_counter()
+
+        def end_phase(phase):
+            nonlocal phase_start
+            phase_end = time.perf_counter()
+            phase_seconds[phase] = phase_end - phase_start
+            phase_start = phase_end
+
+        population.survivors = population.selection()
+        end_phase("selection")
+        population.children = population.procreation()
+        end_phase("procreation")
+        population.children = population.mutate_children()
+        end_phase("mutation")
+        population.evaluate_lives(population.children)
+        end_phase("evaluation")
+        if self.local_search_target == "children":
+            self.apply_local_search()
+            end_phase("local_search")
+        population.lives = population.survivors + population.children
+        end_phase("merge")
+        if self.local_search_target == "elites":
+            self.apply_local_search()
+            end_phase("local_search")
+        population.get_fittest()
+        end_phase("get_fittest")
+        if self.elitism:
+            self.save_best_life()
+            end_phase("save_best_life")
+
+        self.metrics.record_generation(phase_seconds, self.get_best_fitness_proxy())
+
+    def apply_local_search(self):
+        """
+        Improve local_search_rate of the children, or of the fittest lives, with the problem's local search.
+        """
+        elites = self.local_search_target == "elites"
+        lives = self.population.lives if elites else self.population.children
+        no_of_lives = math.ceil(self.local_search_rate * len(lives))
+        if no_of_lives:
+            self.population.local_search_lives(no_of_lives, elites=elites)
+
     def run_genetic_algorithm(self):
         print(f"Running genetic algorithm on {self.ip_address}:{self.port}")
-        time.sleep(15)
+        # A resumed island has other islands running already
+        if self.start_generation_no == 0:
+            time.sleep(self.config.startup_delay)
         # Effect of human injection
         # self.human_injection()
 
-        generation_best_route_images = []
+        # Migrants are sent and fetched on background threads
+        self.migration_channel = MigrationChannel(
+            ip=self.ip_address,
+            port=self.port,
+            host_addresses=self.config.host_addresses,
+            timeout=self.config.migration_timeout,
+            max_queue_size=self.config.migration_queue_size,
+            problem_fingerprint=self.problem_fingerprint,
+            metrics=self.metrics,
+        )
+        self.migration_channel.start()
 
-        # for generation_no in range(self.max_generations):
-        generation_no = 0
+        generation_no = self.start_generation_no
+        self.termination_criteria.start()
+        generation_start_time = time.perf_counter()
         while True:
             self.perform_generation_operations()
 
-            if generation_no % 5 == 0:
-                self.send_best_life_via_post(generation_no)
+            generation_end_time = time.perf_counter()
+            self.publish_generation_progress(
+                generation_no,
+                1.0 / max(generation_end_time - generation_start_time, 1e-9),
+            )
+            generation_start_time = generation_end_time
+
+            self.publish_best_life(generation_no)
+            self.render_fittest_life(generation_no)
 
             # print(f"Best proxy: {self.fittest_life.fitness_proxy}")
 
             # Logic to request best lives of other flask spawns and add to
             if random.random() < 0.1:
-                gene = self.request_best_gene_from_ip_and_port()
-                self.reintroduce_life_into_population(gene)
+                self.migration_channel.request_migrant()
+            # Only take in the migrants that have already arrived
+            for migrant in self.migration_channel.drain():
+                self.reintroduce_life_into_population(
+                    migrant["gene"], migrant["fitness_proxy"], migrant["is_encoded"]
+                )
+                self.publish_progress(
+                    "migration",
+                    direction="in",
+                    generation_no=generation_no,
+                    fitness_proxy=migrant["fitness_proxy"],
+                )
+
+            # Only the copy is taken here, the file is written in the background
+            if self.checkpointer is not None and self.checkpointer.is_due(
+                generation_no
+            ):
+                self.checkpointer.save(self.capture_state(generation_no))
 
             generation_no += 1
 
-            # if generation_no % 10 == 0:
-            #     generation_best_route_images.append(self.generate_image(generation_no))
+            if self.should_stop(generation_no):
+                break
 
-        self.create_gif(generation_best_route_images)
+        stop_reason = self.termination_criteria.stop_reason
+        print(
+            f"Stopped genetic algorithm on {self.ip_address}:{self.port} after "
+            f"{generation_no} generations: {stop_reason}"
+        )
+        self.publish_progress(
+            "stopped",
+            generation_no=generation_no - 1,
+            reason=stop_reason,
+            fitness_proxy=self.get_best_fitness_proxy(),
+        )
+        if self.checkpointer is not None:
+            self.checkpointer.save(self.capture_state(generation_no - 1))
+        self.close()
+
+    def get_best_fitness_proxy(self):
+        # Without elitism fittest_life is never set, so fall back to the current generation
+        if self.fittest_life is None:
+            return self.population.get_fittest().fitness_proxy
+        return self.fittest_life.fitness_proxy
+
+    def should_stop(self, generations_run):
+        best_fitness_proxy = self.get_best_fitness_proxy()
+        # Diversity needs the whole fitness vector, so it is only read when checked
+        fitness_proxies = None
+        if self.termination_criteria.min_diversity is not None:
+            fitness_proxies = self.population.fitness_proxies()
+        return self.termination_criteria.should_stop(
+            generations_run, best_fitness_proxy, fitness_proxies
+        )
+
+    def request_stop(self):
+        self.termination_criteria.request_stop()
 
     def get_best_lives(self, no_of_lives):
         return self.population.get_best_lives(no_of_lives)
 
+    def close(self):
+        # Draw the routes still waiting and finish the animation
+        if self.route_renderer is not None:
+            self.route_renderer.close()
+            self.route_renderer = None
+        # Finish writing the latest checkpoint
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+            self.checkpointer = None
+        if self.migration_channel is not None:
+            self.migration_channel.stop()
+            self.migration_channel = None
+        # Stop the worker processes and release their shared memory
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+
     # ------------------------------------------------------------------------------------------------------
     # ------------- Code to solve TSP. Create images, effect of human interaction etc. ---------------------
     # ------------------------------------------------------------------------------------------------------
     def generate_image(self, generation_no):
+        # Imported here, so islands that never render do not load OpenCV
+        from rendering import create_cities_img, save_image
+
         # Generate an image every 10 generations
         img_shortest_route = create_cities_img(
-            self.fittest_life, human_injection=False, generation_no=generation_no
+            self.fittest_life.to_dict(),
+            human_injection=False,
+            generation_no=generation_no,
         )
-        cv2.imwrite(f"generation_{generation_no}.png", img_shortest_route)
+        save_image(img_shortest_route, f"generation_{generation_no}.png")
         return img_shortest_route
 
-    def create_gif(self, generation_best_route_images):
-        # Create a GIF from the list of images
-        file_name = str(self.fittest_life.fitness_proxy).replace(".", "-")
-        imageio.mimsave(
-            f"{file_name}.gif", generation_best_route_images, duration=0.5
-        )  # Adjust the duration as needed
-
-        # Delete all the images apart from the GIF
-        for generation in range(self.max_generations):
-            try:
-                image_filename = f"generation_{generation}.png"
-                os.remove(image_filename)
-            except FileNotFoundError:
-                pass
-
     def human_injection(self):
         """
         Method to explore the effects of human injection
         """
+        from rendering import create_cities_img, save_image
+
         life = {}
         life["gene"] = self.city_locations
         # Generate map with city locations and numbers
         blank_route = create_cities_img(life, generation_no=0, human_injection=True)
-        cv2.imwrite(f"Blank route.png", blank_route)
+        save_image(blank_route, "Blank route.png")
         # Create hash table of city indexs to coords
         city_index_ht = {}
         for index, coord in enumerate(self.city_locations):
@@ -349,68 +718,15 @@ class Darwinian_evolution:
             human_route.append(city_index_ht[index])
 
         # Introduce the human route into the population
+        if self.encode_gene is not None:
+            human_route = self.encode_gene(human_route)
         self.population.lives[0].gene = human_route
         self.population.lives[0].calculate_fitness_proxy()
+        self.population.invalidate_ordering()
 
 
-def create_cities_img(life, generation_no, human_injection, size=1800):
-    # Get the cities array from the life dictionary
-    try:
-        cities = life.gene
-    except AttributeError:
-        cities = life["gene"]
-    # Create a blank image with a white background
-    bar_height = 20
-    img_bar = np.zeros((size + bar_height, size, 3), dtype=np.uint8) + 255
-    bar = img_bar[size:, :]
-    img = img_bar[:size, :]
-
-    # Function to draw a circle for a city
-    def draw_city_circle(x, y, is_starting_city=False):
-        radius = 16 if is_starting_city else 10
-        color = (0, 255, 0) if is_starting_city else (255, 0, 0)
-        thickness = -1
-        cv2.circle(img, (x, y), radius, color, thickness)
-
-    # Function to draw a line connecting cities
-    def draw_city_line(city1, city2):
-        x1, y1 = int(city1["x"] * size), int(city1["y"] * size)
-        x2, y2 = int(city2["x"] * size), int(city2["y"] * size)
-        cv2.line(img, (x1, y1), (x2, y2), (0, 0, 255), thickness=2)  # Red lines
-
-    # Function to add city numbers next to dot
-    def add_city_numbers(x, y, city_number):
-        text = f"{city_number}"
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        org = (x, y)
-        fontScale = 1
-        color = (0, 0, 0)
-        thickness = 1
-        cv2.putText(
-            img, text, org, font, fontScale, color, thickness, cv2.LINE_AA, False
-        )
-
-    # Draw circles to represent cities
-    for index, city in enumerate(cities):
-        x, y = int(city["x"] * size), int(city["y"] * size)
-        draw_city_circle(x, y, is_starting_city=(index == 0))
-        if human_injection:
-            add_city_numbers(x, y, index)
-
-    if not human_injection:
-        # Draw lines connecting cities and mark them as circles
-        for i in range(len(cities)):
-            draw_city_line(cities[i], cities[(i + 1) % len(cities)])
-
-        # Display the distance and generation number
-        text = f"Gen: {generation_no} Distance: {round(life.fitness_proxy, 2)}"
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        org = (100, 50)
-        fontScale = 1.5
-        color = (0, 0, 0)
-        thickness = 2
-        img = cv2.putText(
-            img, text, org, font, fontScale, color, thickness, cv2.LINE_AA, False
-        )
-
-    return img_bar
+def copy_gene(gene):
+    # Snapshots must not change when the population later mutates the gene in place
+    if isinstance(gene, np.ndarray):
+        return gene.copy()
+    return list(gene)
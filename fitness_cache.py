@@ -0,0 +1,125 @@
+from collections import OrderedDict
+import numpy as np
+
+
+class FitnessCache:
+    """
+    A bounded least-recently-used cache of fitness proxies, keyed by the gene.
+
+    Survivors, the re-added elite life and children whose mutation did not fire
+    are often tours that have already been scored. Wrapping the fitness functions
+    with this cache skips those evaluations, which only pays off when scoring a gene
+    is expensive. Every lookup hashes a gene in Python, one gene at a time even for
+    the batch function, which costs more than a vectorized fitness kernel such as the
+    TSP's distance matrix lookup.
+
+    Attributes:
+    - max_size: Maximum number of fitness proxies kept.
+    - hits: Number of fitness proxies served from the cache.
+    - misses: Number of fitness proxies that had to be calculated.
+
+    Methods:
+    - wrap(): Wraps the fitness functions so they read and fill the cache.
+    - hit_rate(): Fraction of lookups served from the cache.
+    - to_prometheus(): Renders the hit and miss counters in the Prometheus text format.
+    """
+
+    def __init__(self, max_size, ga_fitness_cache_key):
+        """
+        Initialize a FitnessCache instance.
+
+        Args:
+        - max_size: Maximum number of fitness proxies kept.
+        - ga_fitness_cache_key: Function returning a hashable key of a gene. Genes describing
+          the same solution, e.g. the same tour, must share a key.
+        """
+        self.max_size = max_size
+        self.cache_key = ga_fitness_cache_key
+        self.fitness_proxies = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        fitness_proxy = self.fitness_proxies.get(key)
+        if fitness_proxy is None:
+            self.misses += 1
+            return None
+        self.fitness_proxies.move_to_end(key)
+        self.hits += 1
+        return fitness_proxy
+
+    def put(self, key, fitness_proxy):
+        self.fitness_proxies[key] = fitness_proxy
+        self.fitness_proxies.move_to_end(key)
+        if len(self.fitness_proxies) > self.max_size:
+            self.fitness_proxies.popitem(last=False)
+
+    def wrap(self, ga_calculate_fitness_proxy, ga_calculate_fitness_proxy_batch=None):
+        """
+        Wrap the fitness functions so they only calculate the fitness proxies missing from the cache.
+
+        Args:
+        - ga_calculate_fitness_proxy: Function scoring one gene.
+        - ga_calculate_fitness_proxy_batch: Optional function scoring a 2-D array of genes.
+
+        Returns:
+        - tuple: The wrapped functions, None where no function was given.
+        """
+
+        def calculate_fitness_proxy(gene):
+            key = self.cache_key(gene)
+            fitness_proxy = self.get(key)
+            if fitness_proxy is None:
+                fitness_proxy = ga_calculate_fitness_proxy(gene)
+                self.put(key, fitness_proxy)
+            return fitness_proxy
+
+        calculate_fitness_proxy_batch = None
+        if ga_calculate_fitness_proxy_batch is not None:
+
+            def calculate_fitness_proxy_batch(genes):
+                keys = [self.cache_key(gene) for gene in genes]
+                fitness_proxies = np.empty(len(genes))
+                missing = []
+                for i, key in enumerate(keys):
+                    fitness_proxy = self.get(key)
+                    if fitness_proxy is None:
+                        missing.append(i)
+                    else:
+                        fitness_proxies[i] = fitness_proxy
+                # Only the genes missing from the cache are scored, still in one batch
+                if missing:
+                    fitness_proxies[missing] = ga_calculate_fitness_proxy_batch(
+                        genes[missing]
+                    )
+                    for i in missing:
+                        self.put(keys[i], float(fitness_proxies[i]))
+                return fitness_proxies
+
+        return calculate_fitness_proxy, calculate_fitness_proxy_batch
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_prometheus(self, labels=None):
+        label_text = ",".join(
+            f'{key}="{value}"' for key, value in (labels or {}).items()
+        )
+        label_text = f"{{{label_text}}}" if label_text else ""
+        return (
+            "\n".join(
+                [
+                    "# HELP ga_fitness_cache_hits_total Fitness proxies served from the cache.",
+                    "# TYPE ga_fitness_cache_hits_total counter",
+                    f"ga_fitness_cache_hits_total{label_text} {self.hits}",
+                    "# HELP ga_fitness_cache_misses_total Fitness proxies calculated on a cache miss.",
+                    "# TYPE ga_fitness_cache_misses_total counter",
+                    f"ga_fitness_cache_misses_total{label_text} {self.misses}",
+                    "# HELP ga_fitness_cache_size Fitness proxies held in the cache.",
+                    "# TYPE ga_fitness_cache_size gauge",
+                    f"ga_fitness_cache_size{label_text} {len(self.fitness_proxies)}",
+                ]
+            )
+            + "\n"
+        )
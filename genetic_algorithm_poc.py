@@ -1,9 +1,16 @@
+import hashlib
 import numpy as np
 import random
 import math
+from functools import partial
 from typing import Type
 from life import Life
-from darwinian_evolution import Darwinian_evolution
+from config import random_cities
+from crossover import crossover, crossover_batch, random_cross_over_points
+from mutation import mutate, mutate_batch
+from local_search import improve_route, matrix_distance, nearest_neighbour_lists
+from migrant_codec import problem_fingerprint
+from problems import Problem, register_problem
 
 # Initialize parameters required for the project
 NO_OF_LIVES = 700
@@ -11,7 +18,8 @@ MAX_GENERATIONS = 501
 MUTATION_RATE = 0.085
 MAXIMISE_FITNESS_PROXY = False
 ELITISM = True
-# 't_s' tournament selection, 'r_s' rank selection
+# 't_s' tournament selection, 'r_s' rank selection, 'rw_s' roulette wheel
+# selection, 'sus' stochastic universal sampling
 SELECTION_METHOD = "r_s"
 SURVIVOR_RATE = 0.5  # 350 survivors
 CHILD_PROCREATION_RATE = 1  # Based on number of survivors
@@ -20,23 +28,105 @@ CHILD_PROCREATION_RATE = 1  # Based on number of survivors
 NO_OF_CITIES = 75
 
 # Define what needs to be optimized - this represents the life's gene
-cities = []
-np.random.seed(seed=0)
-for _ in range(NO_OF_CITIES):
-    cities.append(dict(x=np.random.rand(), y=np.random.rand()))
+cities = random_cities(NO_OF_CITIES)
 
 
-def ga_calculate_fitness_proxy(gene):
+def build_distance_matrix(cities: list) -> np.ndarray:
+    """
+    Build the N x N matrix of euclidean distances between every pair of cities.
+
+    Args:
+    - cities: List of cities, each a dict with "x" and "y" coordinates.
+
+    Returns:
+    - np.ndarray: distance_matrix[i, j] is the distance from city i to city j.
+    """
+    coords = np.array([[city["x"], city["y"]] for city in cities])
+    deltas = coords[:, np.newaxis, :] - coords[np.newaxis, :, :]
+    return np.sqrt((deltas**2).sum(axis=-1))
+
+
+# Permutation genes store a route as indices into cities, scored against a
+# distance matrix that is built once for the problem. These are the defaults of
+# the module level functions, create_tsp_problem binds them to Config.cities
+city_indices = np.arange(NO_OF_CITIES, dtype=np.int32)
+distance_matrix = build_distance_matrix(cities)
+city_index_lookup = {(city["x"], city["y"]): index for index, city in enumerate(cities)}
+
+
+def load_cities(new_cities: list) -> None:
+    """
+    Replace the module's cities, rebuilding the distance matrix and city lookups the
+    module level functions default to, e.g. for benchmarks at other sizes. Islands
+    solve Config.cities instead.
+
+    Args:
+    - new_cities: List of cities, each a dict with "x" and "y" coordinates. The first is the home city.
+    """
+    global cities, city_indices, distance_matrix, city_index_lookup
+    cities = new_cities
+    city_indices = np.arange(len(cities), dtype=np.int32)
+    distance_matrix = build_distance_matrix(cities)
+    city_index_lookup = {
+        (city["x"], city["y"]): index for index, city in enumerate(cities)
+    }
+
+
+def ga_encode_gene(gene, city_index_lookup: dict = None) -> np.ndarray:
+    """
+    Convert a gene of city dicts into a permutation of city indices.
+
+    Args:
+    - gene: List of city dicts, or a permutation which is returned unchanged.
+    - city_index_lookup: Index of each city by its (x, y) coordinates. Defaults to the module's cities.
+
+    Returns:
+    - np.ndarray: int32 permutation of city indices.
+    """
+    if isinstance(gene, np.ndarray):
+        return gene
+    if city_index_lookup is None:
+        city_index_lookup = globals()["city_index_lookup"]
+    return np.array(
+        [city_index_lookup[(city["x"], city["y"])] for city in gene], dtype=np.int32
+    )
+
+
+def ga_decode_gene(gene, cities: list = None) -> list:
+    """
+    Convert a permutation of city indices back into a list of city dicts.
+
+    Args:
+    - gene: Permutation of city indices, or a list of city dicts which is returned unchanged.
+    - cities: List of cities the indices refer to. Defaults to the module's cities.
+
+    Returns:
+    - list: The route as a list of city dicts.
+    """
+    if isinstance(gene, np.ndarray):
+        if cities is None:
+            cities = globals()["cities"]
+        return [cities[index] for index in gene]
+    return gene
+
+
+def ga_calculate_fitness_proxy(gene, distance_matrix: np.ndarray = None):
     """
     Calculate the fitness proxy, which is used to determine the fitness of a solution.
     In this case, we want to minimize the total distance traveled.
 
     Args:
-    - gene: List of cities (gene) representing the route.
+    - gene: List of cities (gene) representing the route, or a permutation of city indices.
+    - distance_matrix: Distance matrix permutations are scored against. Defaults to the module's cities.
 
     Returns:
     - float: The calculated distance, which is the fitness proxy.
     """
+    if isinstance(gene, np.ndarray):
+        if distance_matrix is None:
+            distance_matrix = globals()["distance_matrix"]
+        return float(distance_matrix[gene[:-1], gene[1:]].sum())
+
     cities = gene
     distance = 0
     for index, city in enumerate(cities):
@@ -49,49 +139,89 @@ def ga_calculate_fitness_proxy(gene):
     return distance
 
 
-def ga_procreation(parent_1: Type[Life], parent_2: Type[Life]):
+def ga_calculate_fitness_proxy_batch(
+    genes: np.ndarray, distance_matrix: np.ndarray = None
+) -> np.ndarray:
+    """
+    Calculate the fitness proxy of a whole population of permutation genes at once.
+
+    Args:
+    - genes: 2-D array with one permutation of city indices per row.
+    - distance_matrix: Distance matrix to score against, e.g. a shared memory copy in a worker process.
+      Defaults to the problem's distance matrix.
+
+    Returns:
+    - np.ndarray: The distance travelled by each route.
+    """
+    if distance_matrix is None:
+        distance_matrix = globals()["distance_matrix"]
+    return distance_matrix[genes[:, :-1], genes[:, 1:]].sum(axis=1)
+
+
+def ga_procreation(
+    parent_1: Type[Life], parent_2: Type[Life], crossover_method: str = "ox"
+):
     """
     Specify how child is procreted.
 
     Args:
     - parent_1: Life object.
     - parent_2: Life object
+    - crossover_method: 'ox', 'pmx', 'cx' or 'erx' for permutation genes. City genes always use 'ox'.
 
     Returns:
-    - child: Life object representing offspring.
+    - child: Life object representing offspring. Its fitness proxy is calculated when first read.
     """
-    # Order crossover
+    if isinstance(parent_1.gene, np.ndarray):
+        child_gene = crossover(parent_1.gene, parent_2.gene, crossover_method)
+    else:
+        # Order crossover
+        cross_over_start, cross_over_end = random_cross_over_points(len(parent_1.gene))
+        inherited = parent_1.gene[cross_over_start:cross_over_end]
+        inherited_cities = {(city["x"], city["y"]) for city in inherited}
+        remaining = [
+            city
+            for city in parent_2.gene
+            if (city["x"], city["y"]) not in inherited_cities
+        ]
+        child_gene = (
+            remaining[:cross_over_start] + inherited + remaining[cross_over_start:]
+        )
+
+    # The child's gene is known, so skip generating a random one. It takes the
+    # parent's functions, which the island may have wrapped, e.g. with a fitness cache
     child = Life(
-        gene=cities,
-        ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
-        ga_generate_random_life=ga_generate_random_life,
-        ga_mutation=ga_mutation,
+        gene=child_gene,
+        ga_calculate_fitness_proxy=parent_1.calculate_fitness_proxy_func,
+        ga_generate_random_life=parent_1.generate_random_life,
+        ga_mutation=parent_1.calculate_mutation,
+        ga_decode_gene=parent_1.decode_gene,
+        randomise=False,
+        ga_mutation_with_delta=parent_1.calculate_mutation_with_delta,
     )
 
-    child.gene = [-1] * len(parent_1.gene)
-
-    cross_over_start = random.randint(1, len(parent_1.gene) - 1)
-    cross_over_end = random.randint(1, len(parent_1.gene) - 1)
-
-    if cross_over_start > cross_over_end:
-        cross_over_start, cross_over_end = cross_over_end, cross_over_start
+    return child
 
-    child_gene_lst = []
 
-    for i in range(cross_over_start, cross_over_end):
-        child.gene[i] = parent_1.gene[i]
-        child_gene_lst.append(parent_1.gene[i])
+def ga_procreation_batch(
+    genes: np.ndarray,
+    parent_1_indices: np.ndarray,
+    parent_2_indices: np.ndarray,
+    crossover_method: str = "ox",
+) -> np.ndarray:
+    """
+    Specify how all children of a generation are procreated at once.
 
-    for i, chromosome in enumerate(child.gene):
-        if chromosome == -1:
-            for gene in parent_2.gene:
-                if gene not in child_gene_lst:
-                    child.gene[i] = gene
-                    child_gene_lst.append(gene)
-                    break
-    child.calculate_fitness_proxy()
+    Args:
+    - genes: 2-D array with one permutation gene per row.
+    - parent_1_indices: Row of genes used as the first parent of each child.
+    - parent_2_indices: Row of genes used as the second parent of each child.
+    - crossover_method: 'ox', 'pmx', 'cx' or 'erx'.
 
-    return child
+    Returns:
+    - np.ndarray: 2-D array with one child permutation per row.
+    """
+    return crossover_batch(genes, parent_1_indices, parent_2_indices, crossover_method)
 
 
 def ga_mutation(child_gene: list) -> list:
@@ -99,7 +229,7 @@ def ga_mutation(child_gene: list) -> list:
     Specify how a child's gene is mutated.
 
     Args:
-    - child_gene: The gene of a child.
+    - child_gene: The gene of a child, either a list of cities or a permutation.
 
     Returns:
     - child_gene: The mutated gene of the child.
@@ -112,6 +242,12 @@ def ga_mutation(child_gene: list) -> list:
         if cross_over_start > cross_over_end:
             cross_over_start, cross_over_end = cross_over_end, cross_over_start
 
+        if isinstance(child_gene, np.ndarray):
+            child_gene[cross_over_start:cross_over_end] = child_gene[
+                cross_over_start:cross_over_end
+            ][::-1].copy()
+            return child_gene
+
         chromosomes_to_swap = []
         for i in range(cross_over_start, cross_over_end):
             chromosomes_to_swap.append(child_gene[i])
@@ -123,6 +259,71 @@ def ga_mutation(child_gene: list) -> list:
     return child_gene
 
 
+def ga_mutation_with_delta(
+    child_gene, mutation_operator: str = "inversion", distance_matrix: np.ndarray = None
+):
+    """
+    Specify how a child's gene is mutated, also reporting the change in fitness proxy.
+
+    Args:
+    - child_gene: The gene of a child.
+    - mutation_operator: 'inversion', 'swap', 'insertion' or 'scramble' for permutation genes.
+    - distance_matrix: Distance matrix the change is calculated with. Defaults to the module's cities.
+
+    Returns:
+    - tuple: The mutated gene and the change in fitness proxy, or None if it is not known.
+    """
+    if not isinstance(child_gene, np.ndarray):
+        return ga_mutation(child_gene), None
+    if distance_matrix is None:
+        distance_matrix = globals()["distance_matrix"]
+    if random.random() < MUTATION_RATE:
+        return child_gene, mutate(child_gene, distance_matrix, mutation_operator)
+    return child_gene, 0.0
+
+
+def ga_mutation_batch(
+    genes: np.ndarray,
+    mutation_operator: str = "inversion",
+    distance_matrix: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Specify how all children of a generation are mutated at once.
+
+    Args:
+    - genes: 2-D array with one permutation gene per row, mutated in place.
+    - mutation_operator: 'inversion', 'swap', 'insertion' or 'scramble'.
+    - distance_matrix: Distance matrix the changes are calculated with. Defaults to the module's cities.
+
+    Returns:
+    - np.ndarray: The change in fitness proxy of every row, 0 for rows that did not mutate.
+    """
+    if distance_matrix is None:
+        distance_matrix = globals()["distance_matrix"]
+    return mutate_batch(genes, distance_matrix, MUTATION_RATE, mutation_operator)
+
+
+def ga_fitness_cache_key(gene):
+    """
+    Specify the key a gene's fitness proxy is cached under.
+
+    Routes are open paths that always start at the home city, so a route is already
+    in canonical form. A reversed route has the same length, but it is not a valid
+    gene, as it would move the home city to the end. A rotation would move it too.
+
+    Args:
+    - gene: List of cities (gene) representing the route, or a permutation of city indices.
+
+    Returns:
+    - Hashable key: A 16 byte digest of a permutation, or a tuple of city coordinates.
+    """
+    if isinstance(gene, np.ndarray):
+        return hashlib.blake2b(
+            np.ascontiguousarray(gene, dtype=np.int32).tobytes(), digest_size=16
+        ).digest()
+    return tuple((city["x"], city["y"]) for city in gene)
+
+
 def ga_generate_random_life(gene: list) -> list:
     """
     Specify how life's gene is randomized.
@@ -133,6 +334,12 @@ def ga_generate_random_life(gene: list) -> list:
     Returns:
     - gene: The randomized gene of a Life object.
     """
+    if isinstance(gene, np.ndarray):
+        # Keep the home city in place and shuffle the rest of the permutation
+        permutation = gene.copy()
+        np.random.shuffle(permutation[1:])
+        return permutation
+
     cities = gene
     home_city = [cities[0]]
     remaining_cities = cities[1:]
@@ -142,6 +349,103 @@ def ga_generate_random_life(gene: list) -> list:
     return cities
 
 
+def ga_generate_random_lives(gene: np.ndarray, no_of_lives: int) -> np.ndarray:
+    """
+    Specify how the genes of a whole random population are generated at once.
+
+    Args:
+    - gene: Permutation of city indices. The home city stays first.
+    - no_of_lives: Number of genes to generate.
+
+    Returns:
+    - np.ndarray: 2-D array with one random permutation per row.
+    """
+    # Sorting random keys shuffles every row independently
+    orders = np.argsort(np.random.random((no_of_lives, len(gene) - 1)), axis=1)
+    genes = np.empty((no_of_lives, len(gene)), dtype=gene.dtype)
+    genes[:, 0] = gene[0]
+    genes[:, 1:] = gene[1:][orders]
+    return genes
+
+
+@register_problem("tsp")
+def create_tsp_problem(config) -> Problem:
+    """
+    Build the TSP with the gene representation and operators chosen in Config.
+
+    Args:
+    - config: Config instance.
+
+    Returns:
+    - Problem: The TSP over Config.cities.
+    """
+    gene = config.cities
+    ga_calculate_fitness_proxy_func = ga_calculate_fitness_proxy
+    kernels = {}
+    if config.gene_representation == "permutation":
+        gene = config.city_indices
+        # The functions are bound to the Config's cities, whatever their number
+        distance_matrix = build_distance_matrix(config.cities)
+        ga_calculate_fitness_proxy_func = partial(
+            ga_calculate_fitness_proxy, distance_matrix=distance_matrix
+        )
+        kernels = dict(
+            gene_min=0,
+            gene_max=len(config.city_indices) - 1,
+            ga_encode_gene=partial(
+                ga_encode_gene,
+                city_index_lookup={
+                    (city["x"], city["y"]): index
+                    for index, city in enumerate(config.cities)
+                },
+            ),
+            ga_decode_gene=partial(ga_decode_gene, cities=config.cities),
+            ga_generate_random_lives=ga_generate_random_lives,
+            ga_mutation_batch=partial(
+                ga_mutation_batch,
+                mutation_operator=config.mutation_operator,
+                distance_matrix=distance_matrix,
+            ),
+            ga_mutation_with_delta=partial(
+                ga_mutation_with_delta,
+                mutation_operator=config.mutation_operator,
+                distance_matrix=distance_matrix,
+            ),
+            ga_local_search=partial(
+                improve_route,
+                distance=matrix_distance(distance_matrix),
+                neighbours=nearest_neighbour_lists(
+                    distance_matrix, config.no_of_neighbours
+                ),
+            ),
+            # Passed to the batch fitness kernel, in the island and in its workers
+            shared_arrays={"distance_matrix": distance_matrix},
+            problem_fingerprint=problem_fingerprint(distance_matrix),
+        )
+        # Batch kernels need genes that stack into a 2-D array
+        if config.batch_fitness:
+            kernels["ga_calculate_fitness_proxy_batch"] = (
+                ga_calculate_fitness_proxy_batch
+            )
+        if config.batch_procreation:
+            kernels["ga_procreation_batch"] = partial(
+                ga_procreation_batch, crossover_method=config.crossover_method
+            )
+    return Problem(
+        name="tsp",
+        gene=gene,
+        maximise_fitness_proxy=config.maximise_fitness_proxy,
+        ga_calculate_fitness_proxy=ga_calculate_fitness_proxy_func,
+        ga_generate_random_life=ga_generate_random_life,
+        ga_procreation=partial(
+            ga_procreation, crossover_method=config.crossover_method
+        ),
+        ga_mutation=ga_mutation,
+        ga_fitness_cache_key=ga_fitness_cache_key,
+        **kernels,
+    )
+
+
 # if __name__ == "__main__":
 #     np.random.seed(seed=0)
 
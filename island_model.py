@@ -0,0 +1,240 @@
+import multiprocessing
+import queue
+import random
+import time
+import numpy as np
+from config import Config
+
+# 'ring' sends to the next island, 'fully_connected' to every other island,
+# 'random' to one randomly chosen island per migration
+MIGRATION_TOPOLOGIES = ("ring", "fully_connected", "random")
+# Seconds between checks that the islands are still alive while waiting for their results
+RESULT_POLL_INTERVAL = 1.0
+
+
+def migration_destinations(topology, island_no, no_of_islands):
+    """
+    Choose the islands that receive migrants from an island.
+
+    Args:
+    - topology: 'ring', 'fully_connected' or 'random'.
+    - island_no: Index of the sending island.
+    - no_of_islands: Total number of islands.
+
+    Returns:
+    - list: Indices of the receiving islands.
+    """
+    if no_of_islands < 2:
+        return []
+    if topology == "ring":
+        return [(island_no + 1) % no_of_islands]
+    other_islands = [i for i in range(no_of_islands) if i != island_no]
+    if topology == "fully_connected":
+        return other_islands
+    if topology == "random":
+        return [random.choice(other_islands)]
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def run_island(
+    island_no,
+    no_of_islands,
+    inboxes,
+    results,
+    config,
+    no_of_generations,
+    migration_interval,
+    no_of_migrants,
+    topology,
+    seed,
+):
+    """
+    Evolve one island in its own process, exchanging migrants with the other islands through queues.
+
+    Args:
+    - island_no: Index of this island.
+    - no_of_islands: Total number of islands.
+    - inboxes: One queue per island that receives its migrants.
+    - results: Queue the island's final best life is put on.
+    - config: Config instance the island is built from.
+    - no_of_generations: Number of generations to run.
+    - migration_interval: Send migrants every this many generations.
+    - no_of_migrants: Number of best lives sent per exchange.
+    - topology: 'ring', 'fully_connected' or 'random'.
+    - seed: Optional base seed. Each island is seeded with seed + island_no.
+    """
+    # Imported here so the parent process only loads the problem when it needs it
+    from problems import create_darwinian_evolution, get_problem
+
+    # Loaded first, so nothing the problem's module does on import touches the seeds
+    problem = get_problem(config.problem, config)
+    # Seeded before the island is built, so every island starts from its own population
+    island_seed = None if seed is None else seed + island_no
+    np.random.seed(island_seed)
+    random.seed(island_seed)
+    darwinian_evolution = create_darwinian_evolution(
+        config=config, ip=f"island_{island_no}", port=None, problem=problem
+    )
+    # The island model's own generation count takes the place of Config's
+    darwinian_evolution.termination_criteria.max_generations = no_of_generations
+
+    start_time = time.time()
+    darwinian_evolution.termination_criteria.start()
+    generation_no = 0
+    while True:
+        darwinian_evolution.perform_generation_operations()
+
+        # Take in whatever migrants have already arrived, without waiting
+        while True:
+            try:
+                migrants = inboxes[island_no].get_nowait()
+            except queue.Empty:
+                break
+            darwinian_evolution.population.reintroduce_best_lives(migrants)
+
+        if migration_interval and (generation_no + 1) % migration_interval == 0:
+            migrants = [
+                {"gene": life.gene, "fitness_proxy": life.fitness_proxy}
+                for life in darwinian_evolution.get_best_lives(no_of_migrants)
+            ]
+            for destination in migration_destinations(
+                topology, island_no, no_of_islands
+            ):
+                inboxes[destination].put(migrants)
+
+        generation_no += 1
+        if darwinian_evolution.should_stop(generation_no):
+            break
+
+    fittest_life = darwinian_evolution.fittest_life.to_dict()
+    results.put(
+        {
+            "island_no": island_no,
+            "best_gene": fittest_life["gene"],
+            "best_fitness_proxy": fittest_life["fitness_proxy"],
+            "generation_no": generation_no,
+            "stop_reason": darwinian_evolution.termination_criteria.stop_reason,
+            "run_time": time.time() - start_time,
+        }
+    )
+    darwinian_evolution.close()
+    # Migrants still queued for islands that have finished can be dropped
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+
+class IslandModel:
+    """
+    Runs several Darwinian_evolution islands on one machine, one process each,
+    with migration through multiprocessing queues instead of Flask and HTTP.
+
+    Attributes:
+    - no_of_islands: Number of islands.
+    - no_of_generations: Number of generations each island runs.
+    - migration_interval: Islands send migrants every this many generations.
+    - no_of_migrants: Number of best lives sent per exchange.
+    - topology: 'ring', 'fully_connected' or 'random'.
+
+    Methods:
+    - run(): Runs all islands and returns their best lives, best first.
+    """
+
+    def __init__(
+        self,
+        config,
+        no_of_islands,
+        no_of_generations,
+        migration_interval,
+        no_of_migrants,
+        topology="ring",
+        seed=None,
+    ):
+        """
+        Initialize an IslandModel instance.
+
+        Args:
+        - config: Config instance the islands are built from.
+        - no_of_islands: Number of islands.
+        - no_of_generations: Number of generations each island runs.
+        - migration_interval: Islands send migrants every this many generations. 0 disables migration.
+        - no_of_migrants: Number of best lives sent per exchange.
+        - topology: 'ring', 'fully_connected' or 'random'.
+        - seed: Optional base seed, making runs reproducible.
+        """
+        if topology not in MIGRATION_TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology: {topology}")
+        self.config = config
+        self.no_of_islands = no_of_islands
+        self.no_of_generations = no_of_generations
+        self.migration_interval = migration_interval
+        self.no_of_migrants = no_of_migrants
+        self.topology = topology
+        self.seed = seed
+
+    def run(self):
+        context = multiprocessing.get_context("spawn")
+        inboxes = [context.Queue() for _ in range(self.no_of_islands)]
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=run_island,
+                args=(
+                    island_no,
+                    self.no_of_islands,
+                    inboxes,
+                    results,
+                    self.config,
+                    self.no_of_generations,
+                    self.migration_interval,
+                    self.no_of_migrants,
+                    self.topology,
+                    self.seed,
+                ),
+            )
+            for island_no in range(self.no_of_islands)
+        ]
+        for process in processes:
+            process.start()
+        island_results = []
+        while len(island_results) < len(processes):
+            try:
+                island_results.append(results.get(timeout=RESULT_POLL_INTERVAL))
+            except queue.Empty:
+                # An island that died before reporting would otherwise be waited on forever
+                if any(process.exitcode not in (None, 0) for process in processes) or (
+                    not any(process.is_alive() for process in processes)
+                ):
+                    for process in processes:
+                        process.terminate()
+                    raise RuntimeError(
+                        "Island processes exited before reporting their results, exit codes: "
+                        f"{[process.exitcode for process in processes]}"
+                    )
+        for process in processes:
+            process.join()
+        from problems import get_problem
+
+        problem = get_problem(self.config.problem, self.config)
+        return sorted(
+            island_results,
+            key=lambda x: x["best_fitness_proxy"],
+            reverse=problem.maximise_fitness_proxy,
+        )
+
+
+if __name__ == "__main__":
+    config = Config()
+    island_model = IslandModel(
+        config=config,
+        no_of_islands=config.no_of_islands,
+        no_of_generations=config.max_generations,
+        migration_interval=config.migration_interval,
+        no_of_migrants=config.no_of_migrants,
+        topology=config.migration_topology,
+    )
+    for result in island_model.run():
+        print(
+            f"Island {result['island_no']}: {result['best_fitness_proxy']} "
+            f"after {result['generation_no']} generations in {result['run_time']:.1f}s "
+            f"({result['stop_reason']})"
+        )
@@ -0,0 +1,206 @@
+import numpy as np
+from functools import partial
+from life import Life
+from migrant_codec import problem_fingerprint
+from problems import Problem, register_problem
+
+# The 0/1 knapsack problem: pick the items of the largest total value whose total
+# weight fits the capacity. A gene holds one 0/1 value per item.
+# Filled in by load_items, the arrays are also shared with worker processes.
+weights = np.empty(0)
+values = np.empty(0)
+capacity = np.zeros(1)
+
+
+def load_items(new_weights, new_values, new_capacity) -> None:
+    """
+    Replace the items and capacity of the problem.
+
+    Args:
+    - new_weights: Weight of each item.
+    - new_values: Value of each item.
+    - new_capacity: Largest total weight a solution may hold.
+    """
+    global weights, values, capacity
+    weights = np.asarray(new_weights, dtype=float)
+    values = np.asarray(new_values, dtype=float)
+    capacity = np.array([new_capacity], dtype=float)
+
+
+def ga_calculate_fitness_proxy_batch(
+    genes: np.ndarray,
+    weights: np.ndarray = None,
+    values: np.ndarray = None,
+    capacity: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Calculate the fitness proxy of a whole population at once: the total value,
+    less a penalty for any weight over the capacity.
+
+    Args:
+    - genes: 2-D array with one 0/1 value per item in each row.
+    - weights: Weight of each item. Defaults to the problem's items.
+    - values: Value of each item. Defaults to the problem's items.
+    - capacity: 1 element array holding the capacity. Defaults to the problem's capacity.
+
+    Returns:
+    - np.ndarray: The fitness proxy of each gene.
+    """
+    if weights is None:
+        weights, values, capacity = (
+            globals()["weights"],
+            globals()["values"],
+            globals()["capacity"],
+        )
+    total_values = genes @ values
+    overweight = np.maximum(genes @ weights - capacity[0], 0.0)
+    # Steeper than the best value per weight, so no overweight solution beats a feasible one
+    penalty = (values / weights).max() * 2
+    return total_values - penalty * overweight
+
+
+def ga_calculate_fitness_proxy(gene):
+    return float(ga_calculate_fitness_proxy_batch(np.asarray(gene)[np.newaxis])[0])
+
+
+def ga_generate_random_lives(gene: np.ndarray, no_of_lives: int) -> np.ndarray:
+    """
+    Specify how the genes of a whole random population are generated at once.
+
+    Args:
+    - gene: Template gene, giving the number of items and the dtype.
+    - no_of_lives: Number of genes to generate.
+
+    Returns:
+    - np.ndarray: 2-D array of random genes, expected to weigh about the capacity.
+    """
+    fill_rate = min(capacity[0] / weights.sum(), 1.0)
+    return (np.random.random((no_of_lives, len(gene))) < fill_rate).astype(gene.dtype)
+
+
+def ga_generate_random_life(gene: np.ndarray) -> np.ndarray:
+    return ga_generate_random_lives(gene, 1)[0]
+
+
+def ga_procreation_batch(
+    genes: np.ndarray, parent_1_indices: np.ndarray, parent_2_indices: np.ndarray
+) -> np.ndarray:
+    """
+    Specify how all children of a generation are procreated at once, with uniform crossover.
+
+    Args:
+    - genes: 2-D array with one gene per row.
+    - parent_1_indices: Row of genes used as the first parent of each child.
+    - parent_2_indices: Row of genes used as the second parent of each child.
+
+    Returns:
+    - np.ndarray: 2-D array with one child gene per row.
+    """
+    from_parent_1 = np.random.random((len(parent_1_indices), genes.shape[1])) < 0.5
+    return np.where(
+        from_parent_1, genes[parent_1_indices], genes[parent_2_indices]
+    ).astype(genes.dtype)
+
+
+def ga_mutation_batch(genes: np.ndarray, mutation_rate: float) -> np.ndarray:
+    """
+    Specify how all children of a generation are mutated at once. Each child flips
+    one random item with probability mutation_rate.
+
+    Args:
+    - genes: 2-D array with one gene per row, mutated in place.
+    - mutation_rate: Probability that a child mutates.
+
+    Returns:
+    - np.ndarray: The change in fitness proxy of every row, NaN for the mutated rows.
+    """
+    fitness_deltas = np.zeros(len(genes))
+    rows = np.flatnonzero(np.random.random(len(genes)) < mutation_rate)
+    items = np.random.randint(genes.shape[1], size=len(rows))
+    genes[rows, items] ^= 1
+    # The penalty makes the change depend on the whole gene, so mutated rows are scored again
+    fitness_deltas[rows] = np.nan
+    return fitness_deltas
+
+
+def ga_mutation(gene: np.ndarray, mutation_rate: float) -> np.ndarray:
+    ga_mutation_batch(gene[np.newaxis], mutation_rate)
+    # gene[np.newaxis] is a view, so the flip already happened in gene
+    return gene
+
+
+def ga_procreation(parent_1: Life, parent_2: Life) -> Life:
+    """
+    Specify how a child is procreated, with uniform crossover.
+
+    Args:
+    - parent_1: Life object.
+    - parent_2: Life object.
+
+    Returns:
+    - child: Life object representing offspring. Its fitness proxy is calculated when first read.
+    """
+    child_gene = ga_procreation_batch(
+        np.stack([parent_1.gene, parent_2.gene]), np.array([0]), np.array([1])
+    )[0]
+    # The child takes the parents' functions, including their mutation rate
+    return Life(
+        gene=child_gene,
+        ga_calculate_fitness_proxy=parent_1.calculate_fitness_proxy_func,
+        ga_generate_random_life=parent_1.generate_random_life,
+        ga_mutation=parent_1.calculate_mutation,
+        ga_decode_gene=parent_1.decode_gene,
+        randomise=False,
+    )
+
+
+def ga_encode_gene(gene) -> np.ndarray:
+    return np.asarray(gene, dtype=np.uint8)
+
+
+def ga_decode_gene(gene) -> list:
+    # Migrants and the dashboard exchange genes as JSON lists
+    return np.asarray(gene).tolist()
+
+
+@register_problem("knapsack")
+def create_knapsack_problem(config) -> Problem:
+    """
+    Build a random 0/1 knapsack problem from the sizes chosen in Config.
+
+    Args:
+    - config: Config instance.
+
+    Returns:
+    - Problem: The knapsack problem.
+    """
+    random_state = np.random.RandomState(config.knapsack_seed)
+    item_weights = random_state.uniform(1.0, 10.0, config.no_of_items)
+    # Values loosely follow the weights, so picking items by value per weight is not trivial
+    item_values = item_weights + random_state.uniform(0.0, 5.0, config.no_of_items)
+    load_items(
+        item_weights,
+        item_values,
+        item_weights.sum() * config.knapsack_capacity_rate,
+    )
+    return Problem(
+        name="knapsack",
+        gene=np.zeros(config.no_of_items, dtype=np.uint8),
+        gene_min=0,
+        gene_max=1,
+        maximise_fitness_proxy=True,
+        ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
+        ga_generate_random_life=ga_generate_random_life,
+        ga_procreation=ga_procreation,
+        ga_mutation=partial(ga_mutation, mutation_rate=config.mutation_rate),
+        ga_calculate_fitness_proxy_batch=ga_calculate_fitness_proxy_batch,
+        ga_procreation_batch=ga_procreation_batch,
+        ga_mutation_batch=partial(
+            ga_mutation_batch, mutation_rate=config.mutation_rate
+        ),
+        ga_generate_random_lives=ga_generate_random_lives,
+        ga_encode_gene=ga_encode_gene,
+        ga_decode_gene=ga_decode_gene,
+        shared_arrays={"weights": weights, "values": values, "capacity": capacity},
+        problem_fingerprint=problem_fingerprint(weights, values, capacity),
+    )
@@ -0,0 +1,339 @@
+import numpy as np
+from functools import partial
+from typing import Type
+from life import Life
+from crossover import crossover, crossover_batch
+from mutation import neighbour_inversion_batch
+from local_search import improve_route, coordinate_distance
+from migrant_codec import problem_fingerprint
+from problems import Problem, register_problem
+from tsplib import load_tsplib
+
+# The TSP for thousands of cities. Nothing of size N x N is ever built: distances
+# are calculated from the coordinates when needed, and mutations only join a city
+# to one of its nearest neighbours. Memory grows linearly with the number of cities.
+# Filled in by load_coordinates, the coordinates are also shared with worker processes.
+coordinates = np.empty((0, 2))
+neighbours = np.empty((0, 0), dtype=np.int32)
+# Values held in memory at once while scoring, generating or searching for the
+# neighbours of routes
+CHUNK_SIZE = 1 << 20
+
+
+class CoordinateDistances:
+    """
+    Distance matrix look-alike that calculates Euclidean distances on demand.
+
+    distances[a, b] returns the distance between cities a and b, element-wise for
+    arrays of cities, so operators written against a distance matrix work unchanged.
+
+    Attributes:
+    - coordinates: N x 2 array of city coordinates.
+    """
+
+    def __init__(self, coordinates):
+        self.coordinates = coordinates
+
+    def __getitem__(self, cities):
+        city_1, city_2 = cities
+        deltas = self.coordinates[city_1] - self.coordinates[city_2]
+        return np.sqrt((deltas**2).sum(axis=-1))
+
+
+distances = CoordinateDistances(coordinates)
+
+
+def nearest_neighbours(coordinates, no_of_neighbours):
+    """
+    Find the nearest cities of every city with a uniform grid.
+
+    The cities are bucketed into square cells holding about no_of_neighbours cities
+    each, and every city only measures the cities of the cells around its own. The
+    window of cells grows until no city outside it can be nearer than the ones found,
+    so the result is exact. Uniformly spread cities take O(N k) time and memory.
+
+    Args:
+    - coordinates: N x 2 array of city coordinates.
+    - no_of_neighbours: Number of neighbours kept per city.
+
+    Returns:
+    - np.ndarray: N x no_of_neighbours array of city indices, nearest first.
+    """
+    no_of_cities = len(coordinates)
+    no_of_neighbours = min(no_of_neighbours, no_of_cities - 1)
+    neighbour_lists = np.empty((no_of_cities, max(no_of_neighbours, 0)), dtype=np.int32)
+    if no_of_neighbours <= 0:
+        return neighbour_lists
+
+    origin = coordinates.min(axis=0)
+    cells_per_side = max(int(np.sqrt(no_of_cities / no_of_neighbours)), 1)
+    cell_size = max(np.ptp(coordinates, axis=0).max() / cells_per_side, 1e-12)
+    cell_columns, cell_rows = np.minimum(
+        ((coordinates - origin) / cell_size).astype(np.int64), cells_per_side - 1
+    ).T
+    # Sorted by cell, a column of cells in the window is one contiguous slice
+    cell_ids = cell_columns * cells_per_side + cell_rows
+    order = np.argsort(cell_ids, kind="stable")
+    cell_starts = np.searchsorted(
+        cell_ids[order], np.arange(cells_per_side * cells_per_side + 1)
+    )
+
+    for cell_id in np.unique(cell_ids):
+        queries = order[cell_starts[cell_id] : cell_starts[cell_id + 1]]
+        column, row = divmod(int(cell_id), cells_per_side)
+        radius = 1
+        while True:
+            first_column, last_column = max(column - radius, 0), min(
+                column + radius, cells_per_side - 1
+            )
+            first_row, last_row = max(row - radius, 0), min(
+                row + radius, cells_per_side - 1
+            )
+            candidates = np.concatenate(
+                [
+                    order[
+                        cell_starts[
+                            window_column * cells_per_side + first_row
+                        ] : cell_starts[window_column * cells_per_side + last_row + 1]
+                    ]
+                    for window_column in range(first_column, last_column + 1)
+                ]
+            )
+            covers_grid = (
+                first_column == 0
+                and first_row == 0
+                and last_column == cells_per_side - 1
+                and last_row == cells_per_side - 1
+            )
+            if len(candidates) <= no_of_neighbours and not covers_grid:
+                radius += 1
+                continue
+            nearest, nearest_distances = nearest_candidates(
+                coordinates, queries, candidates, no_of_neighbours
+            )
+            # Distance from each city to the nearest edge of the window, beyond
+            # which a city could still be nearer. Edges of the grid are not limits
+            lows = origin + cell_size * np.array([first_column, first_row])
+            highs = origin + cell_size * np.array([last_column + 1, last_row + 1])
+            lows[[first_column == 0, first_row == 0]] = -np.inf
+            highs[
+                [last_column == cells_per_side - 1, last_row == cells_per_side - 1]
+            ] = np.inf
+            points = coordinates[queries]
+            window_margins = np.minimum(points - lows, highs - points).min(axis=1)
+            if covers_grid or (nearest_distances[:, -1] <= window_margins).all():
+                neighbour_lists[queries] = nearest
+                break
+            radius += 1
+    return neighbour_lists
+
+
+def nearest_candidates(coordinates, queries, candidates, no_of_neighbours):
+    """
+    Find the nearest candidates of each query city, in chunks of query cities.
+
+    Args:
+    - coordinates: N x 2 array of city coordinates.
+    - queries: Cities to find the neighbours of.
+    - candidates: Cities the neighbours are chosen from. May include the queries.
+    - no_of_neighbours: Number of neighbours kept per city, less than len(candidates).
+
+    Returns:
+    - tuple: Arrays of the nearest candidates of each query, nearest first, and their distances.
+    """
+    nearest = np.empty((len(queries), no_of_neighbours), dtype=np.int32)
+    nearest_distances = np.empty((len(queries), no_of_neighbours))
+    chunk_size = max(CHUNK_SIZE // len(candidates), 1)
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start : start + chunk_size]
+        squared_distances = (
+            (coordinates[chunk][:, np.newaxis, :] - coordinates[candidates]) ** 2
+        ).sum(axis=-1)
+        # A city is never its own neighbour
+        squared_distances[chunk[:, np.newaxis] == candidates] = np.inf
+        closest = np.argpartition(squared_distances, no_of_neighbours - 1, axis=1)[
+            :, :no_of_neighbours
+        ]
+        closest_distances = np.take_along_axis(squared_distances, closest, axis=1)
+        ranks = np.argsort(closest_distances, axis=1, kind="stable")
+        nearest[start : start + len(chunk)] = candidates[
+            np.take_along_axis(closest, ranks, axis=1)
+        ]
+        nearest_distances[start : start + len(chunk)] = np.sqrt(
+            np.take_along_axis(closest_distances, ranks, axis=1)
+        )
+    return nearest, nearest_distances
+
+
+def load_coordinates(new_coordinates, no_of_neighbours) -> None:
+    """
+    Replace the cities of the problem and rebuild their neighbour lists.
+
+    Args:
+    - new_coordinates: N x 2 array of city coordinates. The first is the home city.
+    - no_of_neighbours: Number of neighbours kept per city.
+    """
+    global coordinates, neighbours, distances
+    coordinates = np.ascontiguousarray(new_coordinates, dtype=float)
+    neighbours = nearest_neighbours(coordinates, no_of_neighbours)
+    distances = CoordinateDistances(coordinates)
+
+
+def ga_calculate_fitness_proxy_batch(
+    genes: np.ndarray, coordinates: np.ndarray = None
+) -> np.ndarray:
+    """
+    Calculate the length of every route, in chunks so the memory used stays bounded.
+
+    Args:
+    - genes: 2-D array with one permutation of city indices per row.
+    - coordinates: City coordinates, e.g. a shared memory copy in a worker process.
+      Defaults to the problem's coordinates.
+
+    Returns:
+    - np.ndarray: The distance travelled by each route.
+    """
+    if coordinates is None:
+        coordinates = globals()["coordinates"]
+    fitness_proxies = np.empty(len(genes))
+    chunk_size = max(CHUNK_SIZE // genes.shape[1], 1)
+    for start in range(0, len(genes), chunk_size):
+        points = coordinates[genes[start : start + chunk_size]]
+        fitness_proxies[start : start + chunk_size] = np.sqrt(
+            (np.diff(points, axis=1) ** 2).sum(axis=-1)
+        ).sum(axis=1)
+    return fitness_proxies
+
+
+def ga_calculate_fitness_proxy(gene):
+    return float(ga_calculate_fitness_proxy_batch(np.asarray(gene)[np.newaxis])[0])
+
+
+def ga_generate_random_lives(gene: np.ndarray, no_of_lives: int) -> np.ndarray:
+    """
+    Specify how the genes of a whole random population are generated at once.
+
+    Args:
+    - gene: Permutation of city indices. The home city stays first.
+    - no_of_lives: Number of genes to generate.
+
+    Returns:
+    - np.ndarray: 2-D array with one random permutation per row.
+    """
+    genes = np.empty((no_of_lives, len(gene)), dtype=gene.dtype)
+    genes[:, 0] = gene[0]
+    chunk_size = max(CHUNK_SIZE // len(gene), 1)
+    for start in range(0, no_of_lives, chunk_size):
+        # Sorting random keys shuffles every row independently
+        orders = np.argsort(
+            np.random.random((min(chunk_size, no_of_lives - start), len(gene) - 1)),
+            axis=1,
+        )
+        genes[start : start + chunk_size, 1:] = gene[1:][orders]
+    return genes
+
+
+def ga_generate_random_life(gene: np.ndarray) -> np.ndarray:
+    return ga_generate_random_lives(gene, 1)[0]
+
+
+def ga_procreation_batch(
+    genes: np.ndarray, parent_1_indices: np.ndarray, parent_2_indices: np.ndarray
+) -> np.ndarray:
+    return crossover_batch(genes, parent_1_indices, parent_2_indices, "ox")
+
+
+def ga_procreation(parent_1: Type[Life], parent_2: Type[Life]) -> Life:
+    """
+    Specify how a child is procreated, with order crossover.
+
+    Args:
+    - parent_1: Life object.
+    - parent_2: Life object.
+
+    Returns:
+    - child: Life object representing offspring. Its fitness proxy is calculated when first read.
+    """
+    return Life(
+        gene=crossover(parent_1.gene, parent_2.gene, "ox"),
+        ga_calculate_fitness_proxy=parent_1.calculate_fitness_proxy_func,
+        ga_generate_random_life=parent_1.generate_random_life,
+        ga_mutation=parent_1.calculate_mutation,
+        ga_decode_gene=parent_1.decode_gene,
+        randomise=False,
+    )
+
+
+def ga_mutation_batch(genes: np.ndarray, mutation_rate: float) -> np.ndarray:
+    """
+    Specify how all children of a generation are mutated at once, each joining a
+    random city to one of its nearest neighbours with probability mutation_rate.
+
+    Args:
+    - genes: 2-D array with one permutation per row, mutated in place.
+    - mutation_rate: Probability that a child mutates.
+
+    Returns:
+    - np.ndarray: The change in fitness proxy of every row, 0 for rows that did not mutate.
+    """
+    return neighbour_inversion_batch(genes, distances, neighbours, mutation_rate)
+
+
+def ga_mutation(gene: np.ndarray, mutation_rate: float) -> np.ndarray:
+    ga_mutation_batch(gene[np.newaxis], mutation_rate)
+    # gene[np.newaxis] is a view, so the move already happened in gene
+    return gene
+
+
+def ga_encode_gene(gene) -> np.ndarray:
+    return np.asarray(gene, dtype=np.int32)
+
+
+def ga_decode_gene(gene) -> list:
+    # Routes of thousands of cities are exchanged as JSON lists of city indices
+    return np.asarray(gene).tolist()
+
+
+@register_problem("large_tsp")
+def create_large_tsp_problem(config) -> Problem:
+    """
+    Build a TSP that scales to thousands of cities, from Config.tsplib_file or
+    Config.no_of_cities random cities.
+
+    Args:
+    - config: Config instance.
+
+    Returns:
+    - Problem: The TSP.
+    """
+    if config.tsplib_file is not None:
+        city_coordinates = load_tsplib(config.tsplib_file)["coordinates"]
+    else:
+        city_coordinates = np.random.RandomState(0).rand(config.no_of_cities, 2)
+    load_coordinates(city_coordinates, config.no_of_neighbours)
+    return Problem(
+        name="large_tsp",
+        gene=np.arange(len(coordinates), dtype=np.int32),
+        gene_min=0,
+        gene_max=len(coordinates) - 1,
+        maximise_fitness_proxy=False,
+        ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
+        ga_generate_random_life=ga_generate_random_life,
+        ga_procreation=ga_procreation,
+        ga_mutation=partial(ga_mutation, mutation_rate=config.mutation_rate),
+        ga_calculate_fitness_proxy_batch=ga_calculate_fitness_proxy_batch,
+        ga_procreation_batch=ga_procreation_batch,
+        ga_mutation_batch=partial(
+            ga_mutation_batch, mutation_rate=config.mutation_rate
+        ),
+        ga_generate_random_lives=ga_generate_random_lives,
+        ga_encode_gene=ga_encode_gene,
+        ga_decode_gene=ga_decode_gene,
+        ga_local_search=partial(
+            improve_route,
+            distance=coordinate_distance(coordinates),
+            neighbours=neighbours.tolist(),
+        ),
+        shared_arrays={"coordinates": coordinates},
+        problem_fingerprint=problem_fingerprint(coordinates),
+    )
@@ -4,11 +4,12 @@ class Life:
 
     Attributes:
     - gene: Stores information related to the optimization task.
-    - fitness_proxy: The metric to be minimized or maximized for this individual.
+    - fitness_proxy: The metric to be minimized or maximized for this individual, calculated when first read.
 
     Methods:
     - calculate_fitness_proxy(): Calculates the fitness proxy based on the gene.
     - mutation(): Mutates the gene.
+    - to_dict(): Returns the life as a dict, decoding the gene if a decoder was given.
     """
 
     def __init__(
@@ -17,6 +18,10 @@ class Life:
         ga_calculate_fitness_proxy,
         ga_generate_random_life,
         ga_mutation,
+        ga_decode_gene=None,
+        randomise=True,
+        fitness_proxy=None,
+        ga_mutation_with_delta=None,
     ):
         """
         Initialize a Life instance.
@@ -26,23 +31,54 @@ class Life:
         - ga_calculate_fitness_proxy: Function to calculate the fitness proxy.
         - ga_generate_random_life: Function to generate random gene information.
         - ga_mutation: Function for gene mutation.
+        - ga_decode_gene: Optional function converting a compact gene into its external form.
+        - randomise: If False, use the given gene as it is instead of generating a random one.
+        - fitness_proxy: Optional known fitness proxy of the given gene.
+        - ga_mutation_with_delta: Optional function returning the mutated gene and the change in fitness proxy it caused.
         """
         # Store the functions for calculating fitness and mutation.
         self.calculate_fitness_proxy_func = ga_calculate_fitness_proxy
         self.generate_random_life = ga_generate_random_life
         self.calculate_mutation = ga_mutation
-        # Initialize gene with random data.
-        self.gene = self.generate_random_life(gene)
-        self.fitness_proxy = None
-        # Calculate the initial fitness proxy.
-        self.calculate_fitness_proxy()
+        self.calculate_mutation_with_delta = ga_mutation_with_delta
+        self.decode_gene = ga_decode_gene
+        # Initialize gene with random data, unless the gene is already known.
+        self.gene = self.generate_random_life(gene) if randomise else gene
+        # The fitness proxy is calculated lazily, the first time it is read.
+        self._fitness_proxy = fitness_proxy
+
+    @property
+    def fitness_proxy(self):
+        if self._fitness_proxy is None:
+            self.calculate_fitness_proxy()
+        return self._fitness_proxy
+
+    @fitness_proxy.setter
+    def fitness_proxy(self, fitness_proxy):
+        # Setting None marks the life as pending re-evaluation
+        self._fitness_proxy = fitness_proxy
+
+    @property
+    def is_evaluated(self):
+        return self._fitness_proxy is not None
 
     def calculate_fitness_proxy(self):
-        self.fitness_proxy = self.calculate_fitness_proxy_func(self.gene)
+        self._fitness_proxy = self.calculate_fitness_proxy_func(self.gene)
 
     def mutate_life(self):
-        self.gene = self.calculate_mutation(self.gene)
-        self.calculate_fitness_proxy()
+        if self.calculate_mutation_with_delta is None:
+            self.gene = self.calculate_mutation(self.gene)
+            self.fitness_proxy = None
+            return
+        self.gene, fitness_delta = self.calculate_mutation_with_delta(self.gene)
+        if fitness_delta is None:
+            # The mutation could not report its effect, so re-evaluate the gene
+            self.fitness_proxy = None
+        elif self.is_evaluated:
+            self._fitness_proxy += fitness_delta
 
     def to_dict(self):
-        return {"gene": self.gene, "fitness_proxy": self.fitness_proxy}
+        gene = self.gene
+        if self.decode_gene is not None:
+            gene = self.decode_gene(gene)
+        return {"gene": gene, "fitness_proxy": self.fitness_proxy}
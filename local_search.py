@@ -0,0 +1,250 @@
+import math
+import numpy as np
+from collections import deque
+
+# Smallest gain a move must make, so rounding errors cannot make moves cycle
+MIN_GAIN = 1e-10
+# Longest segment an Or-opt move relocates
+MAX_SEGMENT_LENGTH = 3
+
+
+def matrix_distance(distance_matrix):
+    """
+    Build a distance function reading a distance matrix.
+
+    Args:
+    - distance_matrix: N x N array of distances between cities.
+
+    Returns:
+    - function: distance(city_1, city_2).
+    """
+    # Indexing nested lists is much faster than a NumPy array one element at a time
+    rows = np.asarray(distance_matrix, dtype=float).tolist()
+
+    def distance(city_1, city_2):
+        return rows[city_1][city_2]
+
+    return distance
+
+
+def coordinate_distance(coordinates):
+    """
+    Build a distance function calculating Euclidean distances from coordinates.
+
+    Args:
+    - coordinates: N x 2 array of city coordinates.
+
+    Returns:
+    - function: distance(city_1, city_2).
+    """
+    xs = np.asarray(coordinates, dtype=float)[:, 0].tolist()
+    ys = np.asarray(coordinates, dtype=float)[:, 1].tolist()
+
+    def distance(city_1, city_2):
+        return math.hypot(xs[city_1] - xs[city_2], ys[city_1] - ys[city_2])
+
+    return distance
+
+
+def nearest_neighbour_lists(distance_matrix, no_of_neighbours):
+    """
+    Find the nearest cities of every city from a distance matrix.
+
+    Args:
+    - distance_matrix: N x N array of distances between cities.
+    - no_of_neighbours: Number of neighbours kept per city.
+
+    Returns:
+    - np.ndarray: N x no_of_neighbours array of city indices, nearest first.
+    """
+    distances = np.array(distance_matrix, dtype=float)
+    # A city is never its own neighbour, even if another city shares its location
+    np.fill_diagonal(distances, np.inf)
+    no_of_neighbours = min(no_of_neighbours, len(distances) - 1)
+    return np.argsort(distances, axis=1, kind="stable")[:, :no_of_neighbours]
+
+
+def improve_route(gene, distance, neighbours, max_segment_length=MAX_SEGMENT_LENGTH):
+    """
+    Improve a route with 2-opt and Or-opt moves until neither finds an improvement.
+
+    Only moves joining a city to one of its nearest neighbours are tried, and a
+    city is only looked at again once one of its edges changed (don't-look bits),
+    so a pass over a route takes close to linear time. Routes are open paths: the
+    home city stays first and there is no edge back to it.
+
+    Args:
+    - gene: Permutation of the city indices 0 to N - 1, starting with the home city.
+    - distance: Function returning the distance between two cities.
+    - neighbours: Nearest cities of each city, nearest first, as an array or nested lists.
+    - max_segment_length: Longest run of cities an Or-opt move relocates.
+
+    Returns:
+    - tuple: The improved route, with the gene's type and dtype, and the change in route length.
+    """
+    route = [int(city) for city in gene]
+    if isinstance(neighbours, np.ndarray):
+        neighbours = neighbours.tolist()
+    no_of_cities = len(route)
+    positions = [0] * no_of_cities
+    for position, city in enumerate(route):
+        positions[city] = position
+
+    def city_at(position):
+        # -1 stands for the missing city past either end of the route
+        return route[position] if 0 <= position < no_of_cities else -1
+
+    def edge_length(city_1, city_2):
+        if city_1 < 0 or city_2 < 0:
+            return 0.0
+        return distance(city_1, city_2)
+
+    def reverse(start, end):
+        # Reverses route[start:end + 1]
+        route[start : end + 1] = route[start : end + 1][::-1]
+        for position in range(start, end + 1):
+            positions[route[position]] = position
+
+    def move_segment(start, length, after_city, reverse_segment):
+        segment = route[start : start + length]
+        del route[start : start + length]
+        insert_at = positions[after_city] + 1
+        if insert_at > start:
+            insert_at -= length
+        route[insert_at:insert_at] = segment[::-1] if reverse_segment else segment
+        for position in range(
+            min(start, insert_at), max(start + length, insert_at + length)
+        ):
+            positions[route[position]] = position
+
+    def two_opt(city):
+        """
+        Replace the edge from city to its successor (or predecessor) and the edge
+        from a neighbour to its successor (or predecessor) by joining city to the
+        neighbour. Returns the change in length and the cities whose edges changed.
+        """
+        position = positions[city]
+        for step in (1, -1):
+            next_city = city_at(position + step)
+            next_length = edge_length(city, next_city)
+            for neighbour in neighbours[city]:
+                joined_length = distance(city, neighbour)
+                # Neighbours are sorted, so no further one can shorten the route
+                if joined_length >= next_length:
+                    break
+                neighbour_position = positions[neighbour]
+                neighbour_next = city_at(neighbour_position + step)
+                first = min(position, neighbour_position)
+                # Reversing from the first position would move the home city
+                if step == -1 and first == 0:
+                    continue
+                delta = (
+                    joined_length
+                    + edge_length(next_city, neighbour_next)
+                    - next_length
+                    - edge_length(neighbour, neighbour_next)
+                )
+                if delta < -MIN_GAIN:
+                    last = max(position, neighbour_position)
+                    if step == 1:
+                        reverse(first + 1, last)
+                    else:
+                        reverse(first, last - 1)
+                    return delta, (city, next_city, neighbour, neighbour_next)
+        return 0.0, ()
+
+    def or_opt(city):
+        """
+        Move a run of up to max_segment_length cities starting or ending at city
+        next to a neighbour of either end, reversed if that is shorter. Returns the
+        change in length and the cities whose edges changed.
+        """
+        position = positions[city]
+        for length in range(1, max_segment_length + 1):
+            for start in {position, position - length + 1}:
+                end = start + length - 1
+                # The home city never moves
+                if start < 1 or end >= no_of_cities:
+                    continue
+                previous_city = route[start - 1]
+                following_city = city_at(end + 1)
+                first_city, last_city = route[start], route[end]
+                removal_gain = (
+                    distance(previous_city, first_city)
+                    + edge_length(last_city, following_city)
+                    - edge_length(previous_city, following_city)
+                )
+                if removal_gain <= MIN_GAIN:
+                    continue
+                for end_city, other_end_city in (
+                    (first_city, last_city),
+                    (last_city, first_city),
+                ):
+                    for neighbour in neighbours[end_city]:
+                        joined_length = distance(end_city, neighbour)
+                        if joined_length >= removal_gain:
+                            break
+                        neighbour_position = positions[neighbour]
+                        if start <= neighbour_position <= end:
+                            continue
+                        for step in (1, -1):
+                            # Insert between the neighbour and its successor (or predecessor)
+                            neighbour_next = city_at(neighbour_position + step)
+                            if neighbour_next == first_city or (
+                                neighbour_next == last_city
+                            ):
+                                continue
+                            if step == -1 and neighbour_next < 0:
+                                continue
+                            delta = (
+                                joined_length
+                                + edge_length(other_end_city, neighbour_next)
+                                - edge_length(neighbour, neighbour_next)
+                                - removal_gain
+                            )
+                            if delta < -MIN_GAIN:
+                                if step == 1:
+                                    move_segment(
+                                        start,
+                                        length,
+                                        neighbour,
+                                        end_city != first_city,
+                                    )
+                                else:
+                                    move_segment(
+                                        start,
+                                        length,
+                                        neighbour_next,
+                                        end_city == first_city,
+                                    )
+                                return delta, (
+                                    previous_city,
+                                    following_city,
+                                    first_city,
+                                    last_city,
+                                    neighbour,
+                                    neighbour_next,
+                                )
+        return 0.0, ()
+
+    total_delta = 0.0
+    # Cities whose don't-look bit is off, queued to be looked at
+    queue = deque(route)
+    queued = [True] * no_of_cities
+    while queue:
+        city = queue.popleft()
+        queued[city] = False
+        delta, changed_cities = two_opt(city)
+        if not changed_cities:
+            delta, changed_cities = or_opt(city)
+        if not changed_cities:
+            continue
+        total_delta += delta
+        for changed_city in changed_cities:
+            if changed_city >= 0 and not queued[changed_city]:
+                queued[changed_city] = True
+                queue.append(changed_city)
+
+    if isinstance(gene, np.ndarray):
+        return np.array(route, dtype=gene.dtype), total_delta
+    return type(gene)(route), total_delta
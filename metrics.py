@@ -0,0 +1,207 @@
+import threading
+
+# Phases of Darwinian_evolution.perform_generation_operations, in order
+GENERATION_PHASES = (
+    "selection",
+    "procreation",
+    "mutation",
+    "evaluation",
+    "local_search",
+    "merge",
+    "get_fittest",
+    "save_best_life",
+)
+# Upper bounds in seconds of the migration latency histogram buckets
+MIGRATION_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class GenerationMetrics:
+    """
+    Records where an island spends its time: wall time and call counts of every
+    generation phase, fitness evaluations and migration latency.
+
+    Darwinian_evolution only records into it when one is given, so an island
+    without metrics runs the uninstrumented generation loop.
+
+    Attributes:
+    - phase_seconds: Total wall time of each phase.
+    - phase_calls: Number of calls of each phase.
+    - last_phase_seconds: Wall time of each phase in the latest generation.
+    - generations: Number of generations recorded.
+    - fitness_evaluations: Number of fitness proxies calculated.
+    - callbacks: Functions called with a dict describing each generation.
+
+    Methods:
+    - add_callback(): Registers a function called after every generation.
+    - count_fitness_evaluations(): Wraps fitness functions so their calls are counted.
+    - record_generation(): Records the phase timings of one generation.
+    - record_migration(): Records the latency of one migrant request.
+    - to_prometheus(): Renders the metrics in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.phase_seconds = dict.fromkeys(GENERATION_PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(GENERATION_PHASES, 0)
+        self.last_phase_seconds = dict.fromkeys(GENERATION_PHASES, 0.0)
+        self.generations = 0
+        self.fitness_evaluations = 0
+        self.best_fitness_proxy = None
+        self.migration_requests = {"ok": 0, "empty": 0}
+        self.migrants_received = 0
+        self.migration_latency_sum = 0.0
+        self.migration_latency_buckets = [0] * len(MIGRATION_LATENCY_BUCKETS)
+        self.callbacks = []
+        # Recorded from the generation loop and the migration thread, read by Flask
+        self.lock = threading.Lock()
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def count_fitness_evaluations(
+        self, ga_calculate_fitness_proxy, ga_calculate_fitness_proxy_batch=None
+    ):
+        """
+        Wrap the fitness functions so every fitness proxy they calculate is counted.
+
+        Args:
+        - ga_calculate_fitness_proxy: Function scoring one gene.
+        - ga_calculate_fitness_proxy_batch: Optional function scoring a 2-D array of genes.
+
+        Returns:
+        - tuple: The wrapped functions, None where no function was given.
+        """
+
+        def calculate_fitness_proxy(gene):
+            self.fitness_evaluations += 1
+            return ga_calculate_fitness_proxy(gene)
+
+        calculate_fitness_proxy_batch = None
+        if ga_calculate_fitness_proxy_batch is not None:
+
+            def calculate_fitness_proxy_batch(genes):
+                self.fitness_evaluations += len(genes)
+                return ga_calculate_fitness_proxy_batch(genes)
+
+        return calculate_fitness_proxy, calculate_fitness_proxy_batch
+
+    def record_generation(self, phase_seconds, best_fitness_proxy):
+        """
+        Record the phase timings of one generation and notify the callbacks.
+
+        Args:
+        - phase_seconds: Dict of the wall time of each phase that ran.
+        - best_fitness_proxy: Fitness proxy of the fittest life so far.
+        """
+        with self.lock:
+            for phase, seconds in phase_seconds.items():
+                self.phase_seconds[phase] += seconds
+                self.phase_calls[phase] += 1
+                self.last_phase_seconds[phase] = seconds
+            generation_no = self.generations
+            self.generations += 1
+            self.best_fitness_proxy = best_fitness_proxy
+        if self.callbacks:
+            generation = {
+                "generation_no": generation_no,
+                "phase_seconds": phase_seconds,
+                "fitness_evaluations": self.fitness_evaluations,
+                "best_fitness_proxy": best_fitness_proxy,
+            }
+            for callback in self.callbacks:
+                callback(generation)
+
+    def record_migration(self, seconds, no_of_migrants):
+        with self.lock:
+            self.migration_requests["ok" if no_of_migrants else "empty"] += 1
+            self.migrants_received += no_of_migrants
+            self.migration_latency_sum += seconds
+            for i, upper_bound in enumerate(MIGRATION_LATENCY_BUCKETS):
+                if seconds <= upper_bound:
+                    self.migration_latency_buckets[i] += 1
+
+    def to_prometheus(self, labels=None):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+        - labels: Optional dict of labels added to every sample, e.g. the island's address.
+
+        Returns:
+        - str: The metrics.
+        """
+        common = ",".join(f'{key}="{value}"' for key, value in (labels or {}).items())
+
+        def sample(name, value, **sample_labels):
+            label_text = ",".join(
+                [common] * bool(common)
+                + [f'{key}="{value}"' for key, value in sample_labels.items()]
+            )
+            return (
+                f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}"
+            )
+
+        with self.lock:
+            lines = [
+                "# HELP ga_phase_seconds_total Wall time spent in each generation phase.",
+                "# TYPE ga_phase_seconds_total counter",
+                *(
+                    sample("ga_phase_seconds_total", seconds, phase=phase)
+                    for phase, seconds in self.phase_seconds.items()
+                ),
+                "# HELP ga_phase_calls_total Number of times each generation phase ran.",
+                "# TYPE ga_phase_calls_total counter",
+                *(
+                    sample("ga_phase_calls_total", calls, phase=phase)
+                    for phase, calls in self.phase_calls.items()
+                ),
+                "# HELP ga_phase_last_seconds Wall time of each phase in the latest generation.",
+                "# TYPE ga_phase_last_seconds gauge",
+                *(
+                    sample("ga_phase_last_seconds", seconds, phase=phase)
+                    for phase, seconds in self.last_phase_seconds.items()
+                ),
+                "# HELP ga_generations_total Number of generations run.",
+                "# TYPE ga_generations_total counter",
+                sample("ga_generations_total", self.generations),
+                "# HELP ga_fitness_evaluations_total Number of fitness proxies calculated.",
+                "# TYPE ga_fitness_evaluations_total counter",
+                sample("ga_fitness_evaluations_total", self.fitness_evaluations),
+                "# HELP ga_best_fitness_proxy Fitness proxy of the fittest life so far.",
+                "# TYPE ga_best_fitness_proxy gauge",
+                sample(
+                    "ga_best_fitness_proxy",
+                    (
+                        "NaN"
+                        if self.best_fitness_proxy is None
+                        else self.best_fitness_proxy
+                    ),
+                ),
+                "# HELP ga_migration_requests_total Migrant requests to other islands.",
+                "# TYPE ga_migration_requests_total counter",
+                *(
+                    sample("ga_migration_requests_total", count, result=result)
+                    for result, count in self.migration_requests.items()
+                ),
+                "# HELP ga_migrants_received_total Migrants received from other islands.",
+                "# TYPE ga_migrants_received_total counter",
+                sample("ga_migrants_received_total", self.migrants_received),
+                "# HELP ga_migration_latency_seconds Latency of migrant requests.",
+                "# TYPE ga_migration_latency_seconds histogram",
+                *(
+                    sample("ga_migration_latency_seconds_bucket", count, le=upper_bound)
+                    for upper_bound, count in zip(
+                        MIGRATION_LATENCY_BUCKETS, self.migration_latency_buckets
+                    )
+                ),
+                sample(
+                    "ga_migration_latency_seconds_bucket",
+                    sum(self.migration_requests.values()),
+                    le="+Inf",
+                ),
+                sample("ga_migration_latency_seconds_sum", self.migration_latency_sum),
+                sample(
+                    "ga_migration_latency_seconds_count",
+                    sum(self.migration_requests.values()),
+                ),
+            ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,121 @@
+import hashlib
+import struct
+import numpy as np
+
+# Binary migrant payloads are sent with this content type, JSON stays available
+# for the dashboard through content negotiation
+MIGRANT_CONTENT_TYPE = "application/x-ga-migrants"
+
+MAGIC = b"GAMG"
+VERSION = 1
+# magic, version, bytes per city index, problem fingerprint, island id,
+# number of migrants, gene length
+HEADER = struct.Struct("<4sBB8sHHI")
+
+
+def problem_fingerprint(*arrays):
+    """
+    Fingerprint the data that defines a problem, so islands only take in binary
+    migrants, and their fitness proxies, from islands solving the same problem.
+
+    Args:
+    - arrays: Arrays defining the problem, e.g. the distance matrix.
+
+    Returns:
+    - bytes: An 8 byte fingerprint.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.shape).encode())
+        digest.update(array.dtype.str.encode())
+        digest.update(array.tobytes())
+    return digest.digest()
+
+
+def encode_migrants(genes, fitness_proxies, generation_nos, island_id, fingerprint):
+    """
+    Pack a batch of permutation migrants into a compact binary payload.
+
+    Args:
+    - genes: 2-D array with one permutation of city indices per row.
+    - fitness_proxies: Fitness proxy of each migrant.
+    - generation_nos: Generation each migrant was sent in.
+    - island_id: Identifier of the sending island, from 0 to 65535.
+    - fingerprint: problem_fingerprint() of the sender's problem.
+
+    Returns:
+    - bytes: The payload.
+    """
+    genes = np.asarray(genes)
+    no_of_migrants, gene_length = genes.shape
+    # City indices fit in two bytes for up to 65536 cities
+    index_dtype = np.dtype("<u2") if gene_length <= 1 << 16 else np.dtype("<i4")
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        index_dtype.itemsize,
+        fingerprint,
+        island_id,
+        no_of_migrants,
+        gene_length,
+    )
+    return b"".join(
+        [
+            header,
+            np.asarray(fitness_proxies, dtype="<f8").tobytes(),
+            np.asarray(generation_nos, dtype="<u4").tobytes(),
+            genes.astype(index_dtype).tobytes(),
+        ]
+    )
+
+
+def decode_migrants(payload):
+    """
+    Unpack a binary payload created by encode_migrants.
+
+    Args:
+    - payload: The payload bytes.
+
+    Returns:
+    - dict: "island_id", "fingerprint" and "migrants", a list of dicts holding
+      "gene" (int32 permutation), "fitness_proxy" and "generation_no".
+    """
+    if len(payload) < HEADER.size:
+        raise ValueError("Migrant payload is shorter than its header")
+    (
+        magic,
+        version,
+        index_size,
+        fingerprint,
+        island_id,
+        no_of_migrants,
+        gene_length,
+    ) = HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a migrant payload of a supported version")
+    index_dtype = np.dtype("<u2") if index_size == 2 else np.dtype("<i4")
+    payload_size = HEADER.size + no_of_migrants * (
+        12 + gene_length * index_dtype.itemsize
+    )
+    if len(payload) != payload_size:
+        raise ValueError(
+            f"Migrant payload of {len(payload)} bytes, expected {payload_size}"
+        )
+    offset = HEADER.size
+    fitness_proxies = np.frombuffer(payload, "<f8", no_of_migrants, offset)
+    offset += fitness_proxies.nbytes
+    generation_nos = np.frombuffer(payload, "<u4", no_of_migrants, offset)
+    offset += generation_nos.nbytes
+    genes = np.frombuffer(
+        payload, index_dtype, no_of_migrants * gene_length, offset
+    ).reshape(no_of_migrants, gene_length)
+    migrants = [
+        {
+            "gene": genes[i].astype(np.int32),
+            "fitness_proxy": float(fitness_proxies[i]),
+            "generation_no": int(generation_nos[i]),
+        }
+        for i in range(no_of_migrants)
+    ]
+    return {"island_id": island_id, "fingerprint": fingerprint, "migrants": migrants}
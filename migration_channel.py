@@ -0,0 +1,183 @@
+import queue
+import random
+import threading
+import time
+import requests
+from migrant_codec import MIGRANT_CONTENT_TYPE, decode_migrants
+
+
+def put_dropping_oldest(bounded_queue, item):
+    # Keep the queue bounded by discarding its oldest item when it is full
+    while True:
+        try:
+            bounded_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                bounded_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+
+class MigrationChannel:
+    """
+    Fetches migrants from other islands on a background thread, so the generation loop
+    never waits on the network. The island's own best lives reach its Flask server
+    in-process, through an IslandState.
+
+    Attributes:
+    - inbound: Bounded queue of migrants received from other islands.
+    - session: requests.Session reusing keep-alive connections to the islands.
+
+    Methods:
+    - start(): Starts the background thread.
+    - request_migrant(): Asks a random peer island for its best gene.
+    - drain(): Returns every migrant that has arrived so far, without waiting.
+    - stop(): Stops the background thread.
+    """
+
+    def __init__(
+        self,
+        ip,
+        port,
+        host_addresses,
+        timeout=2.0,
+        max_queue_size=16,
+        problem_fingerprint=None,
+        metrics=None,
+    ):
+        """
+        Initialize a MigrationChannel instance.
+
+        Args:
+        - ip: IP address of this island.
+        - port: Port of this island.
+        - host_addresses: List of {"ip", "port"} dicts of every island, including this one.
+        - timeout: Seconds before a request to an island is abandoned.
+        - max_queue_size: Maximum number of migrants waiting to be taken in.
+        - problem_fingerprint: Optional fingerprint of this island's problem. If given, peers are
+          asked for binary migrant payloads, which are only taken in when the fingerprints match.
+        - metrics: Optional GenerationMetrics the latency of every migrant request is recorded in.
+        """
+        self.ip_address = ip
+        self.port = port
+        self.peer_addresses = [
+            host_address for host_address in host_addresses if host_address["ip"] != ip
+        ]
+        self.timeout = timeout
+        self.problem_fingerprint = problem_fingerprint
+        self.metrics = metrics
+        self.inbound = queue.Queue(maxsize=max_queue_size)
+        # A single pending request is enough, further requests are dropped until it is served
+        self.migrant_requests = queue.Queue(maxsize=1)
+        self.session = requests.Session()
+        self.is_running = False
+        self.threads = []
+
+    def start(self):
+        self.is_running = True
+        self.threads = [threading.Thread(target=self.request_loop, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.is_running = False
+        # Wake the thread up so it notices the channel has stopped
+        put_dropping_oldest(self.migrant_requests, None)
+        for thread in self.threads:
+            thread.join()
+        self.session.close()
+
+    def request_migrant(self):
+        if not self.peer_addresses:
+            return
+        try:
+            self.migrant_requests.put_nowait(random.choice(self.peer_addresses))
+        except queue.Full:
+            pass
+
+    def drain(self):
+        migrants = []
+        while True:
+            try:
+                migrants.append(self.inbound.get_nowait())
+            except queue.Empty:
+                return migrants
+
+    def request_loop(self):
+        while self.is_running:
+            peer_address = self.migrant_requests.get()
+            if peer_address is None:
+                continue
+            request_start_time = time.perf_counter()
+            try:
+                migrants = self.fetch_migrants(peer_address)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # A malformed answer loses this migrant, not the channel
+                print(
+                    f"Own IP: {self.ip_address}. Unreadable migrants from {peer_address['ip']}: {e!r}"
+                )
+                migrants = []
+            if self.metrics is not None:
+                self.metrics.record_migration(
+                    time.perf_counter() - request_start_time, len(migrants)
+                )
+            for migrant in migrants:
+                try:
+                    self.inbound.put_nowait(migrant)
+                except queue.Full:
+                    break
+
+    def fetch_migrants(self, peer_address):
+        """
+        Fetch the best lives of a peer island.
+
+        Args:
+        - peer_address: {"ip", "port"} dict of the peer.
+
+        Returns:
+        - list: Migrant dicts with "gene", "fitness_proxy" and "is_encoded". Binary payloads carry
+          encoded genes and their fitness proxy, and are dropped unless the peer solves the same
+          problem. JSON migrants have no fitness proxy.
+        """
+        ip = peer_address["ip"]
+        port = peer_address["port"]
+        headers = {}
+        if self.problem_fingerprint is not None:
+            # Peers without a binary payload to offer still answer with JSON
+            headers["Accept"] = MIGRANT_CONTENT_TYPE
+        try:
+            response = self.session.get(
+                f"http://{ip}:{port}/get_best_life",
+                headers=headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            print(f"Own IP: {self.ip_address}. Error requesting from {ip}: {e}")
+            return []
+        if response.status_code != 200:
+            print(f"Error: {response.status_code}")
+            print(response.text)
+            return []
+
+        if response.headers.get("Content-Type", "").startswith(MIGRANT_CONTENT_TYPE):
+            payload = decode_migrants(response.content)
+            # Genes of another problem may not even be permutations of this one's cities
+            if payload["fingerprint"] != self.problem_fingerprint:
+                print(
+                    f"Own IP: {self.ip_address}. Migrants from {ip} solve another problem"
+                )
+                return []
+            return [
+                {
+                    "gene": migrant["gene"],
+                    "fitness_proxy": migrant["fitness_proxy"],
+                    "is_encoded": True,
+                }
+                for migrant in payload["migrants"]
+            ]
+        # A peer that has not published yet returns no gene
+        gene = response.json().get("best_gene")
+        if gene is None:
+            return []
+        return [{"gene": gene, "fitness_proxy": None, "is_encoded": False}]
@@ -0,0 +1,261 @@
+import numpy as np
+import random
+
+
+def edge_costs(gene, distance_matrix, edge_positions):
+    """
+    Sum the length of the given edges of a route. Edge p joins gene[p] and gene[p + 1].
+
+    Args:
+    - gene: Permutation of city indices.
+    - distance_matrix: distance_matrix[i, j] is the distance from city i to city j.
+    - edge_positions: Positions of the edges to sum. Positions outside the route are ignored.
+
+    Returns:
+    - float: The total length of the edges.
+    """
+    total = 0.0
+    for position in set(edge_positions):
+        if 0 <= position < len(gene) - 1:
+            total += distance_matrix[gene[position], gene[position + 1]]
+    return total
+
+
+def inversion_mutation(gene, distance_matrix, start, end):
+    """
+    Reverse gene[start:end] in place. Only the two boundary edges change, as the
+    distance matrix is symmetric.
+
+    Args:
+    - gene: Permutation of city indices.
+    - distance_matrix: Symmetric distance matrix.
+    - start: Start of the reversed segment, at least 1.
+    - end: End (exclusive) of the reversed segment.
+
+    Returns:
+    - float: The change in route length.
+    """
+    if end - start < 2:
+        return 0.0
+    before, first, last = gene[start - 1], gene[start], gene[end - 1]
+    fitness_delta = distance_matrix[before, last] - distance_matrix[before, first]
+    if end < len(gene):
+        after = gene[end]
+        fitness_delta += distance_matrix[first, after] - distance_matrix[last, after]
+    gene[start:end] = gene[start:end][::-1].copy()
+    return float(fitness_delta)
+
+
+def swap_mutation(gene, distance_matrix, start, end):
+    """
+    Swap the cities at positions start and end in place.
+
+    Args:
+    - gene: Permutation of city indices.
+    - distance_matrix: Distance matrix.
+    - start: Position of the first city, at least 1.
+    - end: Position of the second city.
+
+    Returns:
+    - float: The change in route length.
+    """
+    if start == end:
+        return 0.0
+    edge_positions = (start - 1, start, end - 1, end)
+    fitness_before = edge_costs(gene, distance_matrix, edge_positions)
+    gene[start], gene[end] = gene[end], gene[start]
+    return float(edge_costs(gene, distance_matrix, edge_positions) - fitness_before)
+
+
+def insertion_mutation(gene, distance_matrix, start, end):
+    """
+    Move the city at position start to position end in place, shifting the cities in between.
+
+    Args:
+    - gene: Permutation of city indices.
+    - distance_matrix: Distance matrix.
+    - start: Position the city is taken from, at least 1.
+    - end: Position the city is inserted at, at least 1.
+
+    Returns:
+    - float: The change in route length.
+    """
+    if start == end:
+        return 0.0
+    low, high = min(start, end), max(start, end)
+    # Edges inside the shifted cities are kept, only those around the moved city change
+    if start < end:
+        edges_before = (low - 1, low, high)
+        edges_after = (low - 1, high - 1, high)
+    else:
+        edges_before = (low - 1, high - 1, high)
+        edges_after = (low - 1, low, high)
+    fitness_before = edge_costs(gene, distance_matrix, edges_before)
+    gene[low : high + 1] = np.roll(gene[low : high + 1], -1 if start < end else 1)
+    return float(edge_costs(gene, distance_matrix, edges_after) - fitness_before)
+
+
+def scramble_mutation(gene, distance_matrix, start, end):
+    """
+    Shuffle gene[start:end] in place. The cost is proportional to the segment, not the route.
+
+    Args:
+    - gene: Permutation of city indices.
+    - distance_matrix: Distance matrix.
+    - start: Start of the shuffled segment, at least 1.
+    - end: End (exclusive) of the shuffled segment.
+
+    Returns:
+    - float: The change in route length.
+    """
+    if end - start < 2:
+        return 0.0
+    edge_positions = range(start - 1, end)
+    fitness_before = edge_costs(gene, distance_matrix, edge_positions)
+    np.random.shuffle(gene[start:end])
+    return float(edge_costs(gene, distance_matrix, edge_positions) - fitness_before)
+
+
+MUTATION_OPERATORS = {
+    "inversion": inversion_mutation,
+    "swap": swap_mutation,
+    "insertion": insertion_mutation,
+    "scramble": scramble_mutation,
+}
+
+
+def mutate(gene, distance_matrix, mutation_operator="inversion"):
+    """
+    Apply one mutation at random positions, never moving the home city.
+
+    Args:
+    - gene: Permutation of city indices, mutated in place.
+    - distance_matrix: Distance matrix.
+    - mutation_operator: 'inversion', 'swap', 'insertion' or 'scramble'.
+
+    Returns:
+    - float: The change in route length.
+    """
+    if mutation_operator not in MUTATION_OPERATORS:
+        raise ValueError(f"Unknown mutation operator: {mutation_operator}")
+    start = random.randint(1, len(gene) - 1)
+    end = random.randint(1, len(gene) - 1)
+    if mutation_operator in ("inversion", "scramble") and start > end:
+        start, end = end, start
+    return MUTATION_OPERATORS[mutation_operator](gene, distance_matrix, start, end)
+
+
+def inversion_mutation_batch(genes, distance_matrix, rows, starts, ends):
+    """
+    Reverse genes[row, start:end] in place for many rows at once, without a Python loop.
+
+    Args:
+    - genes: 2-D array with one permutation per row.
+    - distance_matrix: Symmetric distance matrix.
+    - rows: Distinct rows to mutate.
+    - starts: Start of each reversed segment, at least 1.
+    - ends: End (exclusive) of each reversed segment, at least its start.
+
+    Returns:
+    - np.ndarray: The change in route length of each mutated row.
+    """
+    gene_length = genes.shape[1]
+    mutated = genes[rows]
+    row_indices = np.arange(len(rows))
+    before = mutated[row_indices, starts - 1]
+    first = mutated[row_indices, starts]
+    last = mutated[row_indices, np.maximum(ends - 1, starts)]
+    fitness_deltas = distance_matrix[before, last] - distance_matrix[before, first]
+    has_after = ends < gene_length
+    after = mutated[row_indices, np.minimum(ends, gene_length - 1)]
+    fitness_deltas += np.where(
+        has_after, distance_matrix[first, after] - distance_matrix[last, after], 0.0
+    )
+    fitness_deltas[ends - starts < 2] = 0.0
+
+    # Position p of a segment takes the city at start + end - 1 - p
+    positions = np.arange(gene_length)
+    in_segment = (positions >= starts[:, np.newaxis]) & (
+        positions < ends[:, np.newaxis]
+    )
+    source_positions = np.where(
+        in_segment, (starts + ends - 1)[:, np.newaxis] - positions, positions
+    )
+    genes[rows] = np.take_along_axis(mutated, source_positions, axis=1)
+    return fitness_deltas
+
+
+def mutate_batch(genes, distance_matrix, mutation_rate, mutation_operator="inversion"):
+    """
+    Mutate each row with probability mutation_rate, never moving the home city.
+    Inversions of every row are applied in one vectorized call, the other operators
+    only loop over the rows that mutate.
+
+    Args:
+    - genes: 2-D array with one permutation per row, mutated in place.
+    - distance_matrix: Distance matrix.
+    - mutation_rate: Probability that a row mutates.
+    - mutation_operator: 'inversion', 'swap', 'insertion' or 'scramble'.
+
+    Returns:
+    - np.ndarray: The change in route length of every row, 0 for rows that did not mutate.
+    """
+    if mutation_operator not in MUTATION_OPERATORS:
+        raise ValueError(f"Unknown mutation operator: {mutation_operator}")
+    no_of_genes, gene_length = genes.shape
+    fitness_deltas = np.zeros(no_of_genes)
+    rows = np.flatnonzero(np.random.random(no_of_genes) < mutation_rate)
+    if not len(rows) or gene_length < 3:
+        return fitness_deltas
+    starts = np.random.randint(1, gene_length, size=len(rows))
+    ends = np.random.randint(1, gene_length, size=len(rows))
+    if mutation_operator in ("inversion", "scramble"):
+        starts, ends = np.minimum(starts, ends), np.maximum(starts, ends)
+    if mutation_operator == "inversion":
+        fitness_deltas[rows] = inversion_mutation_batch(
+            genes, distance_matrix, rows, starts, ends
+        )
+        return fitness_deltas
+    operator = MUTATION_OPERATORS[mutation_operator]
+    for row, start, end in zip(rows, starts, ends):
+        fitness_deltas[row] = operator(genes[row], distance_matrix, start, end)
+    return fitness_deltas
+
+
+def neighbour_inversion_batch(genes, distance_matrix, neighbours, mutation_rate):
+    """
+    Mutate each row with probability mutation_rate by a 2-opt move that makes a
+    random city adjacent to one of its nearest neighbours. Restricting moves to
+    neighbours keeps mutations useful on large instances, where a random inversion
+    almost always joins two distant cities.
+
+    Args:
+    - genes: 2-D array with one permutation per row, mutated in place.
+    - distance_matrix: Distance matrix, or any object indexed like one.
+    - neighbours: 2-D array with the nearest cities of each city per row.
+    - mutation_rate: Probability that a row mutates.
+
+    Returns:
+    - np.ndarray: The change in route length of every row, 0 for rows that did not mutate.
+    """
+    no_of_genes, gene_length = genes.shape
+    fitness_deltas = np.zeros(no_of_genes)
+    rows = np.flatnonzero(np.random.random(no_of_genes) < mutation_rate)
+    if not len(rows) or gene_length < 3:
+        return fitness_deltas
+    city_positions = np.random.randint(gene_length, size=len(rows))
+    cities = genes[rows, city_positions]
+    chosen_neighbours = neighbours[
+        cities, np.random.randint(neighbours.shape[1], size=len(rows))
+    ]
+    neighbour_positions = (genes[rows] == chosen_neighbours[:, np.newaxis]).argmax(
+        axis=1
+    )
+    # Reversing the cities after the first of the two, up to and including the
+    # second, puts them next to each other. The home city never moves
+    starts = np.minimum(city_positions, neighbour_positions) + 1
+    ends = np.maximum(city_positions, neighbour_positions) + 1
+    fitness_deltas[rows] = inversion_mutation_batch(
+        genes, distance_matrix, rows, starts, ends
+    )
+    return fitness_deltas
@@ -1,17 +1,137 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
+from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
+import threading
+import time
 from spawn_app import SpawnApp
-import os
 from config import Config
+from progress_feed import ProgressFeed, StreamRelay
+from problems import get_problem
 import requests
-import json
-
 
 config = Config()
 
 
+class IslandStatusCache:
+    """
+    Gathers the status of every island concurrently and caches the aggregated
+    snapshot, so dashboard viewers do not add load to islands that are evolving.
+
+    Attributes:
+    - host_addresses: List of {"ip", "port"} dicts of the islands.
+    - timeout: Seconds before an island is marked unreachable.
+    - ttl: Seconds a snapshot is served before the islands are polled again.
+    - maximise_fitness_proxy: Flag indicating whether a higher fitness proxy is better.
+
+    Methods:
+    - get_snapshot(): Returns the cached snapshot, refreshing it once it has expired.
+    - broadcast_stop(): Asks every island to stop, concurrently.
+    """
+
+    def __init__(self, host_addresses, timeout, ttl, maximise_fitness_proxy):
+        self.host_addresses = host_addresses
+        self.timeout = timeout
+        self.ttl = ttl
+        self.maximise_fitness_proxy = maximise_fitness_proxy
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max(len(host_addresses), 1))
+        # Held while refreshing, so concurrent viewers share a single poll of the islands
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.snapshot_time = 0.0
+
+    def get_snapshot(self):
+        with self.lock:
+            if self.snapshot is None or time.time() - self.snapshot_time > self.ttl:
+                self.snapshot = self.gather_snapshot()
+                self.snapshot_time = time.time()
+            return self.snapshot
+
+    def fetch_status(self, host_address):
+        ip = host_address["ip"]
+        port = host_address["port"]
+        try:
+            response = self.session.get(
+                f"http://{ip}:{port}/get_best_life", timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            return {"Status": "unreachable", "Error": type(e).__name__}
+        if response.status_code != 200:
+            return {"Status": "unreachable", "Error": f"HTTP {response.status_code}"}
+        try:
+            data = response.json()
+            return {
+                "Status": "ok",
+                "Generation": data["generation_no"],
+                "Fitness proxy": data["best_fitness_proxy"],
+            }
+        # requests' JSONDecodeError is a ValueError. A body of the wrong shape is
+        # treated the same way, so one bad island never breaks the whole snapshot
+        except (ValueError, KeyError, TypeError) as e:
+            return {"Status": "unreachable", "Error": type(e).__name__}
+
+    def stop_island(self, host_address):
+        ip = host_address["ip"]
+        port = host_address["port"]
+        try:
+            response = self.session.post(
+                f"http://{ip}:{port}/stop", timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            return {"Status": "unreachable", "Error": type(e).__name__}
+        if response.status_code != 200:
+            return {"Status": "unreachable", "Error": f"HTTP {response.status_code}"}
+        return {"Status": "stopping"}
+
+    def broadcast_stop(self):
+        statuses = self.executor.map(self.stop_island, self.host_addresses)
+        return {f"host_{i}": status for i, status in enumerate(statuses)}
+
+    def gather_snapshot(self):
+        statuses = list(self.executor.map(self.fetch_status, self.host_addresses))
+        msg = {
+            "best life": {},
+        }
+        best_fitness_proxy = None
+        for i, status in enumerate(statuses):
+            msg[f"host_{i}"] = status
+            fitness_proxy = status.get("Fitness proxy")
+            # Islands that have not published a best life yet report None
+            if fitness_proxy is None:
+                continue
+            if (
+                best_fitness_proxy is None
+                or (self.maximise_fitness_proxy and fitness_proxy > best_fitness_proxy)
+                or (
+                    not self.maximise_fitness_proxy
+                    and fitness_proxy < best_fitness_proxy
+                )
+            ):
+                best_fitness_proxy = fitness_proxy
+                msg["best life"]["Host"] = f"Host_{i}"
+                msg["best life"]["Fitness proxy"] = f"{fitness_proxy}"
+        msg["unreachable hosts"] = sum(
+            status["Status"] == "unreachable" for status in statuses
+        )
+        msg["snapshot time"] = time.time()
+        return msg
+
+
 def start_orchestrator(ip, port):
     app = Flask(__name__)
+    island_status_cache = IslandStatusCache(
+        host_addresses=config.host_addresses,
+        timeout=config.dashboard_timeout,
+        ttl=config.dashboard_cache_ttl,
+        maximise_fitness_proxy=get_problem(
+            config.problem, config
+        ).maximise_fitness_proxy,
+    )
+    # Aggregates the islands' progress streams, connecting once someone watches
+    progress_feed = ProgressFeed()
+    stream_relay = StreamRelay(
+        host_addresses=config.host_addresses, progress_feed=progress_feed
+    )
     print(f"Running orchestrator flask app on IP address: {ip} and port: {port}")
 
     @app.route("/")
@@ -20,30 +140,21 @@ def start_orchestrator(ip, port):
 
     @app.route("/dashboard")
     def dashboard():
-        host_addresses = config.host_addresses
-        msg = {
-            "best life": {},
-        }
-        best_fitness_proxy = 9999
-        for i, host_address in enumerate(host_addresses):
-            ip = host_address["ip"]
-            port = host_address["port"]
-            url = f"http://{ip}:{port}/get_best_life"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                fitness_proxy = data["best_fitness_proxy"]
-                generation_no = data["generation_no"]
-                msg[f"host_{i}"] = {
-                    "Generation": generation_no,
-                    "Fitness proxy": fitness_proxy,
-                }
-                if fitness_proxy < best_fitness_proxy:
-                    best_fitness_proxy = fitness_proxy
-                    msg["best life"]["Host"] = f"Host_{i}"
-                    msg["best life"]["Fitness proxy"] = f"{fitness_proxy}"
-
-        return jsonify(msg)
+        return jsonify(island_status_cache.get_snapshot())
+
+    @app.route("/stop", methods=["POST"])
+    def stop():
+        # Islands finish their current generation, checkpoint and stop
+        return jsonify(island_status_cache.broadcast_stop())
+
+    @app.route("/stream")
+    def stream_progress():
+        stream_relay.start()
+        return Response(
+            progress_feed.stream(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
 
     app.run(debug=False, host=ip, port=port)
 
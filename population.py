@@ -1,7 +1,68 @@
 from life import Life
+import numpy as np
 import random
 import math
 
+# 't_s' tournament, 'r_s' rank, 'rw_s' roulette wheel, 'sus' stochastic universal sampling
+SELECTION_METHODS = ("t_s", "r_s", "rw_s", "sus")
+
+
+def selection_weights(fitness_proxies, maximise_fitness_proxy):
+    """
+    Turn fitness proxies into non-negative selection weights, fitter lives weighing more.
+
+    Args:
+    - fitness_proxies: Array of fitness proxies.
+    - maximise_fitness_proxy: Flag indicating whether a larger fitness proxy is fitter.
+
+    Returns:
+    - np.ndarray: Selection weight of each life. Equal fitness gives equal weights.
+    """
+    if maximise_fitness_proxy:
+        weights = fitness_proxies - fitness_proxies.min()
+    else:
+        weights = fitness_proxies.max() - fitness_proxies
+    # Keep the least fit life selectable and avoid an all-zero wheel
+    spread = weights.max()
+    return weights + (spread * 1e-3 if spread > 0 else 1.0)
+
+
+def roulette_wheel_indices(weights, no_of_draws):
+    """
+    Draw indices with probability proportional to their weight, using a binary
+    search over the cumulative weights for every draw.
+
+    Args:
+    - weights: Non-negative selection weight of each life.
+    - no_of_draws: Number of indices to draw.
+
+    Returns:
+    - np.ndarray: The drawn indices.
+    """
+    cumulative_weights = np.cumsum(weights)
+    draws = np.random.random(no_of_draws) * cumulative_weights[-1]
+    indices = np.searchsorted(cumulative_weights, draws, side="right")
+    return np.minimum(indices, len(weights) - 1)
+
+
+def stochastic_universal_sampling_indices(weights, no_of_draws):
+    """
+    Draw indices with evenly spaced pointers over the cumulative weights, which
+    gives each life its expected number of copies with minimal variance.
+
+    Args:
+    - weights: Non-negative selection weight of each life.
+    - no_of_draws: Number of indices to draw.
+
+    Returns:
+    - np.ndarray: The drawn indices.
+    """
+    cumulative_weights = np.cumsum(weights)
+    step = cumulative_weights[-1] / no_of_draws
+    pointers = np.random.random() * step + step * np.arange(no_of_draws)
+    indices = np.searchsorted(cumulative_weights, pointers, side="right")
+    return np.minimum(indices, len(weights) - 1)
+
 
 class Population:
     """
@@ -15,8 +76,15 @@ class Population:
 
     Methods:
     - get_fittest(): Calculates and returns the Life object with the best fitness value.
+    - get_best_lives(): Returns the fittest lives, best first.
+    - add_life(): Adds a life to the population.
     - selection(): Represents the selection process, implemented by a user-defined function.
     - procreation(): Represents the procreation process, implemented by a user-defined function.
+    - mutate_children(): Mutates every child produced by procreation.
+    - evaluate_lives(): Evaluates the fitness proxy of lives that have not been scored yet.
+    - local_search_lives(): Improves random children or the fittest lives with the local search.
+    - get_state(): Returns the lives as arrays, e.g. for a checkpoint.
+    - set_state(): Replaces the lives with those of get_state().
     """
 
     def __init__(
@@ -32,6 +100,12 @@ class Population:
         maximise_fitness_proxy,
         child_procreation_rate,
         selection_method,
+        ga_encode_gene=None,
+        ga_decode_gene=None,
+        ga_calculate_fitness_proxy_batch=None,
+        ga_procreation_batch=None,
+        ga_mutation_with_delta=None,
+        ga_local_search=None,
     ):
         """
         Initialize a Population instance.
@@ -47,19 +121,40 @@ class Population:
         - initialise: Boolean flag to perform initial population generation.
         - maximise_fitness_proxy: Flag indicating whether to maximize the fitness proxy.
         - child_procreation_rate: Number of children = Number of survivors * procreation rate
+        - ga_encode_gene: Optional function converting an external gene into its compact form.
+        - ga_decode_gene: Optional function converting a compact gene into its external form.
+        - ga_calculate_fitness_proxy_batch: Optional function scoring a 2-D array of genes in one call.
+        - ga_procreation_batch: Optional function producing all children's genes from parent index arrays.
+        - ga_mutation_with_delta: Optional function returning the mutated gene and the change in fitness proxy it caused.
+        - ga_local_search: Optional function returning an improved gene and the change in fitness proxy it made.
         """
+        # Fitness vector and ordering of lives, cached until the population changes
+        self._fitness_proxies = None
+        self._ranked_indices = None
+        self._fittest_index = None
         self.lives = []
         self.survivors = []
         self.children = []
         self.fittest = None
         # Store the functions for selection and procreation
         self.procreation_func = ga_procreation
+        self.procreation_batch_func = ga_procreation_batch
         self.child_procreation_rate = child_procreation_rate
+        if selection_method not in SELECTION_METHODS:
+            raise ValueError(
+                f"Unknown selection method: {selection_method}. Expected one of {SELECTION_METHODS}"
+            )
         self.selection_method = selection_method
 
         self.generate_random_life = ga_generate_random_life
         self.calculate_fitness_proxy = ga_calculate_fitness_proxy
         self.mutation = ga_mutation
+        self.mutation_with_delta = ga_mutation_with_delta
+        self.local_search = ga_local_search
+        self.encode_gene = ga_encode_gene
+        self.decode_gene = ga_decode_gene
+        self.calculate_fitness_proxy_batch = ga_calculate_fitness_proxy_batch
+        self.batch_fitness = ga_calculate_fitness_proxy_batch is not None
         # Store the boolean for maximise_fitness_proxy
         self.maximise_fitness_proxy = maximise_fitness_proxy
 
@@ -70,40 +165,121 @@ class Population:
                     ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
                     ga_generate_random_life=ga_generate_random_life,
                     ga_mutation=ga_mutation,
+                    ga_decode_gene=ga_decode_gene,
+                    ga_mutation_with_delta=ga_mutation_with_delta,
                 )
-                self.lives.append(life)
+                self.add_life(life)
+            self.evaluate_lives(self.lives)
             self.get_fittest()
 
-    def get_fittest(self):
-        if self.maximise_fitness_proxy:
-            self.lives = sorted(self.lives, key=lambda x: x.fitness_proxy, reverse=True)
-        else:
-            self.lives = sorted(
-                self.lives, key=lambda x: x.fitness_proxy, reverse=False
+    @property
+    def lives(self):
+        return self._lives
+
+    @lives.setter
+    def lives(self, lives):
+        self._lives = lives
+        self.invalidate_ordering()
+
+    def add_life(self, life):
+        self._lives.append(life)
+        self.invalidate_ordering()
+
+    def invalidate_ordering(self):
+        self._fitness_proxies = None
+        self._ranked_indices = None
+        self._fittest_index = None
+
+    def fitness_proxies(self):
+        # Lives may also be appended to the list directly, so check the length too
+        if self._fitness_proxies is None or len(self._fitness_proxies) != len(
+            self._lives
+        ):
+            self.invalidate_ordering()
+            self.evaluate_lives(self._lives)
+            self._fitness_proxies = np.fromiter(
+                (life.fitness_proxy for life in self._lives),
+                dtype=float,
+                count=len(self._lives),
             )
-        self.fittest = self.lives[0]
+        return self._fitness_proxies
+
+    def ranked_indices(self):
+        """
+        Return the indices of lives ordered from fittest to least fit, sorting only once per population.
+        """
+        fitness_proxies = self.fitness_proxies()
+        if self._ranked_indices is None:
+            if self.maximise_fitness_proxy:
+                self._ranked_indices = np.argsort(-fitness_proxies, kind="stable")
+            else:
+                self._ranked_indices = np.argsort(fitness_proxies, kind="stable")
+        return self._ranked_indices
+
+    def get_fittest(self):
+        fitness_proxies = self.fitness_proxies()
+        if self._fittest_index is None:
+            if self.maximise_fitness_proxy:
+                self._fittest_index = int(np.argmax(fitness_proxies))
+            else:
+                self._fittest_index = int(np.argmin(fitness_proxies))
+        self.fittest = self._lives[self._fittest_index]
         return self.fittest
 
     def get_best_lives(self, no_of_lives):
-        if self.maximise_fitness_proxy:
-            self.lives = sorted(self.lives, key=lambda x: x.fitness_proxy, reverse=True)
+        fitness_proxies = self.fitness_proxies()
+        if self._ranked_indices is None and no_of_lives < len(fitness_proxies):
+            # Partition out the top lives in O(n) and only sort those
+            keys = -fitness_proxies if self.maximise_fitness_proxy else fitness_proxies
+            best_indices = np.argpartition(keys, no_of_lives)[:no_of_lives]
+            best_indices = best_indices[np.argsort(keys[best_indices], kind="stable")]
         else:
-            self.lives = sorted(
-                self.lives, key=lambda x: x.fitness_proxy, reverse=False
-            )
+            best_indices = self.ranked_indices()[:no_of_lives]
+        return [self._lives[index] for index in best_indices]
 
-        return self.lives[:no_of_lives]
+    def get_state(self):
+        """
+        Return the lives as arrays, e.g. for a checkpoint. Requires genes that stack into a 2-D array.
+        """
+        return {
+            "genes": np.stack([np.asarray(life.gene) for life in self._lives]),
+            "fitness_proxies": self.fitness_proxies().copy(),
+        }
+
+    def set_state(self, state):
+        """
+        Replace the lives with those of get_state(). Their fitness proxies are not recalculated.
+        """
+        self.lives = [
+            Life(
+                gene=gene.copy(),
+                ga_generate_random_life=self.generate_random_life,
+                ga_calculate_fitness_proxy=self.calculate_fitness_proxy,
+                ga_mutation=self.mutation,
+                ga_decode_gene=self.decode_gene,
+                ga_mutation_with_delta=self.mutation_with_delta,
+                randomise=False,
+                fitness_proxy=float(fitness_proxy),
+            )
+            for gene, fitness_proxy in zip(state["genes"], state["fitness_proxies"])
+        ]
 
     def reintroduce_best_lives(self, best_lives):
         for life in best_lives:
+            gene = life["gene"]
+            if self.encode_gene is not None:
+                gene = self.encode_gene(gene)
             new_life = Life(
-                gene=life["gene"],
+                gene=gene,
                 ga_generate_random_life=self.generate_random_life,
                 ga_calculate_fitness_proxy=self.calculate_fitness_proxy,
                 ga_mutation=self.mutation,
+                ga_decode_gene=self.decode_gene,
+                ga_mutation_with_delta=self.mutation_with_delta,
+                randomise=False,
+                fitness_proxy=life["fitness_proxy"],
             )
-            new_life.fitness_proxy = life["fitness_proxy"]
-            self.lives.append(new_life)
+            self.add_life(new_life)
         return
 
     def selection(self):
@@ -111,85 +287,162 @@ class Population:
             self.survivors = self.tournament_selection()
         elif self.selection_method == "r_s":
             self.survivors = self.rank_selection()
+        elif self.selection_method == "rw_s":
+            self.survivors = self.roulette_wheel_selection()
+        elif self.selection_method == "sus":
+            self.survivors = self.stochastic_universal_sampling_selection()
         else:
-            pass
-            # self.survivors = self.selection_func(self.lives)
+            raise ValueError(f"Unknown selection method: {self.selection_method}")
         return self.survivors
 
     def procreation(self):
         self.children = []
         no_of_children = len(self.survivors) * self.child_procreation_rate
+        if self.procreation_batch_func is not None:
+            return self.procreation_batch(no_of_children)
         for _ in range(no_of_children):
             parent_1 = random.choice(self.survivors)
             parent_2 = random.choice(self.survivors)
             self.children.append(self.procreation_func(parent_1, parent_2))
         return self.children
 
-    def tournament_selection(self):
+    def procreation_batch(self, no_of_children):
         """
-        Perform tournament selection to choose survivors from the initial population.
+        Procreate all children of the generation in a single call to the batch procreation function.
 
         Args:
-        - population: List of Life objects representing the current population.
+        - no_of_children: Number of children to produce.
 
         Returns:
-        - survivors: List of selected Life objects.
+        - children: List of Life objects representing offspring.
         """
-        tournament_size = 5
-        survivor_rate = 0.5
-        population_size = len(self.lives)
-        survivors = []
-        tournament_pop = []
-
-        def tournament_selection():
-            for _ in range(tournament_size):
-                tournament_pop.append(random.choice(self.lives))
-            return tournament_pop_get_fittest()
+        genes = np.stack([life.gene for life in self.survivors])
+        parent_1_indices = np.random.randint(len(self.survivors), size=no_of_children)
+        parent_2_indices = np.random.randint(len(self.survivors), size=no_of_children)
+        children_genes = self.procreation_batch_func(
+            genes, parent_1_indices, parent_2_indices
+        )
+        for child_gene in children_genes:
+            child = Life(
+                gene=child_gene,
+                ga_calculate_fitness_proxy=self.calculate_fitness_proxy,
+                ga_generate_random_life=self.generate_random_life,
+                ga_mutation=self.mutation,
+                ga_decode_gene=self.decode_gene,
+                ga_mutation_with_delta=self.mutation_with_delta,
+                randomise=False,
+            )
+            self.children.append(child)
+        return self.children
 
-        def tournament_pop_get_fittest():
-            if self.maximise_fitness_proxy:
-                sorted_list = sorted(
-                    tournament_pop, key=lambda x: x.fitness_proxy, reverse=True
-                )
-            else:
-                sorted_list = sorted(
-                    tournament_pop, key=lambda x: x.fitness_proxy, reverse=False
-                )
-            return sorted_list[0]
+    def mutate_children(self):
+        if self.mutation_with_delta is not None:
+            # Score the children first so mutations only apply their fitness delta
+            self.evaluate_lives(self.children)
+        for life in self.children:
+            life.mutate_life()
+        return self.children
 
-        for _ in range(math.floor(population_size * survivor_rate)):
-            survivor = tournament_selection()
-            survivors.append(survivor)
-            tournament_pop = []
+    def local_search_lives(self, no_of_lives, elites=False):
+        """
+        Improve lives in place with the problem's local search.
 
-        return survivors
+        Args:
+        - no_of_lives: Number of lives improved.
+        - elites: If True, improve the fittest lives of the population, otherwise random children.
+        """
+        if elites:
+            lives = [
+                self._lives[index] for index in self.ranked_indices()[:no_of_lives]
+            ]
+        else:
+            self.evaluate_lives(self.children)
+            lives = random.sample(self.children, min(no_of_lives, len(self.children)))
+        for life in lives:
+            life.gene, fitness_delta = self.local_search(life.gene)
+            life.fitness_proxy += fitness_delta
+        self.invalidate_ordering()
 
-    def rank_selection(self):
+    def evaluate_lives(self, lives):
         """
-        Perform rank selection to choose survivors from the initial population.
+        Evaluate the fitness proxy of every life whose gene changed since it was last scored.
 
         Args:
-        - population: List of Life objects representing the current population.
+        - lives: List of Life objects. Lives that have not been evaluated yet are scored.
+        """
+        pending_lives = [life for life in lives if not life.is_evaluated]
+        if not pending_lives:
+            return
+        if not self.batch_fitness:
+            for life in pending_lives:
+                life.calculate_fitness_proxy()
+            return
+        # Stack the genes so the whole batch is scored in a single vectorized call
+        genes = np.stack([life.gene for life in pending_lives])
+        fitness_proxies = self.calculate_fitness_proxy_batch(genes)
+        for life, fitness_proxy in zip(pending_lives, fitness_proxies):
+            life.fitness_proxy = float(fitness_proxy)
+
+    def tournament_selection(self):
+        """
+        Perform tournament selection to choose survivors from the initial population.
+        Every tournament of the generation is drawn at once.
 
         Returns:
         - survivors: List of selected Life objects.
         """
-        survivors = []
-        no_of_lives = len(self.lives)
+        tournament_size = 5
+        survivor_rate = 0.5
+        fitness_proxies = self.fitness_proxies()
+        no_of_survivors = math.floor(len(self.lives) * survivor_rate)
+        tournaments = np.random.randint(
+            len(self.lives), size=(no_of_survivors, tournament_size)
+        )
         if self.maximise_fitness_proxy:
-            self.lives = sorted(self.lives, key=lambda x: x.fitness_proxy, reverse=True)
+            winners = np.argmax(fitness_proxies[tournaments], axis=1)
         else:
-            self.lives = sorted(
-                self.lives, key=lambda x: x.fitness_proxy, reverse=False
-            )
-        fitness = 1
-        for life in self.lives:
-            danger = random.random()
-            if fitness > danger:
-                survivors.append(life)
-            fitness -= 1 / no_of_lives
+            winners = np.argmin(fitness_proxies[tournaments], axis=1)
+        survivor_indices = tournaments[np.arange(no_of_survivors), winners]
+        return [self.lives[index] for index in survivor_indices]
+
+    def rank_selection(self):
+        """
+        Perform rank selection to choose survivors from the initial population.
+        The survival of every life is rolled at once.
 
-        return survivors
+        Returns:
+        - survivors: List of selected Life objects.
+        """
+        no_of_lives = len(self.lives)
+        ranked_indices = self.ranked_indices()
+        survival_chance = 1 - np.arange(no_of_lives) / no_of_lives
+        survived = survival_chance > np.random.random(no_of_lives)
+        return [self.lives[index] for index in ranked_indices[survived]]
 
     def roulette_wheel_selection(self):
-        pass
+        """
+        Perform roulette wheel selection, picking each survivor with probability proportional to its fitness.
+
+        Returns:
+        - survivors: List of selected Life objects.
+        """
+        survivor_rate = 0.5
+        no_of_survivors = math.floor(len(self.lives) * survivor_rate)
+        weights = selection_weights(self.fitness_proxies(), self.maximise_fitness_proxy)
+        survivor_indices = roulette_wheel_indices(weights, no_of_survivors)
+        return [self.lives[index] for index in survivor_indices]
+
+    def stochastic_universal_sampling_selection(self):
+        """
+        Perform stochastic universal sampling, a lower variance roulette wheel with evenly spaced pointers.
+
+        Returns:
+        - survivors: List of selected Life objects.
+        """
+        survivor_rate = 0.5
+        no_of_survivors = math.floor(len(self.lives) * survivor_rate)
+        weights = selection_weights(self.fitness_proxies(), self.maximise_fitness_proxy)
+        survivor_indices = stochastic_universal_sampling_indices(
+            weights, no_of_survivors
+        )
+        return [self.lives[index] for index in survivor_indices]
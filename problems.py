@@ -0,0 +1,235 @@
+import hashlib
+import importlib
+import numpy as np
+from darwinian_evolution import Darwinian_evolution
+from metrics import GenerationMetrics
+from fitness_cache import FitnessCache
+from termination import TerminationCriteria
+
+# Problem factories by name, filled in by register_problem
+PROBLEMS = {}
+# Modules that register the built-in problems when they are imported
+BUILT_IN_PROBLEMS = {
+    "tsp": "genetic_algorithm_poc",
+    "large_tsp": "large_tsp",
+    "knapsack": "knapsack",
+}
+
+
+class Problem:
+    """
+    Everything an island needs to know about the problem it solves: its gene layout
+    and the functions, or kernels, that operate on genes.
+
+    Batch kernels work on a 2-D array with one gene per row. A problem that ships
+    them runs in the array-backed population, where every generation is a handful
+    of vectorized calls instead of one Python call per life. The single gene
+    functions remain for the Life-based population and for migrants.
+
+    Attributes:
+    - name: Name the problem is registered under.
+    - gene: Template gene the random lives are generated from.
+    - gene_dtype: dtype of array genes, None for genes that do not stack into an array.
+    - gene_length: Number of values in a gene.
+    - gene_min: Smallest value a gene holds, None if unbounded.
+    - gene_max: Largest value a gene holds, None if unbounded.
+    - maximise_fitness_proxy: Flag indicating whether a larger fitness proxy is better.
+    - shared_arrays: Problem arrays passed to the batch fitness kernel, and shared with worker processes.
+    - problem_fingerprint: Fingerprint of the problem data, so islands only take in binary migrants
+      of the same problem. Requires integer array genes.
+
+    Methods:
+    - has_batch_kernels(): Whether the problem can run in the array-backed population.
+    """
+
+    def __init__(
+        self,
+        name,
+        gene,
+        maximise_fitness_proxy,
+        ga_calculate_fitness_proxy,
+        ga_generate_random_life,
+        ga_procreation,
+        ga_mutation,
+        gene_min=None,
+        gene_max=None,
+        ga_calculate_fitness_proxy_batch=None,
+        ga_procreation_batch=None,
+        ga_mutation_batch=None,
+        ga_generate_random_lives=None,
+        ga_mutation_with_delta=None,
+        ga_encode_gene=None,
+        ga_decode_gene=None,
+        ga_fitness_cache_key=None,
+        ga_local_search=None,
+        shared_arrays=None,
+        problem_fingerprint=None,
+    ):
+        """
+        Initialize a Problem instance. Batch kernels given as module level functions
+        can also run in worker processes.
+
+        Args:
+        - name: Name the problem is registered under.
+        - gene: Template gene the random lives are generated from.
+        - maximise_fitness_proxy: Flag indicating whether a larger fitness proxy is better.
+        - ga_calculate_fitness_proxy: Function scoring one gene.
+        - ga_generate_random_life: Function returning a random gene from the template gene.
+        - ga_procreation: Function procreating a child Life from two parent Lives.
+        - ga_mutation: Function mutating one gene.
+        - gene_min: Smallest value a gene holds.
+        - gene_max: Largest value a gene holds.
+        - ga_calculate_fitness_proxy_batch: Function scoring a 2-D array of genes, taking shared_arrays as keyword arguments.
+        - ga_procreation_batch: Function producing all children's genes from parent index arrays.
+        - ga_mutation_batch: Function mutating a 2-D array of genes in place, returning each row's change
+          in fitness proxy, 0 for rows left alone and NaN where the change is not known.
+        - ga_generate_random_lives: Function returning a 2-D array of random genes from the template gene.
+        - ga_mutation_with_delta: Function returning a mutated gene and the change in fitness proxy it caused.
+        - ga_encode_gene: Function converting an external gene into its compact form.
+        - ga_decode_gene: Function converting a compact gene into a JSON serialisable form.
+        - ga_fitness_cache_key: Function returning a hashable key of a gene. Defaults to a digest
+          of the gene's bytes for array genes.
+        - ga_local_search: Function returning an improved gene and the change in fitness proxy it made,
+          for the memetic stage of the island.
+        - shared_arrays: Dict of problem arrays passed to ga_calculate_fitness_proxy_batch.
+        - problem_fingerprint: Fingerprint of the problem data.
+        """
+        self.name = name
+        self.gene = gene
+        self.gene_dtype = gene.dtype if isinstance(gene, np.ndarray) else None
+        self.gene_length = len(gene)
+        self.gene_min = gene_min
+        self.gene_max = gene_max
+        self.maximise_fitness_proxy = maximise_fitness_proxy
+        self.ga_calculate_fitness_proxy = ga_calculate_fitness_proxy
+        self.ga_generate_random_life = ga_generate_random_life
+        self.ga_procreation = ga_procreation
+        self.ga_mutation = ga_mutation
+        self.ga_calculate_fitness_proxy_batch = ga_calculate_fitness_proxy_batch
+        self.ga_procreation_batch = ga_procreation_batch
+        self.ga_mutation_batch = ga_mutation_batch
+        self.ga_generate_random_lives = ga_generate_random_lives
+        self.ga_mutation_with_delta = ga_mutation_with_delta
+        self.ga_encode_gene = ga_encode_gene
+        self.ga_decode_gene = ga_decode_gene
+        if ga_fitness_cache_key is None and self.gene_dtype is not None:
+            ga_fitness_cache_key = array_gene_cache_key
+        self.ga_fitness_cache_key = ga_fitness_cache_key
+        self.ga_local_search = ga_local_search
+        self.shared_arrays = shared_arrays or {}
+        self.problem_fingerprint = problem_fingerprint
+
+    def has_batch_kernels(self):
+        return (
+            self.ga_calculate_fitness_proxy_batch is not None
+            and self.ga_procreation_batch is not None
+        )
+
+
+def array_gene_cache_key(gene):
+    return hashlib.blake2b(
+        np.ascontiguousarray(gene).tobytes(), digest_size=16
+    ).digest()
+
+
+def register_problem(name):
+    """
+    Register a problem factory under a name, as a decorator.
+
+    Args:
+    - name: Name islands load the problem by, e.g. Config.problem.
+
+    Returns:
+    - function: Decorator registering a factory that takes a Config and returns a Problem.
+    """
+
+    def register(factory):
+        PROBLEMS[name] = factory
+        return factory
+
+    return register
+
+
+def get_problem(name, config):
+    """
+    Build a registered problem.
+
+    Args:
+    - name: Name the problem is registered under.
+    - config: Config instance passed to the problem's factory.
+
+    Returns:
+    - Problem: The problem.
+    """
+    if name not in PROBLEMS and name in BUILT_IN_PROBLEMS:
+        importlib.import_module(BUILT_IN_PROBLEMS[name])
+    if name not in PROBLEMS:
+        raise ValueError(
+            f"Unknown problem: {name}. Expected one of {sorted(set(PROBLEMS) | set(BUILT_IN_PROBLEMS))}"
+        )
+    return PROBLEMS[name](config)
+
+
+def create_darwinian_evolution(config, ip, port, problem=None) -> Darwinian_evolution:
+    """
+    Build a Darwinian_evolution island for a problem with the options chosen in Config.
+
+    Args:
+    - config: Config instance.
+    - ip: IP address of the island.
+    - port: Port of the island.
+    - problem: Optional Problem. Defaults to the problem named by Config.problem.
+
+    Returns:
+    - Darwinian_evolution: The island, ready to run.
+    """
+    if problem is None:
+        problem = get_problem(config.problem, config)
+    population_store = "objects"
+    if problem.has_batch_kernels():
+        population_store = config.population_store
+
+    return Darwinian_evolution(
+        gene=problem.gene,
+        ga_calculate_fitness_proxy=problem.ga_calculate_fitness_proxy,
+        ga_generate_random_life=problem.ga_generate_random_life,
+        ga_procreation=problem.ga_procreation,
+        ga_mutation=problem.ga_mutation,
+        no_of_lives=config.no_of_lives,
+        maximise_fitness_proxy=problem.maximise_fitness_proxy,
+        max_generations=config.max_generations,
+        elitism=config.elitism,
+        child_procreation_rate=config.child_procreation_rate,
+        selection_method=config.selection_method,
+        ip=ip,
+        port=port,
+        ga_encode_gene=problem.ga_encode_gene,
+        ga_decode_gene=problem.ga_decode_gene,
+        ga_calculate_fitness_proxy_batch=problem.ga_calculate_fitness_proxy_batch,
+        ga_procreation_batch=problem.ga_procreation_batch,
+        population_store=population_store,
+        ga_mutation_with_delta=problem.ga_mutation_with_delta,
+        no_of_workers=config.no_of_workers if population_store == "arrays" else 0,
+        shared_arrays=problem.shared_arrays,
+        problem_fingerprint=problem.problem_fingerprint,
+        metrics=GenerationMetrics() if config.collect_metrics else None,
+        fitness_cache=(
+            FitnessCache(config.fitness_cache_size, problem.ga_fitness_cache_key)
+            if config.fitness_cache_size > 0
+            and problem.ga_fitness_cache_key is not None
+            else None
+        ),
+        termination_criteria=TerminationCriteria(
+            maximise_fitness_proxy=problem.maximise_fitness_proxy,
+            max_generations=config.max_generations,
+            time_budget=config.time_budget,
+            target_fitness_proxy=config.target_fitness_proxy,
+            stagnation_generations=config.stagnation_generations,
+            min_diversity=config.min_diversity,
+        ),
+        ga_mutation_batch=problem.ga_mutation_batch,
+        ga_generate_random_lives=problem.ga_generate_random_lives,
+        ga_local_search=problem.ga_local_search,
+        local_search_rate=config.local_search_rate,
+        local_search_target=config.local_search_target,
+    )
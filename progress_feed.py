@@ -0,0 +1,168 @@
+import json
+import queue
+import threading
+import time
+import requests
+from migration_channel import put_dropping_oldest
+
+
+def format_sse(event):
+    """
+    Format an event as a server-sent event.
+
+    Args:
+    - event: Dict with an "event" name, sent in full as the JSON data.
+
+    Returns:
+    - str: The server-sent event.
+    """
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+class ProgressFeed:
+    """
+    Broadcasts progress events, such as per-generation fitness and migrations,
+    to any number of stream subscribers.
+
+    Every subscriber has its own bounded queue. A slow subscriber loses its oldest
+    events instead of holding up the genetic algorithm or the other subscribers.
+
+    Attributes:
+    - subscribers: Queues of the connected subscribers.
+
+    Methods:
+    - has_subscribers(): Whether anyone is listening, so events need not be built otherwise.
+    - publish(): Sends an event to every subscriber.
+    - subscribe(): Registers a new subscriber and returns its queue.
+    - unsubscribe(): Removes a subscriber.
+    - stream(): Generator of server-sent events for one subscriber.
+    """
+
+    def __init__(self, max_queue_size=256, heartbeat_interval=15.0):
+        """
+        Initialize a ProgressFeed instance.
+
+        Args:
+        - max_queue_size: Events held for each subscriber before the oldest are dropped.
+        - heartbeat_interval: Seconds without events before a comment is sent to keep the connection open.
+        """
+        self.max_queue_size = max_queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            put_dropping_oldest(subscriber, event)
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def stream(self):
+        subscriber = self.subscribe()
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=self.heartbeat_interval)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            # Runs when the client disconnects and the response is closed
+            self.unsubscribe(subscriber)
+
+
+class StreamRelay:
+    """
+    Relays the /stream of every island into one ProgressFeed, tagging each event
+    with the island it came from. Islands are only streamed from while the feed
+    has subscribers, so an unwatched orchestrator puts no load on them.
+
+    Attributes:
+    - host_addresses: List of {"ip", "port"} dicts of the islands.
+    - progress_feed: The ProgressFeed the events are published to.
+    - retry_interval: Seconds to wait before reconnecting to an island.
+
+    Methods:
+    - start(): Starts one relay thread per island. Further calls do nothing.
+    """
+
+    def __init__(self, host_addresses, progress_feed, retry_interval=2.0):
+        self.host_addresses = host_addresses
+        self.progress_feed = progress_feed
+        self.retry_interval = retry_interval
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            self.threads = [
+                threading.Thread(
+                    target=self.relay_loop, args=(host_no, host_address), daemon=True
+                )
+                for host_no, host_address in enumerate(self.host_addresses)
+            ]
+            for thread in self.threads:
+                thread.start()
+
+    def relay_loop(self, host_no, host_address):
+        host = f"Host_{host_no}"
+        url = f"http://{host_address['ip']}:{host_address['port']}/stream"
+        is_reachable = None
+        session = requests.Session()
+        while True:
+            if not self.progress_feed.has_subscribers():
+                time.sleep(self.retry_interval)
+                continue
+            try:
+                # Islands send a heartbeat, so a silent connection has failed
+                with session.get(
+                    url,
+                    stream=True,
+                    timeout=(self.retry_interval, 4 * self.retry_interval + 15.0),
+                ) as response:
+                    response.raise_for_status()
+                    if is_reachable is not True:
+                        is_reachable = True
+                        self.progress_feed.publish(
+                            {"event": "island", "host": host, "status": "reachable"}
+                        )
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not self.progress_feed.has_subscribers():
+                            break
+                        if line and line.startswith("data: "):
+                            try:
+                                event = json.loads(line[len("data: ") :])
+                                event["host"] = host
+                            # A garbled or partial event is skipped, not the island
+                            except (ValueError, TypeError):
+                                continue
+                            self.progress_feed.publish(event)
+            except requests.RequestException as e:
+                if is_reachable is not False:
+                    is_reachable = False
+                    self.progress_feed.publish(
+                        {
+                            "event": "island",
+                            "host": host,
+                            "status": "unreachable",
+                            "error": type(e).__name__,
+                        }
+                    )
+                time.sleep(self.retry_interval)
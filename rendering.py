@@ -0,0 +1,237 @@
+"""
+Route images and animations of the fittest life.
+
+OpenCV and imageio are slow to import and take a lot of memory, so the genetic
+algorithm only imports this module when an image is requested. Island workers
+that never render start without them.
+"""
+
+import os
+import queue
+import threading
+import cv2
+import imageio.v2 as imageio
+import numpy as np
+from migration_channel import put_dropping_oldest
+
+# Seconds close() waits for the waiting routes to be drawn and the file to be written
+CLOSE_TIMEOUT = 30.0
+
+
+def save_image(img, path):
+    cv2.imwrite(path, img)
+
+
+def create_cities_img(life, generation_no, human_injection, size=1800):
+    # Get the cities array from the life dictionary
+    try:
+        cities = life.gene
+        fitness_proxy = life.fitness_proxy
+    except AttributeError:
+        cities = life["gene"]
+        fitness_proxy = life.get("fitness_proxy")
+    # Create a blank image with a white background
+    bar_height = 20
+    img_bar = np.zeros((size + bar_height, size, 3), dtype=np.uint8) + 255
+    bar = img_bar[size:, :]
+    img = img_bar[:size, :]
+
+    # Function to draw a circle for a city
+    def draw_city_circle(x, y, is_starting_city=False):
+        radius = 16 if is_starting_city else 10
+        color = (0, 255, 0) if is_starting_city else (255, 0, 0)
+        thickness = -1
+        cv2.circle(img, (x, y), radius, color, thickness)
+
+    # Function to draw a line connecting cities
+    def draw_city_line(city1, city2):
+        x1, y1 = int(city1["x"] * size), int(city1["y"] * size)
+        x2, y2 = int(city2["x"] * size), int(city2["y"] * size)
+        cv2.line(img, (x1, y1), (x2, y2), (0, 0, 255), thickness=2)  # Red lines
+
+    # Function to add city numbers next to dot
+    def add_city_numbers(x, y, city_number):
+        text = f"{city_number}"
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        org = (x, y)
+        fontScale = 1
+        color = (0, 0, 0)
+        thickness = 1
+        cv2.putText(
+            img, text, org, font, fontScale, color, thickness, cv2.LINE_AA, False
+        )
+
+    # Draw circles to represent cities
+    for index, city in enumerate(cities):
+        x, y = int(city["x"] * size), int(city["y"] * size)
+        draw_city_circle(x, y, is_starting_city=(index == 0))
+        if human_injection:
+            add_city_numbers(x, y, index)
+
+    if not human_injection:
+        # Draw lines connecting cities and mark them as circles
+        for i in range(len(cities)):
+            draw_city_line(cities[i], cities[(i + 1) % len(cities)])
+
+        # Display the distance and generation number
+        text = f"Gen: {generation_no} Distance: {round(fitness_proxy, 2)}"
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        org = (100, 50)
+        fontScale = 1.5
+        color = (0, 0, 0)
+        thickness = 2
+        img = cv2.putText(
+            img, text, org, font, fontScale, color, thickness, cv2.LINE_AA, False
+        )
+
+    return img_bar
+
+
+class RouteRenderer:
+    """
+    Draws the fittest route on a background thread and adds the frames to a GIF or
+    video, so rendering neither slows the generation loop nor writes intermediate
+    images. Video writers encode each frame as it arrives. imageio's GIF writer
+    keeps every frame in memory and only writes the file on close(), so a GIF
+    costs size * size * 3 bytes per frame until the island stops.
+
+    The cities never move, so they are drawn once. Each frame copies that
+    background and draws the whole route with a single polyline.
+
+    Attributes:
+    - path: Path of the animation. The extension picks the format, e.g. '.gif' or '.mp4'.
+    - size: Width and height of the frames in pixels.
+    - frame_duration: Seconds each frame is shown.
+    - frames_written: Number of frames written so far.
+
+    Methods:
+    - submit(): Queues a route to be drawn, dropping the oldest waiting route when full.
+    - render_frame(): Draws one route.
+    - close(): Draws the waiting routes and finishes the animation.
+    """
+
+    def __init__(
+        self, path, ga_decode_gene=None, size=600, frame_duration=0.5, max_queue_size=8
+    ):
+        """
+        Initialize a RouteRenderer instance.
+
+        Args:
+        - path: Path of the animation. '.mp4' and other video formats need imageio's ffmpeg plugin.
+        - ga_decode_gene: Optional function converting a compact gene into a list of city dicts.
+        - size: Width and height of the frames in pixels.
+        - frame_duration: Seconds each frame is shown.
+        - max_queue_size: Routes waiting to be drawn.
+        """
+        self.path = path
+        self.decode_gene = ga_decode_gene
+        self.size = size
+        self.frame_duration = frame_duration
+        self.frames_written = 0
+        # Lines, dots and text are scaled from the original 1800 pixel images
+        self.scale = size / 1800
+        self.background = None
+        self.pending = queue.Queue(maxsize=max_queue_size)
+        self.thread = threading.Thread(target=self.render_loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, gene, fitness_proxy, generation_no):
+        # The gene must already be a copy, the generation loop carries on meanwhile
+        put_dropping_oldest(self.pending, (gene, fitness_proxy, generation_no))
+
+    def render_loop(self):
+        writer = None
+        try:
+            while True:
+                route = self.pending.get()
+                if route is None:
+                    return
+                frame = self.render_frame(*route)
+                if writer is None:
+                    writer = self.open_writer()
+                writer.append_data(frame)
+                self.frames_written += 1
+        except (OSError, ValueError) as e:
+            # Routes keep being dropped from the full queue, so evolution is not held up
+            print(f"Error rendering {self.path}: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def open_writer(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.path.lower().endswith(".gif"):
+            return imageio.get_writer(
+                self.path, duration=self.frame_duration * 1000, loop=0
+            )
+        # Video writers encode every frame as it arrives, the GIF writer holds them until closed
+        return imageio.get_writer(self.path, fps=1 / self.frame_duration)
+
+    def route_points(self, gene):
+        cities = gene if self.decode_gene is None else self.decode_gene(gene)
+        coordinates = np.array([[city["x"], city["y"]] for city in cities])
+        return np.rint(coordinates * self.size).astype(np.int32)
+
+    def draw_cities(self, points):
+        # Colours are RGB, as the writers expect, unlike the BGR of create_cities_img
+        img = np.full((self.size, self.size, 3), 255, dtype=np.uint8)
+        radius = max(round(10 * self.scale), 1)
+        for x, y in points[1:]:
+            cv2.circle(img, (int(x), int(y)), radius, (0, 0, 255), -1)
+        # The starting city is the same in every route
+        x, y = points[0]
+        cv2.circle(
+            img, (int(x), int(y)), max(round(16 * self.scale), 1), (0, 255, 0), -1
+        )
+        return img
+
+    def render_frame(self, gene, fitness_proxy, generation_no):
+        """
+        Draw one route.
+
+        Args:
+        - gene: The route's gene.
+        - fitness_proxy: The route's fitness proxy, shown with the generation number.
+        - generation_no: The generation the route was found in.
+
+        Returns:
+        - np.ndarray: The RGB frame.
+        """
+        points = self.route_points(gene)
+        if self.background is None:
+            self.background = self.draw_cities(points)
+        img = self.background.copy()
+        cv2.polylines(
+            img,
+            [points.reshape(-1, 1, 2)],
+            isClosed=True,
+            color=(255, 0, 0),
+            thickness=max(round(2 * self.scale), 1),
+        )
+        cv2.putText(
+            img,
+            f"Gen: {generation_no} Distance: {round(fitness_proxy, 2)}",
+            (round(100 * self.scale), round(50 * self.scale)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.5 * self.scale,
+            (0, 0, 0),
+            max(round(2 * self.scale), 1),
+            cv2.LINE_AA,
+        )
+        return img
+
+    def close(self):
+        # A thread that died on an error takes nothing from the queue any more, so a
+        # blocking put into the full queue would never return
+        if not self.thread.is_alive():
+            return
+        # Waits for room behind the waiting routes, so they are still drawn. The
+        # timeout covers a thread that dies meanwhile
+        try:
+            self.pending.put(None, timeout=CLOSE_TIMEOUT)
+        except queue.Full:
+            print(f"Renderer of {self.path} stopped taking routes")
+            return
+        self.thread.join(timeout=CLOSE_TIMEOUT)
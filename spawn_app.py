@@ -1,14 +1,12 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+import os
 import threading
-import time
 from config import Config
-from genetic_algorithm_poc import (
-    ga_calculate_fitness_proxy,
-    ga_generate_random_life,
-    ga_mutation,
-    ga_procreation,
-)
-from darwinian_evolution import Darwinian_evolution
+from problems import create_darwinian_evolution, get_problem
+from migrant_codec import MIGRANT_CONTENT_TYPE
+from best_life_snapshot import IslandState
+from checkpoint import Checkpointer, load_checkpoint
+from progress_feed import ProgressFeed
 
 
 class SpawnApp:
@@ -16,9 +14,12 @@ class SpawnApp:
         self.ip_address = ip
         self.port = port
         self.app = Flask(__name__)
-        self.best_gene = None
-        self.best_fitness_proxy = None
-        self.generation_no = None
+        # Best lives handed over in-process by the genetic algorithm thread
+        self.island_state = IslandState()
+        # Set once the island is created, for /metrics
+        self.darwinian_evolution = None
+        # Streams generation and migration events to /stream subscribers
+        self.progress_feed = ProgressFeed()
         self.is_running = False
         self.genetic_algorithm_thread = None
         self.darwinian_evolution_thread = None
@@ -26,21 +27,45 @@ class SpawnApp:
     def run_genetic_algorithm(self):
         config = Config()
 
-        darwinian_evolution = Darwinian_evolution(
-            gene=config.cities,
-            ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
-            ga_generate_random_life=ga_generate_random_life,
-            ga_procreation=ga_procreation,
-            ga_mutation=ga_mutation,
-            no_of_lives=config.no_of_lives,
-            maximise_fitness_proxy=config.maximise_fitness_proxy,
-            max_generations=100,
-            elitism=config.elitism,
-            child_procreation_rate=config.child_procreation_rate,
-            selection_method=config.selection_method,
-            ip=self.ip_address,
-            port=self.port,
+        problem = get_problem(config.problem, config)
+        darwinian_evolution = create_darwinian_evolution(
+            config=config, ip=self.ip_address, port=self.port, problem=problem
         )
+        darwinian_evolution.progress_feed = self.progress_feed
+        darwinian_evolution.island_state = self.island_state
+        # Checkpoints store genes as arrays, so they need array genes
+        if config.checkpoint_interval > 0 and problem.gene_dtype is not None:
+            checkpoint_path = os.path.join(
+                config.checkpoint_dir, f"island_{self.ip_address}_{self.port}.npz"
+            )
+            if config.resume_from_checkpoint and os.path.exists(checkpoint_path):
+                darwinian_evolution.restore_state(load_checkpoint(checkpoint_path))
+                print(
+                    f"Resumed {self.ip_address}:{self.port} from generation "
+                    f"{darwinian_evolution.start_generation_no - 1}"
+                )
+            darwinian_evolution.checkpointer = Checkpointer(
+                checkpoint_path, config.checkpoint_interval
+            )
+        # Only TSP genes are routes
+        if config.render_route and problem.name == "tsp":
+            # Imported here, so islands that do not render never load OpenCV
+            from rendering import RouteRenderer
+
+            darwinian_evolution.route_renderer = RouteRenderer(
+                path=os.path.join(
+                    config.render_dir,
+                    f"island_{self.ip_address}_{self.port}.{config.render_format}",
+                ),
+                ga_decode_gene=darwinian_evolution.decode_gene,
+                size=config.render_size,
+                frame_duration=config.render_frame_duration,
+                max_queue_size=config.render_queue_size,
+            )
+        self.darwinian_evolution = darwinian_evolution
+        # A stop may have been requested while the island was being created
+        if not self.is_running:
+            darwinian_evolution.request_stop()
 
         self.darwinian_evolution_thread = threading.Thread(
             target=darwinian_evolution.run_genetic_algorithm
@@ -56,6 +81,9 @@ class SpawnApp:
 
     def stop_genetic_algorithm(self):
         self.is_running = False
+        if self.darwinian_evolution is not None:
+            # Finishes the current generation, then takes a final checkpoint
+            self.darwinian_evolution.request_stop()
         if self.genetic_algorithm_thread:
             self.genetic_algorithm_thread.join()
 
@@ -69,23 +97,74 @@ class SpawnApp:
         @self.app.route("/get_best_life", methods=["GET"])
         def return_best_gene():
             print("Handling /get_best_life request...")
-            msg = {
-                "best_gene": self.best_gene,
-                "best_fitness_proxy": self.best_fitness_proxy,
-                "generation_no": self.generation_no,
-            }
-            return jsonify(msg)
-
-        @self.app.route("/send_best_life", methods=["POST"])
-        def send_best_gene():
-            if request.method == "POST":
-                data = request.json
-                self.best_gene = data["best_gene"]
-                self.best_fitness_proxy = data["best_fitness_proxy"]
-                self.generation_no = data["generation_no"]
-                print(f"Received data from IP address:{self.ip_address}:{self.port}")
-                response_data = {"message": "Received best life successfully"}
-                return jsonify(response_data)
+            snapshot = self.island_state.snapshot
+            if snapshot is None:
+                msg = {
+                    "best_gene": None,
+                    "best_fitness_proxy": None,
+                    "generation_no": None,
+                }
+                return jsonify(msg)
+            # Binary only when asked for by name. JSON is listed first so a
+            # wildcard Accept, e.g. */* from browsers and requests, gets JSON
+            best_match = request.accept_mimetypes.best_match(
+                ["application/json", MIGRANT_CONTENT_TYPE]
+            )
+            if best_match == MIGRANT_CONTENT_TYPE:
+                payload = snapshot.migrant_payload()
+                if payload is not None:
+                    # Another island is taking in these lives as migrants
+                    self.progress_feed.publish(
+                        {
+                            "event": "migration",
+                            "ip": self.ip_address,
+                            "port": self.port,
+                            "direction": "out",
+                            "generation_no": snapshot.generation_no,
+                            "fitness_proxy": snapshot.fitness_proxies[0],
+                        }
+                    )
+                    return Response(payload, mimetype=MIGRANT_CONTENT_TYPE)
+            return jsonify(snapshot.to_dict())
+
+        @self.app.route("/metrics", methods=["GET"])
+        def metrics():
+            darwinian_evolution = self.darwinian_evolution
+            sources = []
+            if darwinian_evolution is not None:
+                sources = [
+                    source
+                    for source in (
+                        darwinian_evolution.metrics,
+                        darwinian_evolution.fitness_cache,
+                    )
+                    if source is not None
+                ]
+            if not sources:
+                return (
+                    "Metrics are disabled, enable Config.collect_metrics or Config.fitness_cache_size\n",
+                    404,
+                )
+            labels = {"island": f"{self.ip_address}:{self.port}"}
+            return Response(
+                "".join(source.to_prometheus(labels=labels) for source in sources),
+                mimetype="text/plain; version=0.0.4",
+            )
+
+        @self.app.route("/stop", methods=["POST"])
+        def stop():
+            print("Handling /stop request...")
+            self.stop_genetic_algorithm()
+            return jsonify({"status": "stopping"})
+
+        @self.app.route("/stream", methods=["GET"])
+        def stream_progress():
+            # Server-sent events, one per generation and per migration
+            return Response(
+                self.progress_feed.stream(),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
 
         # Start the genetic algorithm in a separate thread
         self.start_genetic_algorithm()
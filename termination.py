@@ -0,0 +1,120 @@
+import threading
+import time
+import numpy as np
+
+
+class TerminationCriteria:
+    """
+    Decides when an island stops evolving.
+
+    Every criterion is optional. The island stops when the first one is met, or
+    when a stop is requested from outside, e.g. broadcast by the orchestrator.
+
+    Attributes:
+    - max_generations: Stop after this many generations.
+    - time_budget: Stop after this many seconds of evolution.
+    - target_fitness_proxy: Stop once the best fitness proxy reaches this value.
+    - stagnation_generations: Stop after this many generations without improvement.
+    - min_diversity: Stop once the fraction of distinct fitness proxies in the population falls below this.
+    - stop_reason: Why the island stopped, None while it is running.
+
+    Methods:
+    - start(): Starts the clock of the time budget.
+    - request_stop(): Stops the island at the end of its current generation. Safe from other threads.
+    - should_stop(): Checks every criterion after a generation.
+    """
+
+    def __init__(
+        self,
+        maximise_fitness_proxy,
+        max_generations=None,
+        time_budget=None,
+        target_fitness_proxy=None,
+        stagnation_generations=None,
+        min_diversity=None,
+    ):
+        """
+        Initialize a TerminationCriteria instance. Criteria left as None are not checked.
+
+        Args:
+        - maximise_fitness_proxy: Flag indicating whether a larger fitness proxy is better.
+        - max_generations: Stop after this many generations.
+        - time_budget: Stop after this many seconds of evolution.
+        - target_fitness_proxy: Stop once the best fitness proxy reaches this value.
+        - stagnation_generations: Stop after this many generations without improvement.
+        - min_diversity: Stop once the fraction of distinct fitness proxies falls below this, from 0 to 1.
+        """
+        self.maximise_fitness_proxy = maximise_fitness_proxy
+        self.max_generations = max_generations
+        self.time_budget = time_budget
+        self.target_fitness_proxy = target_fitness_proxy
+        self.stagnation_generations = stagnation_generations
+        self.min_diversity = min_diversity
+        self.stop_requested = threading.Event()
+        self.stop_reason = None
+        self.start_time = None
+        self.best_fitness_proxy = None
+        self.generations_without_improvement = 0
+
+    def start(self):
+        self.start_time = time.time()
+
+    def request_stop(self):
+        self.stop_requested.set()
+
+    def is_better(self, fitness_proxy, other_fitness_proxy):
+        if self.maximise_fitness_proxy:
+            return fitness_proxy > other_fitness_proxy
+        return fitness_proxy < other_fitness_proxy
+
+    def should_stop(self, generations_run, best_fitness_proxy, fitness_proxies=None):
+        """
+        Check every criterion after a generation.
+
+        Args:
+        - generations_run: Number of generations run so far.
+        - best_fitness_proxy: Best fitness proxy found so far.
+        - fitness_proxies: Optional array of the population's fitness proxies, for the diversity criterion.
+
+        Returns:
+        - bool: Whether the island should stop. The reason is kept in stop_reason.
+        """
+        if self.best_fitness_proxy is None or self.is_better(
+            best_fitness_proxy, self.best_fitness_proxy
+        ):
+            self.best_fitness_proxy = best_fitness_proxy
+            self.generations_without_improvement = 0
+        else:
+            self.generations_without_improvement += 1
+
+        if self.stop_requested.is_set():
+            self.stop_reason = "stop_requested"
+        elif (
+            self.max_generations is not None and generations_run >= self.max_generations
+        ):
+            self.stop_reason = "max_generations"
+        elif (
+            self.time_budget is not None
+            and self.start_time is not None
+            and time.time() - self.start_time >= self.time_budget
+        ):
+            self.stop_reason = "time_budget"
+        elif self.target_fitness_proxy is not None and (
+            best_fitness_proxy == self.target_fitness_proxy
+            or self.is_better(best_fitness_proxy, self.target_fitness_proxy)
+        ):
+            self.stop_reason = "target_fitness_proxy"
+        elif (
+            self.stagnation_generations is not None
+            and self.generations_without_improvement >= self.stagnation_generations
+        ):
+            self.stop_reason = "stagnation"
+        elif (
+            self.min_diversity is not None
+            and fitness_proxies is not None
+            and len(fitness_proxies)
+            and len(np.unique(fitness_proxies)) / len(fitness_proxies)
+            < self.min_diversity
+        ):
+            self.stop_reason = "diversity_collapse"
+        return self.stop_reason is not None
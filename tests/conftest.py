@@ -0,0 +1,42 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def coordinates():
+    return np.random.RandomState(1).rand(40, 2)
+
+
+@pytest.fixture
+def distance_matrix(coordinates):
+    deltas = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+    return np.sqrt((deltas**2).sum(axis=-1))
+
+
+@pytest.fixture
+def routes(distance_matrix):
+    # Random routes that start at the home city 0
+    random_state = np.random.RandomState(2)
+    no_of_cities = len(distance_matrix)
+    return np.stack(
+        [
+            np.concatenate([[0], 1 + random_state.permutation(no_of_cities - 1)])
+            for _ in range(64)
+        ]
+    ).astype(np.int32)
+
+
+def route_lengths(genes, distance_matrix):
+    genes = np.atleast_2d(genes)
+    return distance_matrix[genes[:, :-1], genes[:, 1:]].sum(axis=1)
+
+
+def assert_valid_routes(genes, no_of_cities):
+    genes = np.atleast_2d(genes)
+    assert (genes[:, 0] == 0).all()
+    assert (np.sort(genes, axis=1) == np.arange(no_of_cities)).all()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from checkpoint import Checkpointer, load_checkpoint, write_checkpoint
+from config import Config
+from problems import create_darwinian_evolution
+
+
+def small_island(population_store):
+    config = Config()
+    config.no_of_lives = 60
+    config.population_store = population_store
+    return create_darwinian_evolution(config=config, ip="test", port=None)
+
+
+def run_generations(darwinian_evolution, no_of_generations):
+    best_fitness_proxies = []
+    for _ in range(no_of_generations):
+        darwinian_evolution.perform_generation_operations()
+        best_fitness_proxies.append(darwinian_evolution.get_best_fitness_proxy())
+    return best_fitness_proxies
+
+
+@pytest.mark.parametrize("population_store", ["arrays", "objects"])
+def test_restored_island_repeats_the_trajectory(tmp_path, population_store):
+    np.random.seed(0)
+    darwinian_evolution = small_island(population_store)
+    run_generations(darwinian_evolution, 5)
+    path = str(tmp_path / "island.npz")
+    write_checkpoint(path, darwinian_evolution.capture_state(4))
+    trajectory = run_generations(darwinian_evolution, 10)
+    final_fitness_proxies = darwinian_evolution.population.fitness_proxies().copy()
+
+    # A fresh island on another random stream, resumed from the checkpoint
+    np.random.seed(1)
+    resumed = small_island(population_store)
+    resumed.restore_state(load_checkpoint(path))
+    assert resumed.start_generation_no == 5
+    assert run_generations(resumed, 10) == trajectory
+    assert (resumed.population.fitness_proxies() == final_fitness_proxies).all()
+
+
+def test_close_writes_the_state_saved_last(tmp_path):
+    np.random.seed(0)
+    darwinian_evolution = small_island("arrays")
+    for attempt in range(20):
+        path = str(tmp_path / f"island_{attempt}.npz")
+        checkpointer = Checkpointer(path, interval=1)
+        run_generations(darwinian_evolution, 1)
+        checkpointer.save(darwinian_evolution.capture_state(attempt))
+        checkpointer.close()
+        assert not checkpointer.thread.is_alive()
+        state = load_checkpoint(path)
+        assert int(state["generation_no"]) == attempt
+        assert (
+            state["fitness_proxies"] == darwinian_evolution.population.fitness_proxies()
+        ).all()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from conftest import assert_valid_routes
+from crossover import crossover, crossover_batch
+
+CROSSOVER_METHODS = ("ox", "pmx", "cx", "erx")
+
+
+@pytest.mark.parametrize("crossover_method", CROSSOVER_METHODS)
+def test_crossover_children_are_routes(routes, crossover_method):
+    np.random.seed(0)
+    for parent_1, parent_2 in zip(routes[::2], routes[1::2]):
+        child = crossover(parent_1, parent_2, crossover_method)
+        assert_valid_routes(child, routes.shape[1])
+
+
+@pytest.mark.parametrize("crossover_method", CROSSOVER_METHODS)
+def test_crossover_batch_children_are_routes(routes, crossover_method):
+    np.random.seed(0)
+    parent_1_indices = np.random.randint(len(routes), size=100)
+    parent_2_indices = np.random.randint(len(routes), size=100)
+    children = crossover_batch(
+        routes, parent_1_indices, parent_2_indices, crossover_method
+    )
+    assert children.shape == (100, routes.shape[1])
+    assert children.dtype == routes.dtype
+    assert_valid_routes(children, routes.shape[1])
+
+
+@pytest.mark.parametrize("crossover_method", ["ox", "pmx", "cx"])
+def test_crossover_of_identical_parents_is_the_parent(routes, crossover_method):
+    np.random.seed(0)
+    child = crossover(routes[0], routes[0].copy(), crossover_method)
+    assert (child == routes[0]).all()
+
+
+def test_edge_recombination_of_identical_parents_keeps_their_edges(routes):
+    # ERX reads routes as cycles, so the child may run the parent's cycle backwards
+    parent = routes[0]
+    child = crossover(parent, parent.copy(), "erx")
+    assert child[0] == parent[0]
+    cycle_edges = {frozenset(edge) for edge in zip(parent, np.roll(parent, -1))}
+    assert {frozenset(edge) for edge in zip(child, np.roll(child, -1))} == cycle_edges
@@ -0,0 +1,46 @@
+import numpy as np
+import genetic_algorithm_poc as poc
+from config import Config
+from problems import create_darwinian_evolution
+
+
+def poc_routes(no_of_routes=32):
+    random_state = np.random.RandomState(3)
+    no_of_cities = len(poc.cities)
+    return np.stack(
+        [
+            np.concatenate([[0], 1 + random_state.permutation(no_of_cities - 1)])
+            for _ in range(no_of_routes)
+        ]
+    ).astype(np.int32)
+
+
+def test_batch_fitness_matches_single_gene_fitness():
+    routes = poc_routes()
+    fitness_proxies = poc.ga_calculate_fitness_proxy_batch(routes)
+    expected = [poc.ga_calculate_fitness_proxy(route) for route in routes]
+    assert np.allclose(fitness_proxies, expected)
+
+
+def test_permutation_fitness_matches_city_fitness():
+    for route in poc_routes(4):
+        assert np.isclose(
+            poc.ga_calculate_fitness_proxy(route),
+            poc.ga_calculate_fitness_proxy(poc.ga_decode_gene(route)),
+        )
+
+
+def test_population_scores_the_same_with_and_without_batch_fitness():
+    fitness_proxies = []
+    for batch_fitness in (False, True):
+        np.random.seed(0)
+        config = Config()
+        config.no_of_lives = 50
+        config.batch_fitness = batch_fitness
+        config.population_store = "objects"
+        darwinian_evolution = create_darwinian_evolution(
+            config=config, ip="test", port=None
+        )
+        assert darwinian_evolution.population.batch_fitness == batch_fitness
+        fitness_proxies.append(darwinian_evolution.population.fitness_proxies())
+    assert np.allclose(*fitness_proxies)
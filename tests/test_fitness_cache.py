@@ -0,0 +1,71 @@
+import numpy as np
+import genetic_algorithm_poc as poc
+from fitness_cache import FitnessCache
+from problems import array_gene_cache_key
+
+
+class CountingFitness:
+    def __init__(self):
+        self.genes_scored = 0
+
+    def __call__(self, gene):
+        self.genes_scored += 1
+        return float(np.sum(gene))
+
+    def batch(self, genes):
+        self.genes_scored += len(genes)
+        return genes.sum(axis=1).astype(float)
+
+
+def test_least_recently_used_fitness_proxy_is_evicted():
+    fitness_cache = FitnessCache(2, array_gene_cache_key)
+    fitness = CountingFitness()
+    calculate_fitness_proxy, _ = fitness_cache.wrap(fitness)
+    gene_1, gene_2, gene_3 = np.arange(3), np.arange(1, 4), np.arange(2, 5)
+    calculate_fitness_proxy(gene_1)
+    calculate_fitness_proxy(gene_2)
+    # Reading gene_1 makes gene_2 the least recently used
+    assert calculate_fitness_proxy(gene_1) == 3.0
+    calculate_fitness_proxy(gene_3)
+    assert len(fitness_cache.fitness_proxies) == 2
+    assert fitness.genes_scored == 3
+    calculate_fitness_proxy(gene_1)
+    assert fitness.genes_scored == 3
+    calculate_fitness_proxy(gene_2)
+    assert fitness.genes_scored == 4
+    assert (fitness_cache.hits, fitness_cache.misses) == (2, 4)
+    assert fitness_cache.hit_rate() == 2 / 6
+
+
+def test_batch_scores_only_the_missing_genes():
+    fitness_cache = FitnessCache(100, array_gene_cache_key)
+    fitness = CountingFitness()
+    _, calculate_fitness_proxy_batch = fitness_cache.wrap(fitness, fitness.batch)
+    genes = np.arange(12).reshape(4, 3)
+    first = calculate_fitness_proxy_batch(genes[:2])
+    second = calculate_fitness_proxy_batch(genes)
+    assert fitness.genes_scored == 4
+    assert (second == genes.sum(axis=1)).all()
+    assert (second[:2] == first).all()
+    assert fitness_cache.hits == 2
+
+
+def test_tsp_cache_keys_tell_routes_apart():
+    route = np.arange(6, dtype=np.int32)
+    assert poc.ga_fitness_cache_key(route) == poc.ga_fitness_cache_key(route.copy())
+    swapped = route.copy()
+    swapped[[2, 3]] = swapped[[3, 2]]
+    assert poc.ga_fitness_cache_key(route) != poc.ga_fitness_cache_key(swapped)
+    cities = poc.ga_decode_gene(route)
+    assert poc.ga_fitness_cache_key(cities) == poc.ga_fitness_cache_key(list(cities))
+
+
+def test_prometheus_counters():
+    fitness_cache = FitnessCache(10, array_gene_cache_key)
+    calculate_fitness_proxy, _ = fitness_cache.wrap(CountingFitness())
+    calculate_fitness_proxy(np.arange(3))
+    calculate_fitness_proxy(np.arange(3))
+    text = fitness_cache.to_prometheus(labels={"island": "a"})
+    assert 'ga_fitness_cache_hits_total{island="a"} 1' in text
+    assert 'ga_fitness_cache_misses_total{island="a"} 1' in text
+    assert 'ga_fitness_cache_size{island="a"} 1' in text
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import pytest
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Maximum seconds importing a module an island worker needs may take
+IMPORT_BUDGET = 1.0
+# Modules that must only load when an image is rendered
+FORBIDDEN_MODULES = ("cv2", "imageio")
+
+
+@pytest.mark.parametrize("module", ["genetic_algorithm_poc", "spawn_app"])
+def test_island_modules_import_within_budget(module):
+    # A fresh interpreter, so nothing is imported already
+    code = (
+        "import sys, time\n"
+        "start_time = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start_time)\n"
+        f"print(','.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPOSITORY_ROOT,
+    ).stdout.splitlines()
+    import_time, loaded_modules = float(output[0]), output[1]
+    assert not loaded_modules, f"{module} imports {loaded_modules}"
+    assert (
+        import_time <= IMPORT_BUDGET
+    ), f"Importing {module} took {import_time:.3f}s, over the {IMPORT_BUDGET}s budget"
@@ -0,0 +1,44 @@
+import random
+import numpy as np
+from config import Config
+from problems import create_darwinian_evolution
+
+
+def run_island(seed, population_store="arrays", no_of_generations=10):
+    np.random.seed(seed)
+    random.seed(seed)
+    config = Config()
+    config.no_of_lives = 60
+    config.population_store = population_store
+    darwinian_evolution = create_darwinian_evolution(
+        config=config, ip="test", port=None
+    )
+    for _ in range(no_of_generations):
+        darwinian_evolution.perform_generation_operations()
+    return darwinian_evolution
+
+
+def test_config_leaves_the_global_random_stream_alone():
+    np.random.seed(5)
+    expected = np.random.random()
+    np.random.seed(5)
+    Config()
+    assert np.random.random() == expected
+
+
+def test_islands_with_different_seeds_diverge():
+    for population_store in ("arrays", "objects"):
+        island_1 = run_island(1, population_store)
+        island_2 = run_island(2, population_store)
+        assert not np.array_equal(
+            island_1.population.fitness_proxies(),
+            island_2.population.fitness_proxies(),
+        )
+
+
+def test_islands_with_the_same_seed_agree():
+    island_1 = run_island(3)
+    island_2 = run_island(3)
+    assert (
+        island_1.population.fitness_proxies() == island_2.population.fitness_proxies()
+    ).all()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from large_tsp import ga_generate_random_lives, nearest_neighbours
+from tsplib import load_tsplib
+
+
+def brute_force_neighbour_distances(coordinates, no_of_neighbours):
+    distances = np.sqrt(((coordinates[:, np.newaxis] - coordinates) ** 2).sum(axis=-1))
+    np.fill_diagonal(distances, np.inf)
+    return np.sort(distances, axis=1)[:, :no_of_neighbours]
+
+
+@pytest.mark.parametrize(
+    "layout",
+    ["uniform", "clustered", "collinear", "duplicates", "few"],
+)
+@pytest.mark.parametrize("no_of_neighbours", [1, 10])
+def test_grid_neighbours_are_the_nearest(layout, no_of_neighbours):
+    random_state = np.random.RandomState(0)
+    coordinates = {
+        "uniform": random_state.rand(2000, 2) * 1000,
+        "clustered": np.concatenate(
+            [
+                random_state.normal(centre, 0.01, (300, 2))
+                for centre in random_state.rand(5, 2)
+            ]
+        ),
+        "collinear": np.c_[random_state.rand(500), np.zeros(500)],
+        "duplicates": np.repeat(random_state.rand(100, 2), 3, axis=0),
+        "few": random_state.rand(3, 2),
+    }[layout]
+    neighbours = nearest_neighbours(coordinates, no_of_neighbours)
+    assert (neighbours != np.arange(len(coordinates))[:, np.newaxis]).all()
+    neighbour_distances = np.sqrt(
+        ((coordinates[:, np.newaxis] - coordinates[neighbours]) ** 2).sum(axis=-1)
+    )
+    assert np.allclose(
+        neighbour_distances,
+        brute_force_neighbour_distances(coordinates, neighbours.shape[1]),
+    )
+
+
+def test_random_lives_are_routes():
+    np.random.seed(0)
+    gene = np.arange(500, dtype=np.int32)
+    genes = ga_generate_random_lives(gene, 20)
+    assert genes.dtype == gene.dtype
+    assert (genes[:, 0] == 0).all()
+    assert (np.sort(genes, axis=1) == gene).all()
+    assert len({row.tobytes() for row in genes}) == 20
+
+
+def test_load_tsplib(tmp_path):
+    path = tmp_path / "three.tsp"
+    path.write_text(
+        "NAME : three\n"
+        "COMMENT : A test\n"
+        "TYPE : TSP\n"
+        "DIMENSION : 3\n"
+        "EDGE_WEIGHT_TYPE : EUC_2D\n"
+        "NODE_COORD_SECTION\n"
+        "1 0 0\n"
+        "2 3.5 4\n"
+        "3 1e2 -2\n"
+        "EOF\n"
+    )
+    problem = load_tsplib(str(path))
+    assert problem["name"] == "three"
+    assert problem["comment"] == "A test"
+    assert (problem["coordinates"] == [[0, 0], [3.5, 4], [100, -2]]).all()
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "TYPE : ATSP\nDIMENSION : 1\nEDGE_WEIGHT_TYPE : EUC_2D\n",
+        "TYPE : TSP\nDIMENSION : 1\nEDGE_WEIGHT_TYPE : GEO\n",
+        "TYPE : TSP\nDIMENSION : 2\nEDGE_WEIGHT_TYPE : EUC_2D\n",
+    ],
+)
+def test_load_tsplib_rejects_unsupported_files(tmp_path, header):
+    path = tmp_path / "bad.tsp"
+    path.write_text(header + "NODE_COORD_SECTION\n1 0 0\nEOF\n")
+    with pytest.raises(ValueError):
+        load_tsplib(str(path))
@@ -0,0 +1,71 @@
+import numpy as np
+from life import Life
+
+
+class CountingFitness:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, gene):
+        self.calls += 1
+        return float(np.sum(gene))
+
+
+def make_life(gene, ga_calculate_fitness_proxy, **kwargs):
+    return Life(
+        gene=gene,
+        ga_calculate_fitness_proxy=ga_calculate_fitness_proxy,
+        ga_generate_random_life=lambda gene: gene[::-1].copy(),
+        ga_mutation=lambda gene: gene + 1,
+        **kwargs,
+    )
+
+
+def test_known_gene_is_kept_and_scored_once_when_read():
+    gene = np.arange(5)
+    fitness = CountingFitness()
+    life = make_life(gene, fitness, randomise=False)
+    assert life.gene is gene
+    assert fitness.calls == 0
+    assert not life.is_evaluated
+    assert life.fitness_proxy == 10.0
+    assert life.fitness_proxy == 10.0
+    assert fitness.calls == 1
+
+
+def test_given_fitness_proxy_is_not_recalculated():
+    fitness = CountingFitness()
+    life = make_life(np.arange(5), fitness, randomise=False, fitness_proxy=3.0)
+    assert life.fitness_proxy == 3.0
+    assert fitness.calls == 0
+
+
+def test_random_life_generates_a_gene_without_scoring_it():
+    fitness = CountingFitness()
+    life = make_life(np.arange(5), fitness)
+    assert (life.gene == np.arange(5)[::-1]).all()
+    assert fitness.calls == 0
+
+
+def test_mutation_marks_the_life_for_re_evaluation():
+    fitness = CountingFitness()
+    life = make_life(np.arange(5), fitness, randomise=False)
+    assert life.fitness_proxy == 10.0
+    life.mutate_life()
+    assert not life.is_evaluated
+    assert life.fitness_proxy == 15.0
+    assert fitness.calls == 2
+
+
+def test_mutation_with_delta_updates_the_fitness_proxy_without_scoring():
+    fitness = CountingFitness()
+    life = make_life(
+        np.arange(5),
+        fitness,
+        randomise=False,
+        ga_mutation_with_delta=lambda gene: (gene + 1, 5.0),
+    )
+    assert life.fitness_proxy == 10.0
+    life.mutate_life()
+    assert life.fitness_proxy == 15.0
+    assert fitness.calls == 1
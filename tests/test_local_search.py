@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from conftest import assert_valid_routes, route_lengths
+from local_search import (
+    coordinate_distance,
+    improve_route,
+    matrix_distance,
+    nearest_neighbour_lists,
+)
+
+
+def test_nearest_neighbour_lists(distance_matrix):
+    neighbours = nearest_neighbour_lists(distance_matrix, 6)
+    assert neighbours.shape == (len(distance_matrix), 6)
+    assert (neighbours != np.arange(len(distance_matrix))[:, np.newaxis]).all()
+    neighbour_distances = np.take_along_axis(distance_matrix, neighbours, axis=1)
+    assert (np.diff(neighbour_distances, axis=1) >= 0).all()
+    # No city outside the list is nearer than the furthest neighbour
+    others = distance_matrix.copy()
+    np.fill_diagonal(others, np.inf)
+    np.put_along_axis(others, neighbours, np.inf, axis=1)
+    assert (others.min(axis=1) >= neighbour_distances[:, -1]).all()
+
+
+def test_improve_route_delta_is_the_change_in_length(routes, distance_matrix):
+    distance = matrix_distance(distance_matrix)
+    neighbours = nearest_neighbour_lists(distance_matrix, 8)
+    for gene in routes:
+        improved, delta = improve_route(gene, distance, neighbours)
+        assert improved.dtype == gene.dtype
+        assert_valid_routes(improved, len(distance_matrix))
+        assert delta <= 0
+        assert route_lengths(improved, distance_matrix)[0] == pytest.approx(
+            route_lengths(gene, distance_matrix)[0] + delta
+        )
+
+
+def test_improve_route_with_coordinates(routes, coordinates, distance_matrix):
+    improved, delta = improve_route(
+        routes[0],
+        coordinate_distance(coordinates),
+        nearest_neighbour_lists(distance_matrix, 8),
+    )
+    assert route_lengths(improved, distance_matrix)[0] == pytest.approx(
+        route_lengths(routes[0], distance_matrix)[0] + delta
+    )
+
+
+def test_improve_route_shortens_random_routes(routes, distance_matrix):
+    distance = matrix_distance(distance_matrix)
+    neighbours = nearest_neighbour_lists(distance_matrix, 8)
+    improved_lengths = [
+        route_lengths(improve_route(gene, distance, neighbours)[0], distance_matrix)[0]
+        for gene in routes[:8]
+    ]
+    assert max(improved_lengths) < route_lengths(routes[:8], distance_matrix).min()
+
+
+@pytest.mark.parametrize("no_of_cities", [1, 2, 3, 4])
+def test_improve_route_of_few_cities(no_of_cities):
+    coordinates = np.random.RandomState(0).rand(no_of_cities, 2)
+    gene = np.arange(no_of_cities, dtype=np.int32)
+    neighbours = np.argsort(
+        ((coordinates[:, np.newaxis] - coordinates) ** 2).sum(axis=-1), axis=1
+    )[:, 1:]
+    improved, _ = improve_route(gene, coordinate_distance(coordinates), neighbours)
+    assert_valid_routes(improved, no_of_cities)
@@ -0,0 +1,82 @@
+import numpy as np
+from config import Config
+from metrics import GENERATION_PHASES, GenerationMetrics
+from problems import create_darwinian_evolution
+
+
+def prometheus_samples(text):
+    return dict(
+        line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#")
+    )
+
+
+def test_generations_accumulate_per_phase_and_notify_callbacks():
+    metrics = GenerationMetrics()
+    generations = []
+    metrics.add_callback(generations.append)
+    metrics.record_generation({"selection": 0.5, "merge": 0.25}, 3.0)
+    metrics.record_generation({"selection": 0.25}, 2.0)
+    assert metrics.generations == 2
+    assert metrics.phase_seconds["selection"] == 0.75
+    assert metrics.phase_calls["selection"] == 2
+    assert metrics.phase_calls["merge"] == 1
+    assert metrics.last_phase_seconds["selection"] == 0.25
+    assert metrics.best_fitness_proxy == 2.0
+    assert [generation["generation_no"] for generation in generations] == [0, 1]
+
+
+def test_fitness_evaluations_are_counted():
+    metrics = GenerationMetrics()
+    calculate_fitness_proxy, calculate_fitness_proxy_batch = (
+        metrics.count_fitness_evaluations(np.sum, lambda genes: genes.sum(axis=1))
+    )
+    assert calculate_fitness_proxy(np.arange(3)) == 3
+    assert (calculate_fitness_proxy_batch(np.ones((4, 2))) == 2).all()
+    assert metrics.fitness_evaluations == 5
+    assert metrics.count_fitness_evaluations(np.sum)[1] is None
+
+
+def test_prometheus_text():
+    metrics = GenerationMetrics()
+    metrics.record_generation({"selection": 0.5}, 3.0)
+    metrics.record_migration(0.02, 1)
+    metrics.record_migration(7.0, 0)
+    text = metrics.to_prometheus(labels={"island": "127.0.0.2:5002"})
+    assert "# TYPE ga_migration_latency_seconds histogram" in text
+    samples = prometheus_samples(text)
+    island = 'island="127.0.0.2:5002"'
+    assert samples[f'ga_phase_seconds_total{{{island},phase="selection"}}'] == "0.5"
+    assert samples[f"ga_generations_total{{{island}}}"] == "1"
+    assert samples[f"ga_best_fitness_proxy{{{island}}}"] == "3.0"
+    assert samples[f'ga_migration_requests_total{{{island},result="empty"}}'] == "1"
+    # Buckets are cumulative, and the slow request only counts towards +Inf
+    assert samples[f'ga_migration_latency_seconds_bucket{{{island},le="0.01"}}'] == "0"
+    assert samples[f'ga_migration_latency_seconds_bucket{{{island},le="0.025"}}'] == "1"
+    assert samples[f'ga_migration_latency_seconds_bucket{{{island},le="5.0"}}'] == "1"
+    assert samples[f'ga_migration_latency_seconds_bucket{{{island},le="+Inf"}}'] == "2"
+    assert samples[f"ga_migration_latency_seconds_count{{{island}}}"] == "2"
+
+
+def test_unlabelled_metrics_before_any_generation():
+    samples = prometheus_samples(GenerationMetrics().to_prometheus())
+    assert samples["ga_generations_total"] == "0"
+    assert samples["ga_best_fitness_proxy"] == "NaN"
+
+
+def test_island_records_every_generation():
+    np.random.seed(0)
+    config = Config()
+    config.no_of_lives = 40
+    config.collect_metrics = True
+    darwinian_evolution = create_darwinian_evolution(
+        config=config, ip="test", port=None
+    )
+    metrics = darwinian_evolution.metrics
+    initial_evaluations = metrics.fitness_evaluations
+    for _ in range(3):
+        darwinian_evolution.perform_generation_operations()
+    assert metrics.generations == 3
+    assert metrics.fitness_evaluations > initial_evaluations
+    assert set(metrics.phase_seconds) == set(GENERATION_PHASES)
+    assert metrics.phase_calls["selection"] == 3
+    assert metrics.best_fitness_proxy == darwinian_evolution.get_best_fitness_proxy()
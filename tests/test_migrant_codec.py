@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from config import Config
+from migrant_codec import decode_migrants, encode_migrants, problem_fingerprint
+from problems import get_problem
+
+
+@pytest.mark.parametrize("gene_length", [5, 1 << 16, (1 << 16) + 1])
+def test_migrants_round_trip(gene_length):
+    random_state = np.random.RandomState(0)
+    genes = np.stack([random_state.permutation(gene_length) for _ in range(3)])
+    fingerprint = problem_fingerprint(np.arange(4))
+    payload = encode_migrants(genes, [1.5, 2.5, 3.5], [7, 8, 9], 12, fingerprint)
+
+    decoded = decode_migrants(payload)
+    assert decoded["island_id"] == 12
+    assert decoded["fingerprint"] == fingerprint
+    assert len(decoded["migrants"]) == 3
+    for gene, fitness_proxy, generation_no, migrant in zip(
+        genes, [1.5, 2.5, 3.5], [7, 8, 9], decoded["migrants"]
+    ):
+        assert (migrant["gene"] == gene).all()
+        assert migrant["fitness_proxy"] == fitness_proxy
+        assert migrant["generation_no"] == generation_no
+
+
+def test_decoding_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        decode_migrants(b"\0" * 64)
+
+
+def test_decoding_rejects_truncated_payloads():
+    genes = np.stack([np.arange(10), np.arange(10)[::-1]])
+    payload = encode_migrants(genes, [1.0, 2.0], [1, 1], 0, problem_fingerprint())
+    for size in (4, len(payload) - 1):
+        with pytest.raises(ValueError):
+            decode_migrants(payload[:size])
+    with pytest.raises(ValueError):
+        decode_migrants(payload + b"\0")
+
+
+def test_fingerprints_tell_problems_apart():
+    distance_matrix = np.random.RandomState(0).rand(5, 5)
+    assert problem_fingerprint(distance_matrix) == problem_fingerprint(
+        distance_matrix.copy()
+    )
+    changed = distance_matrix.copy()
+    changed[1, 2] += 1e-9
+    assert problem_fingerprint(distance_matrix) != problem_fingerprint(changed)
+    # Shape and dtype count, not only the bytes
+    assert problem_fingerprint(np.zeros(4)) != problem_fingerprint(np.zeros((2, 2)))
+    assert problem_fingerprint(np.zeros(4, np.int64)) != problem_fingerprint(
+        np.zeros(8, np.int32)
+    )
+
+
+@pytest.mark.parametrize("problem_name", ["tsp", "large_tsp", "knapsack"])
+def test_genes_round_trip(problem_name):
+    config = Config()
+    config.no_of_cities = 30
+    problem = get_problem(problem_name, config)
+    np.random.seed(0)
+    gene = problem.ga_generate_random_life(problem.gene)
+    encoded = problem.ga_encode_gene(problem.ga_decode_gene(gene))
+    assert encoded.dtype == problem.gene_dtype
+    assert (encoded == gene).all()
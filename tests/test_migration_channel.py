@@ -0,0 +1,103 @@
+import json
+import time
+import numpy as np
+from migrant_codec import MIGRANT_CONTENT_TYPE, encode_migrants, problem_fingerprint
+from migration_channel import MigrationChannel
+
+HOST_ADDRESSES = [{"ip": "127.0.0.2", "port": 5002}, {"ip": "127.0.0.3", "port": 5003}]
+
+
+class FakeResponse:
+    def __init__(self, content, content_type="application/json"):
+        self.status_code = 200
+        self.headers = {"Content-Type": content_type}
+        self.content = content
+        self.text = content.decode(errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession:
+    """Answers every request with the next of the given responses."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, headers=None, timeout=None):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def make_channel(responses, problem_fingerprint=None):
+    channel = MigrationChannel(
+        ip="127.0.0.2",
+        port=5002,
+        host_addresses=HOST_ADDRESSES,
+        problem_fingerprint=problem_fingerprint,
+    )
+    channel.session = FakeSession(responses)
+    return channel
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def fetch(channel, no_of_requests):
+    migrants = []
+    channel.start()
+    try:
+        for _ in range(no_of_requests):
+            channel.request_migrant()
+            # One request is pending at a time
+            assert wait_until(channel.migrant_requests.empty)
+        assert wait_until(lambda: not channel.session.responses)
+        assert channel.threads[0].is_alive()
+        wait_until(lambda: migrants.extend(channel.drain()) or migrants, timeout=0.5)
+    finally:
+        channel.stop()
+    return migrants
+
+
+def test_malformed_answers_do_not_stop_the_channel():
+    channel = make_channel(
+        [
+            FakeResponse(b'{"best_gene": [0, 2'),
+            FakeResponse(b"[1, 2, 3]"),
+            FakeResponse(json.dumps({"best_gene": [0, 2, 1]}).encode()),
+        ]
+    )
+    migrants = fetch(channel, 3)
+    assert len(migrants) == 1
+    assert np.array_equal(migrants[0]["gene"], [0, 2, 1])
+    assert migrants[0]["is_encoded"] is False
+
+
+def migrant_payload(fingerprint):
+    genes = np.stack([np.arange(6), np.array([0, 5, 4, 3, 2, 1])])
+    return FakeResponse(
+        encode_migrants(genes, [4.0, 3.0], [9, 9], 3, fingerprint),
+        MIGRANT_CONTENT_TYPE,
+    )
+
+
+def test_binary_migrants_of_the_same_problem_keep_their_fitness_proxy():
+    fingerprint = problem_fingerprint(np.arange(6))
+    channel = make_channel([migrant_payload(fingerprint)], fingerprint)
+    migrants = fetch(channel, 1)
+    assert [migrant["fitness_proxy"] for migrant in migrants] == [4.0, 3.0]
+    assert all(migrant["is_encoded"] for migrant in migrants)
+
+
+def test_binary_migrants_of_another_problem_are_dropped():
+    channel = make_channel(
+        [migrant_payload(problem_fingerprint(np.arange(7)))],
+        problem_fingerprint(np.arange(6)),
+    )
+    assert fetch(channel, 1) == []
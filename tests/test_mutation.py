@@ -0,0 +1,46 @@
+import random
+import numpy as np
+import pytest
+from conftest import assert_valid_routes, route_lengths
+from mutation import MUTATION_OPERATORS, mutate, mutate_batch, neighbour_inversion_batch
+from local_search import nearest_neighbour_lists
+
+
+@pytest.mark.parametrize("mutation_operator", sorted(MUTATION_OPERATORS))
+def test_mutate_delta_is_the_change_in_length(
+    routes, distance_matrix, mutation_operator
+):
+    random.seed(0)
+    for gene in routes:
+        length = route_lengths(gene, distance_matrix)[0]
+        delta = mutate(gene, distance_matrix, mutation_operator)
+        assert route_lengths(gene, distance_matrix)[0] == pytest.approx(length + delta)
+    assert_valid_routes(routes, len(distance_matrix))
+
+
+@pytest.mark.parametrize("mutation_operator", sorted(MUTATION_OPERATORS))
+def test_mutate_batch_deltas_are_the_changes_in_length(
+    routes, distance_matrix, mutation_operator
+):
+    np.random.seed(0)
+    lengths = route_lengths(routes, distance_matrix)
+    deltas = mutate_batch(routes, distance_matrix, 0.5, mutation_operator)
+    assert np.allclose(route_lengths(routes, distance_matrix), lengths + deltas)
+    assert_valid_routes(routes, len(distance_matrix))
+
+
+def test_mutate_batch_leaves_other_rows_alone(routes, distance_matrix):
+    np.random.seed(0)
+    original = routes.copy()
+    deltas = mutate_batch(routes, distance_matrix, 0.0)
+    assert (deltas == 0).all()
+    assert (routes == original).all()
+
+
+def test_neighbour_inversion_deltas_are_the_changes_in_length(routes, distance_matrix):
+    np.random.seed(0)
+    neighbours = nearest_neighbour_lists(distance_matrix, 5)
+    lengths = route_lengths(routes, distance_matrix)
+    deltas = neighbour_inversion_batch(routes, distance_matrix, neighbours, 1.0)
+    assert np.allclose(route_lengths(routes, distance_matrix), lengths + deltas)
+    assert_valid_routes(routes, len(distance_matrix))
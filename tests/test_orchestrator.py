@@ -0,0 +1,95 @@
+import json
+import requests
+from orchestrator import IslandStatusCache
+
+HOST_ADDRESSES = [{"ip": "127.0.0.2", "port": 5002}, {"ip": "127.0.0.3", "port": 5003}]
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class FakeSession:
+    """Answers each island with its entry of answers, counting the requests."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.no_of_requests = 0
+
+    def get(self, url, timeout=None):
+        self.no_of_requests += 1
+        answer = self.answers[url]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def make_cache(answers, ttl=60.0, maximise_fitness_proxy=False):
+    island_status_cache = IslandStatusCache(
+        host_addresses=HOST_ADDRESSES,
+        timeout=0.1,
+        ttl=ttl,
+        maximise_fitness_proxy=maximise_fitness_proxy,
+    )
+    island_status_cache.session = FakeSession(
+        {
+            f"http://{host_address['ip']}:{host_address['port']}/get_best_life": answer
+            for host_address, answer in zip(HOST_ADDRESSES, answers)
+        }
+    )
+    return island_status_cache
+
+
+def best_life(generation_no, fitness_proxy):
+    return FakeResponse(
+        200,
+        json.dumps(
+            {"generation_no": generation_no, "best_fitness_proxy": fitness_proxy}
+        ),
+    )
+
+
+def test_snapshot_picks_the_fittest_island():
+    snapshot = make_cache([best_life(3, 9.5), best_life(4, 7.5)]).get_snapshot()
+    assert snapshot["best life"] == {"Host": "Host_1", "Fitness proxy": "7.5"}
+    assert snapshot["host_0"] == {
+        "Status": "ok",
+        "Generation": 3,
+        "Fitness proxy": 9.5,
+    }
+    assert snapshot["unreachable hosts"] == 0
+
+    snapshot = make_cache(
+        [best_life(3, 9.5), best_life(4, 7.5)], maximise_fitness_proxy=True
+    ).get_snapshot()
+    assert snapshot["best life"]["Host"] == "Host_0"
+
+
+def test_timeouts_and_bad_bodies_mark_islands_unreachable():
+    for answer, error in [
+        (requests.Timeout(), "Timeout"),
+        (FakeResponse(500, ""), "HTTP 500"),
+        (FakeResponse(200, "<html>"), "JSONDecodeError"),
+        (FakeResponse(200, "[1]"), "TypeError"),
+    ]:
+        snapshot = make_cache([answer, best_life(4, 7.5)]).get_snapshot()
+        assert snapshot["host_0"] == {"Status": "unreachable", "Error": error}
+        assert snapshot["unreachable hosts"] == 1
+        assert snapshot["best life"]["Host"] == "Host_1"
+
+
+def test_snapshot_is_reused_until_it_expires():
+    island_status_cache = make_cache([best_life(3, 9.5), best_life(4, 7.5)])
+    snapshot = island_status_cache.get_snapshot()
+    assert island_status_cache.get_snapshot() is snapshot
+    assert island_status_cache.session.no_of_requests == 2
+
+    island_status_cache.ttl = 0.0
+    island_status_cache.snapshot_time -= 1.0
+    assert island_status_cache.get_snapshot() is not snapshot
+    assert island_status_cache.session.no_of_requests == 4
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import genetic_algorithm_poc as poc
+from config import Config, random_cities
+from problems import create_darwinian_evolution, get_problem
+
+
+def tsp_config(no_of_cities, population_store="arrays"):
+    config = Config()
+    config.no_of_lives = 40
+    config.no_of_cities = no_of_cities
+    config.cities = random_cities(no_of_cities, seed=4)
+    config.city_indices = np.arange(no_of_cities, dtype=np.int32)
+    config.population_store = population_store
+    config.local_search_rate = 0.2
+    return config
+
+
+def lengths(genes, cities):
+    coordinates = np.array([[city["x"], city["y"]] for city in cities])
+    points = coordinates[np.atleast_2d(genes)]
+    return np.sqrt((np.diff(points, axis=1) ** 2).sum(axis=-1)).sum(axis=1)
+
+
+@pytest.mark.parametrize("no_of_cities", [30, 120])
+@pytest.mark.parametrize("population_store", ["arrays", "objects"])
+def test_tsp_islands_route_the_config_cities(no_of_cities, population_store):
+    np.random.seed(0)
+    config = tsp_config(no_of_cities, population_store)
+    darwinian_evolution = create_darwinian_evolution(
+        config=config, ip="test", port=None
+    )
+    for _ in range(5):
+        darwinian_evolution.perform_generation_operations()
+    lives = darwinian_evolution.get_best_lives(10)
+    genes = np.stack([life.gene for life in lives])
+    assert genes.shape[1] == no_of_cities
+    assert np.allclose(
+        [life.fitness_proxy for life in lives], lengths(genes, config.cities)
+    )
+    assert darwinian_evolution.decode_gene(genes[0]) == [
+        config.cities[index] for index in genes[0]
+    ]
+
+
+def test_tsp_problem_functions_use_the_config_cities():
+    config = tsp_config(30)
+    problem = get_problem("tsp", config)
+    gene = np.random.RandomState(0).permutation(30).astype(np.int32)
+    assert np.isclose(
+        problem.ga_calculate_fitness_proxy(gene), lengths(gene, config.cities)[0]
+    )
+    assert (problem.ga_encode_gene(problem.ga_decode_gene(gene)) == gene).all()
+    # Islands of another city layout do not take in each other's migrants
+    assert (
+        problem.problem_fingerprint != get_problem("tsp", Config()).problem_fingerprint
+    )
+    # The module level defaults stay on the module's own cities
+    assert len(poc.cities) == poc.NO_OF_CITIES
+
+
+@pytest.mark.parametrize("problem_name", ["large_tsp", "knapsack"])
+def test_registered_problems_evolve(problem_name):
+    np.random.seed(0)
+    config = Config()
+    config.problem = problem_name
+    config.no_of_lives = 40
+    config.no_of_cities = 60
+    darwinian_evolution = create_darwinian_evolution(
+        config=config, ip="test", port=None
+    )
+    for _ in range(3):
+        darwinian_evolution.perform_generation_operations()
+    assert np.isfinite(darwinian_evolution.get_best_fitness_proxy())
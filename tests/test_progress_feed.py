@@ -0,0 +1,91 @@
+import json
+import requests
+import progress_feed
+from progress_feed import ProgressFeed, StreamRelay, format_sse
+
+
+def test_every_subscriber_receives_the_events():
+    feed = ProgressFeed()
+    subscriber_1 = feed.subscribe()
+    subscriber_2 = feed.subscribe()
+    feed.publish({"event": "generation", "generation_no": 1})
+    assert subscriber_1.get_nowait()["generation_no"] == 1
+    assert subscriber_2.get_nowait()["generation_no"] == 1
+    feed.unsubscribe(subscriber_1)
+    assert feed.subscribers == [subscriber_2]
+
+
+def test_slow_subscribers_lose_their_oldest_events():
+    feed = ProgressFeed(max_queue_size=2)
+    subscriber = feed.subscribe()
+    for generation_no in range(5):
+        feed.publish({"event": "generation", "generation_no": generation_no})
+    assert [subscriber.get_nowait()["generation_no"] for _ in range(2)] == [3, 4]
+
+
+def test_stream_sends_events_and_heartbeats():
+    feed = ProgressFeed(heartbeat_interval=0.01)
+    stream = feed.stream()
+    assert next(stream) == ": heartbeat\n\n"
+    feed.publish({"event": "migration", "host": "Host_1"})
+    assert next(stream) == format_sse({"event": "migration", "host": "Host_1"})
+    assert feed.has_subscribers()
+    # Closing the response unsubscribes the client
+    stream.close()
+    assert not feed.has_subscribers()
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+
+class FakeSession:
+    """Streams the lines once, then fails to connect."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def get(self, url, stream=False, timeout=None):
+        if self.lines is None:
+            raise requests.ConnectionError()
+        lines, self.lines = self.lines, None
+        return FakeStreamResponse(lines)
+
+
+def test_relay_tags_events_and_skips_garbled_ones(monkeypatch):
+    lines = [
+        ": heartbeat",
+        'data: {"event": "generation", "generation_no": 1',
+        "data: [1, 2]",
+        "data: " + json.dumps({"event": "generation", "generation_no": 2}),
+    ]
+    monkeypatch.setattr(progress_feed.requests, "Session", lambda: FakeSession(lines))
+    feed = ProgressFeed()
+    subscriber = feed.subscribe()
+    stream_relay = StreamRelay(
+        host_addresses=[{"ip": "127.0.0.2", "port": 5002}],
+        progress_feed=feed,
+        retry_interval=0.01,
+    )
+    stream_relay.start()
+
+    events = [subscriber.get(timeout=5.0) for _ in range(3)]
+    assert events[0] == {"event": "island", "host": "Host_0", "status": "reachable"}
+    assert events[1] == {"event": "generation", "generation_no": 2, "host": "Host_0"}
+    # The relay survived the garbled events and noticed the island went away
+    assert events[2]["status"] == "unreachable"
+    # Without subscribers the relay stops streaming from the island
+    feed.unsubscribe(subscriber)
@@ -0,0 +1,63 @@
+import threading
+import imageio.v2 as imageio
+import numpy as np
+import genetic_algorithm_poc as poc
+from rendering import RouteRenderer
+
+
+def make_renderer(tmp_path, max_queue_size=8):
+    return RouteRenderer(
+        path=str(tmp_path / "renders" / "island.gif"),
+        ga_decode_gene=poc.ga_decode_gene,
+        size=64,
+        frame_duration=0.1,
+        max_queue_size=max_queue_size,
+    )
+
+
+def test_every_submitted_route_becomes_a_frame(tmp_path):
+    route_renderer = make_renderer(tmp_path)
+    for generation_no in range(3):
+        route = np.random.RandomState(generation_no).permutation(len(poc.cities))
+        route_renderer.submit(route, 10.0 - generation_no, generation_no)
+    route_renderer.close()
+    assert route_renderer.frames_written == 3
+    frames = imageio.mimread(route_renderer.path)
+    assert len(frames) == 3
+    assert frames[0].shape[:2] == (64, 64)
+
+
+def test_close_draws_the_routes_of_a_full_queue(tmp_path):
+    route_renderer = make_renderer(tmp_path, max_queue_size=2)
+    # Hold the renderer on its first route until the queue has filled up
+    is_drawing = threading.Event()
+    may_draw = threading.Event()
+    render_frame = route_renderer.render_frame
+
+    def held_render_frame(*route):
+        is_drawing.set()
+        may_draw.wait()
+        return render_frame(*route)
+
+    route_renderer.render_frame = held_render_frame
+    route = np.arange(len(poc.cities), dtype=np.int32)
+    route_renderer.submit(route, 10.0, 0)
+    assert is_drawing.wait(timeout=5.0)
+    route_renderer.submit(route, 9.0, 1)
+    route_renderer.submit(route, 8.0, 2)
+    assert route_renderer.pending.full()
+
+    closing = threading.Thread(target=route_renderer.close)
+    closing.start()
+    may_draw.set()
+    closing.join(timeout=10.0)
+    assert not closing.is_alive()
+    assert route_renderer.frames_written == 3
+    assert len(imageio.mimread(route_renderer.path)) == 3
+
+
+def test_close_returns_when_nothing_was_drawn(tmp_path):
+    route_renderer = make_renderer(tmp_path)
+    route_renderer.close()
+    assert not route_renderer.thread.is_alive()
+    assert route_renderer.frames_written == 0
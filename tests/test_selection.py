@@ -0,0 +1,41 @@
+import numpy as np
+from population import (
+    roulette_wheel_indices,
+    selection_weights,
+    stochastic_universal_sampling_indices,
+)
+
+
+def test_selection_weights_favour_the_fitter_lives():
+    fitness_proxies = np.array([3.0, 1.0, 2.0])
+    assert np.argmax(selection_weights(fitness_proxies, False)) == 1
+    assert np.argmax(selection_weights(fitness_proxies, True)) == 0
+    # The least fit life stays selectable
+    assert (selection_weights(fitness_proxies, False) > 0).all()
+
+
+def test_selection_weights_of_equal_fitness_are_equal():
+    weights = selection_weights(np.full(5, 2.0), False)
+    assert (weights > 0).all()
+    assert np.allclose(weights, weights[0])
+
+
+def test_roulette_wheel_draws_in_proportion_to_the_weights():
+    np.random.seed(0)
+    weights = np.array([1.0, 2.0, 0.0, 5.0])
+    indices = roulette_wheel_indices(weights, 80_000)
+    frequencies = np.bincount(indices, minlength=len(weights)) / len(indices)
+    assert frequencies[2] == 0
+    assert np.allclose(frequencies, weights / weights.sum(), atol=0.01)
+
+
+def test_stochastic_universal_sampling_gives_the_expected_copies():
+    np.random.seed(0)
+    weights = np.array([1.0, 2.0, 0.0, 5.0, 2.0])
+    no_of_draws = 50
+    for _ in range(100):
+        indices = stochastic_universal_sampling_indices(weights, no_of_draws)
+        counts = np.bincount(indices, minlength=len(weights))
+        expected = no_of_draws * weights / weights.sum()
+        # Evenly spaced pointers never stray a whole copy from the expectation
+        assert (np.abs(counts - expected) < 1).all()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from best_life_snapshot import BestLifeSnapshot
+from migrant_codec import MIGRANT_CONTENT_TYPE, decode_migrants, problem_fingerprint
+from spawn_app import SpawnApp
+
+
+@pytest.fixture
+def client(monkeypatch):
+    spawn_app = SpawnApp(ip="127.0.0.1", port=5999)
+    # Only the routes are needed, not the genetic algorithm or the server
+    monkeypatch.setattr(spawn_app, "start_genetic_algorithm", lambda: None)
+    monkeypatch.setattr(spawn_app.app, "run", lambda **kwargs: None)
+    spawn_app.run_app()
+    spawn_app.island_state.publish(
+        BestLifeSnapshot(
+            genes=[np.arange(5, dtype=np.int32)],
+            fitness_proxies=[1.5],
+            generation_no=3,
+            ga_decode_gene=lambda gene: gene.tolist(),
+            problem_fingerprint=problem_fingerprint(np.ones(3)),
+        )
+    )
+    return spawn_app.app.test_client()
+
+
+@pytest.mark.parametrize(
+    "accept", [None, "*/*", "application/json", "text/html,*/*;q=0.8"]
+)
+def test_best_life_is_json_unless_migrants_are_asked_for(client, accept):
+    headers = {} if accept is None else {"Accept": accept}
+    response = client.get("/get_best_life", headers=headers)
+    assert response.content_type == "application/json"
+    assert response.get_json()["generation_no"] == 3
+
+
+def test_best_life_is_a_migrant_payload_when_asked_for(client):
+    response = client.get("/get_best_life", headers={"Accept": MIGRANT_CONTENT_TYPE})
+    assert response.content_type == MIGRANT_CONTENT_TYPE
+    migrants = decode_migrants(response.data)["migrants"]
+    assert (migrants[0]["gene"] == np.arange(5)).all()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from spawn_app import SpawnApp
+from termination import TerminationCriteria
+
+
+def test_no_criteria_never_stop():
+    termination_criteria = TerminationCriteria(maximise_fitness_proxy=False)
+    termination_criteria.start()
+    assert not termination_criteria.should_stop(10**6, 1.0, np.arange(3.0))
+    assert termination_criteria.stop_reason is None
+
+
+def test_max_generations():
+    termination_criteria = TerminationCriteria(False, max_generations=3)
+    assert not termination_criteria.should_stop(2, 5.0)
+    assert termination_criteria.should_stop(3, 5.0)
+    assert termination_criteria.stop_reason == "max_generations"
+
+
+def test_time_budget_starts_with_the_clock():
+    termination_criteria = TerminationCriteria(False, time_budget=0.0)
+    assert not termination_criteria.should_stop(1, 5.0)
+    termination_criteria.start()
+    assert termination_criteria.should_stop(1, 5.0)
+    assert termination_criteria.stop_reason == "time_budget"
+
+
+@pytest.mark.parametrize(
+    "maximise_fitness_proxy, fitness_proxies",
+    [(False, [12.0, 10.5, 10.0]), (True, [8.0, 9.5, 10.0])],
+)
+def test_target_fitness_proxy_is_reached_from_either_side(
+    maximise_fitness_proxy, fitness_proxies
+):
+    termination_criteria = TerminationCriteria(
+        maximise_fitness_proxy, target_fitness_proxy=10.0
+    )
+    stops = [
+        termination_criteria.should_stop(generations_run, fitness_proxy)
+        for generations_run, fitness_proxy in enumerate(fitness_proxies, 1)
+    ]
+    assert stops == [False, False, True]
+    assert termination_criteria.stop_reason == "target_fitness_proxy"
+
+
+def test_stagnation_counts_generations_without_improvement():
+    termination_criteria = TerminationCriteria(False, stagnation_generations=2)
+    stops = [
+        termination_criteria.should_stop(generations_run, fitness_proxy)
+        for generations_run, fitness_proxy in enumerate([5.0, 4.0, 4.0, 3.0, 3.5], 1)
+    ]
+    assert stops == [False, False, False, False, False]
+    assert termination_criteria.should_stop(6, 3.0)
+    assert termination_criteria.stop_reason == "stagnation"
+
+
+def test_diversity_collapse():
+    termination_criteria = TerminationCriteria(False, min_diversity=0.5)
+    assert not termination_criteria.should_stop(1, 1.0, np.array([1.0, 2.0, 3.0, 3.0]))
+    assert termination_criteria.should_stop(2, 1.0, np.array([1.0, 1.0, 1.0, 1.0, 3.0]))
+    assert termination_criteria.stop_reason == "diversity_collapse"
+
+
+def test_requested_stop_wins():
+    termination_criteria = TerminationCriteria(False, max_generations=1)
+    termination_criteria.request_stop()
+    assert termination_criteria.should_stop(1, 1.0)
+    assert termination_criteria.stop_reason == "stop_requested"
+
+
+class FakeIsland:
+    def __init__(self):
+        self.stop_requested = False
+
+    def request_stop(self):
+        self.stop_requested = True
+
+
+def test_stop_endpoint_stops_the_island(monkeypatch):
+    spawn_app = SpawnApp(ip="127.0.0.1", port=5999)
+    monkeypatch.setattr(spawn_app, "start_genetic_algorithm", lambda: None)
+    monkeypatch.setattr(spawn_app.app, "run", lambda **kwargs: None)
+    spawn_app.run_app()
+    spawn_app.is_running = True
+    spawn_app.darwinian_evolution = FakeIsland()
+
+    response = spawn_app.app.test_client().post("/stop")
+    assert response.get_json() == {"status": "stopping"}
+    assert spawn_app.darwinian_evolution.stop_requested
+    assert not spawn_app.is_running
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import genetic_algorithm_poc as poc
+from conftest import assert_valid_routes, route_lengths
+from worker_pool import WorkerPool
+
+
+@pytest.fixture
+def worker_pool(distance_matrix):
+    worker_pool = WorkerPool(
+        no_of_workers=2,
+        ga_calculate_fitness_proxy_batch=poc.ga_calculate_fitness_proxy_batch,
+        ga_procreation_batch=poc.ga_procreation_batch,
+        shared_arrays={"distance_matrix": distance_matrix},
+    )
+    yield worker_pool
+    worker_pool.close()
+
+
+def test_workers_score_against_the_shared_arrays(worker_pool, routes, distance_matrix):
+    fitness_proxies = worker_pool.calculate_fitness_proxy_batch(routes)
+    assert np.allclose(fitness_proxies, route_lengths(routes, distance_matrix))
+    # A different number of genes resizes the shared block
+    fitness_proxies = worker_pool.calculate_fitness_proxy_batch(routes[:5])
+    assert np.allclose(fitness_proxies, route_lengths(routes[:5], distance_matrix))
+
+
+def test_workers_procreate_every_child(worker_pool, routes):
+    np.random.seed(0)
+    parent_1_indices = np.random.randint(len(routes), size=33)
+    parent_2_indices = np.random.randint(len(routes), size=33)
+    children = worker_pool.procreation_batch(routes, parent_1_indices, parent_2_indices)
+    assert children.shape == (33, routes.shape[1])
+    assert_valid_routes(children, routes.shape[1])
+
+
+def test_close_releases_the_shared_memory(distance_matrix, routes):
+    worker_pool = WorkerPool(
+        no_of_workers=1,
+        ga_calculate_fitness_proxy_batch=poc.ga_calculate_fitness_proxy_batch,
+        ga_procreation_batch=poc.ga_procreation_batch,
+        shared_arrays={"distance_matrix": distance_matrix},
+    )
+    worker_pool.calculate_fitness_proxy_batch(routes)
+    worker_pool.close()
+    assert worker_pool.genes is None
+    assert worker_pool.shared_arrays == {}
@@ -0,0 +1,58 @@
+import numpy as np
+
+# Edge weight types whose distances are Euclidean in the node coordinates
+EUCLIDEAN_EDGE_WEIGHT_TYPES = ("EUC_2D", "CEIL_2D")
+
+
+def load_tsplib(path):
+    """
+    Load the cities of a TSPLIB .tsp file.
+
+    Only symmetric problems with Euclidean 2-D coordinates are supported. Distances
+    are not rounded to integers the way TSPLIB's EUC_2D defines them, so tour lengths
+    are slightly shorter than TSPLIB's published optima.
+
+    Args:
+    - path: Path of the .tsp file.
+
+    Returns:
+    - dict: {"name", "comment", "coordinates"}, coordinates being an N x 2 array in file order.
+    """
+    header = {}
+    coordinates = []
+    in_node_coord_section = False
+    with open(path) as tsp_file:
+        for line in tsp_file:
+            line = line.strip()
+            if not line:
+                continue
+            if in_node_coord_section:
+                fields = line.split()
+                if len(fields) == 3:
+                    coordinates.append((float(fields[1]), float(fields[2])))
+                    continue
+                # Any other line ends the section, e.g. EOF or the next section
+                in_node_coord_section = False
+            if line == "NODE_COORD_SECTION":
+                in_node_coord_section = True
+            elif ":" in line:
+                key, value = line.split(":", 1)
+                header[key.strip().upper()] = value.strip()
+
+    if header.get("TYPE", "TSP").split()[0] != "TSP":
+        raise ValueError(f"{path} is not a symmetric TSP: TYPE is {header['TYPE']}")
+    edge_weight_type = header.get("EDGE_WEIGHT_TYPE")
+    if edge_weight_type not in EUCLIDEAN_EDGE_WEIGHT_TYPES:
+        raise ValueError(
+            f"Unsupported EDGE_WEIGHT_TYPE {edge_weight_type} in {path}. "
+            f"Expected one of {EUCLIDEAN_EDGE_WEIGHT_TYPES}"
+        )
+    if "DIMENSION" in header and int(header["DIMENSION"]) != len(coordinates):
+        raise ValueError(
+            f"{path} declares {header['DIMENSION']} cities but lists {len(coordinates)}"
+        )
+    return {
+        "name": header.get("NAME"),
+        "comment": header.get("COMMENT"),
+        "coordinates": np.array(coordinates, dtype=float),
+    }
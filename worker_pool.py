@@ -0,0 +1,221 @@
+from multiprocessing import shared_memory
+import importlib
+import multiprocessing
+import random
+import numpy as np
+
+
+class SharedArray:
+    """
+    A numpy array stored in multiprocessing shared memory, so worker processes
+    can read and write it without pickling.
+
+    Attributes:
+    - array: The numpy array backed by the shared memory block.
+    - ref: (name, shape, dtype) tuple a worker uses to attach to the array.
+
+    Methods:
+    - release(): Closes and unlinks the shared memory block.
+    """
+
+    def __init__(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shared_memory.buf)
+        self.ref = (self.shared_memory.name, tuple(shape), dtype.str)
+
+    def release(self):
+        self.array = None
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+
+# Shared memory blocks a worker process has attached to, keyed by slot so a
+# resized block replaces the one it superseded
+_worker_attached = {}
+
+
+def _attach(slot, ref):
+    name, shape, dtype = ref
+    attached = _worker_attached.get(slot)
+    if attached is not None and attached[0].name == name:
+        return attached[1]
+    if attached is not None:
+        attached[0].close()
+    # Workers share the parent's resource tracker, so the parent's unlink
+    # remains the only one that releases the block
+    block = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _worker_attached[slot] = (block, array)
+    return array
+
+
+def _seed_worker(kernel_modules, entropy, worker_counter):
+    # Import the kernels' modules first, so a seed one sets on import cannot undo this one
+    for module in kernel_modules:
+        importlib.import_module(module)
+    with worker_counter.get_lock():
+        worker_no = worker_counter.value
+        worker_counter.value += 1
+    # Every worker draws its own stream, derived from the island's
+    seed_sequence = np.random.SeedSequence(entropy, spawn_key=(worker_no,))
+    np.random.seed(seed_sequence.generate_state(4))
+    random.seed(int(seed_sequence.generate_state(1)[0]))
+
+
+def kernel_module(kernel):
+    # Kernels bound with functools.partial keep their function in .func
+    return getattr(kernel, "func", kernel).__module__
+
+
+def _evaluate_chunk(kernel, genes_ref, start, stop, shared_refs):
+    genes = _attach("genes", genes_ref)
+    shared_arrays = {
+        key: _attach(f"shared_{key}", ref) for key, ref in shared_refs.items()
+    }
+    return kernel(genes[start:stop], **shared_arrays)
+
+
+def _procreate_chunk(
+    kernel, genes_ref, children_ref, start, parent_1_indices, parent_2_indices
+):
+    genes = _attach("genes", genes_ref)
+    children = _attach("children", children_ref)
+    stop = start + len(parent_1_indices)
+    children[start:stop] = kernel(genes, parent_1_indices, parent_2_indices)
+
+
+class WorkerPool:
+    """
+    Spreads the batch fitness evaluation and batch procreation of a generation
+    across a process pool. Genes and problem data such as the distance matrix are
+    shared with the workers through shared memory instead of being pickled.
+
+    Attributes:
+    - no_of_workers: Number of worker processes.
+    - shared_arrays: Problem arrays passed to the fitness kernel as keyword arguments.
+
+    Methods:
+    - calculate_fitness_proxy_batch(): Drop-in replacement for ga_calculate_fitness_proxy_batch.
+    - procreation_batch(): Drop-in replacement for ga_procreation_batch.
+    - close(): Stops the workers and releases the shared memory.
+    """
+
+    def __init__(
+        self,
+        no_of_workers,
+        ga_calculate_fitness_proxy_batch,
+        ga_procreation_batch,
+        shared_arrays=None,
+    ):
+        """
+        Initialize a WorkerPool instance.
+
+        Args:
+        - no_of_workers: Number of worker processes.
+        - ga_calculate_fitness_proxy_batch: Module level function scoring a 2-D array of genes.
+        - ga_procreation_batch: Module level function producing children's genes from parent index arrays.
+        - shared_arrays: Optional dict of arrays copied once into shared memory and passed to
+          ga_calculate_fitness_proxy_batch as keyword arguments, e.g. {"distance_matrix": ...}.
+        """
+        self.no_of_workers = no_of_workers
+        self.calculate_fitness_proxy_kernel = ga_calculate_fitness_proxy_batch
+        self.procreation_kernel = ga_procreation_batch
+
+        self.shared_arrays = {}
+        for key, array in (shared_arrays or {}).items():
+            shared_array = SharedArray(array.shape, array.dtype)
+            shared_array.array[:] = array
+            self.shared_arrays[key] = shared_array
+        self.genes = None
+        self.children = None
+
+        # Spawn rather than fork, as islands run their own threads next to Flask
+        context = multiprocessing.get_context("spawn")
+        self.pool = context.Pool(
+            no_of_workers,
+            initializer=_seed_worker,
+            initargs=(
+                [
+                    kernel_module(ga_calculate_fitness_proxy_batch),
+                    kernel_module(ga_procreation_batch),
+                ],
+                # Drawn from the island's stream, so seeding the island seeds its workers
+                np.random.randint(0, 2**32, size=4, dtype=np.uint64).tolist(),
+                context.Value("i", 0),
+            ),
+        )
+
+    def share(self, shared_array, array):
+        # Reuse the shared block while the array still fits, otherwise replace it
+        if (
+            shared_array is None
+            or shared_array.array.shape != array.shape
+            or shared_array.array.dtype != array.dtype
+        ):
+            if shared_array is not None:
+                shared_array.release()
+            shared_array = SharedArray(array.shape, array.dtype)
+        shared_array.array[:] = array
+        return shared_array
+
+    def chunks(self, no_of_rows):
+        bounds = np.linspace(0, no_of_rows, self.no_of_workers + 1).astype(int)
+        return [
+            (start, stop)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+
+    def calculate_fitness_proxy_batch(self, genes):
+        self.genes = self.share(self.genes, genes)
+        shared_refs = {key: array.ref for key, array in self.shared_arrays.items()}
+        results = self.pool.starmap(
+            _evaluate_chunk,
+            [
+                (
+                    self.calculate_fitness_proxy_kernel,
+                    self.genes.ref,
+                    start,
+                    stop,
+                    shared_refs,
+                )
+                for start, stop in self.chunks(len(genes))
+            ],
+        )
+        return np.concatenate(results) if results else np.empty(0)
+
+    def procreation_batch(self, genes, parent_1_indices, parent_2_indices):
+        self.genes = self.share(self.genes, genes)
+        no_of_children = len(parent_1_indices)
+        children_shape = (no_of_children, genes.shape[1])
+        if self.children is None or self.children.array.shape != children_shape:
+            if self.children is not None:
+                self.children.release()
+            self.children = SharedArray(children_shape, genes.dtype)
+        self.pool.starmap(
+            _procreate_chunk,
+            [
+                (
+                    self.procreation_kernel,
+                    self.genes.ref,
+                    self.children.ref,
+                    start,
+                    parent_1_indices[start:stop],
+                    parent_2_indices[start:stop],
+                )
+                for start, stop in self.chunks(no_of_children)
+            ],
+        )
+        return self.children.array.copy()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for shared_array in [self.genes, self.children, *self.shared_arrays.values()]:
+            if shared_array is not None:
+                shared_array.release()
+        self.genes = None
+        self.children = None
+        self.shared_arrays = {}